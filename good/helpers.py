@@ -4,7 +4,10 @@ import six
 import collections
 from functools import update_wrapper
 
-from .schema.util import const, get_literal_name, get_callable_name
+from .schema import signals
+from .schema.cache import CompileCache
+from .schema.errors import MultipleInvalid
+from .schema.util import const, get_literal_name, get_callable_name, get_type_name, LazyText
 from . import Schema, SchemaError, Invalid
 from .validators.base import ValidatorBase
 from .validators.boolean import Check
@@ -138,6 +141,78 @@ class Object(ValidatorBase):
         return self.compiled(ObjectProxy(v)).obj
 
 
+class Stream(ValidatorBase):
+    """ Validate an iterable lazily, element by element.
+
+    Works like an [iterable schema](#iterables), but instead of building a new list, it returns a generator
+    which validates the elements as they're consumed. This way, huge sequences are validated in constant memory,
+    and generators & other one-pass iterables can be validated as well:
+
+    ```python
+    from good import Schema, Stream, Remove
+
+    schema = Schema(Stream([int]))
+
+    values = schema(iter([1, 2]))  #-> <generator>
+    list(values)  #-> [1, 2]
+
+    list(schema(iter([1, 'a'])))
+    #-> Invalid: Wrong type @ [1]: expected Integer number, got Binary String
+
+    schema = Schema(Stream([int, Remove(None)]))
+    list(schema(x for x in (1, None, 2)))  #-> [1, 2]
+    ```
+
+    Any iterable is accepted, except for strings.
+    Since the elements are only validated when consumed, the first [`Invalid`](#invalid) error is raised by the
+    generator itself, with the element index in its `path`, and it stops the stream.
+    Note that the path is relative to the stream: the generator doesn't know where it's stored.
+
+    [`Remove`](#remove)d elements are skipped.
+
+    :param schema: Schema for the elements: an iterable of schemas, any of which should match every element
+    :type schema: list|tuple|set
+    """
+
+    def __init__(self, schema):
+        assert isinstance(schema, (list, tuple, set, frozenset)), 'Stream() schema must be an iterable of schemas'
+        self.compiled = tuple(Schema(s).compiled for s in schema)
+        self.name = _(u'Stream[{}]').format(_(u'|').join(x.name for x in self.compiled))
+
+        # When there's a single schema, its errors are reported
+        self._error_passthrough = len(self.compiled) == 1
+
+    def __call__(self, v):
+        # Check type
+        if isinstance(v, six.string_types + (six.binary_type,)) or not isinstance(v, collections.Iterable):
+            raise Invalid(_(u'Wrong value type'), _(u'Iterable'), get_type_name(type(v)))
+
+        # Validate lazily
+        return self._validate(iter(v))
+
+    def _validate(self, iterator):
+        """ Generator that validates the elements
+
+        :type iterator: collections.Iterator
+        :raises Invalid: Invalid element
+        """
+        for index, value in enumerate(iterator):
+            # Try the schemas in order
+            for schema in self.compiled:
+                try:
+                    sanitized_value = schema(value)
+                except signals.RemoveValue:
+                    break  # skip the element
+                except Invalid as e:
+                    if self._error_passthrough:
+                        raise e.enrich(path=[index])
+                else:
+                    yield sanitized_value
+                    break
+            else:
+                raise Invalid(_(u'Invalid value'), self.name, LazyText(get_literal_name, value), [index], self)
+
+
 class Msg(ValidatorBase):
     """ Override the error message reported by the wrapped schema in case of validation errors.
 
@@ -226,6 +301,81 @@ class Test(ValidatorBase):
             return v
 
 
+class Cached(ValidatorBase):
+    """ Memoize the results of a pure schema.
+
+    Values often repeat: country codes, URLs, timestamps. `Cached` remembers the results for the recently seen values,
+    both sanitized values and errors, in a size-bounded LRU cache:
+
+    ```python
+    from good import Schema, Cached, DateTime
+
+    schema = Schema([Cached(DateTime('%Y-%m-%dT%H:%M:%S'), maxsize=10000)])
+
+    schema(timestamps)
+    schema.compiled.schema[0].info()  #-> CacheInfo(hits=..., misses=..., evictions=..., maxsize=10000, currsize=...)
+    ```
+
+    Values are looked up by type & value, and unhashable values are validated as usual.
+    Errors are cached as templates: every time, a fresh copy is raised.
+
+    The schema has to be pure: its result should only depend on the input value.
+    Validators declare that with [`ValidatorBase.pure`](#validatorbase), and `Cached` refuses the impure ones,
+    like [`IsFile`](#isfile). Also, note that the cached results are shared: make sure they're immutable.
+
+    :param schema: The schema to memoize
+    :param maxsize: The max number of cached values
+    :type maxsize: int
+    """
+
+    pure = True
+
+    def __init__(self, schema, maxsize=1024):
+        assert getattr(schema, 'pure', None) is not False, 'Cached() schema is not pure: {!r}'.format(schema)
+        self.compiled = Schema(schema).compiled
+        self.name = self.compiled.name
+        self.cache = CompileCache(maxsize)
+
+    def info(self):
+        """ Get cache statistics
+
+        :rtype: good.schema.cache.CacheInfo
+        """
+        return self.cache.info()
+
+    def __call__(self, v):
+        try:
+            key = (type(v), v)
+            result = self.cache.get(key)
+        except TypeError:  # unhashable
+            return self.compiled(v)
+
+        # Miss
+        if result is None:
+            try:
+                result = (True, self.compiled(v))
+            except Invalid as e:
+                result = (False, _copy_error(e))
+            self.cache.put(key, result)
+
+        # Hit
+        okay, value = result
+        if okay:
+            return value
+        raise _copy_error(value)
+
+
+def _copy_error(e):
+    """ Copy an error, so that the original is not modified when the copy is enriched
+
+    :type e: Invalid|MultipleInvalid
+    :rtype: Invalid|MultipleInvalid
+    """
+    if isinstance(e, MultipleInvalid):
+        return MultipleInvalid([_copy_error(ee) for ee in e.errors])
+    return type(e)(e.message, e.expected, e.provided, list(e.path), e.validator, **e.info)
+
+
 def message(message, name=None):
     """ Convenience decorator that applies [`Msg()`](#msg) to a callable.
 
@@ -319,4 +469,4 @@ def truth(message, expected=None):
         return update_wrapper(Check(func, message, expected), func)
     return decorator
 
-__all__ = ('Object', 'Msg', 'Test', 'message', 'name', 'truth')
+__all__ = ('Object', 'Stream', 'Msg', 'Test', 'Cached', 'message', 'name', 'truth')
@@ -1,7 +1,11 @@
 import six
 
 from .compiler import CompiledSchema
+from .codegen import CodegenCompiledSchema
 from . import markers
+from . import parallel
+from . import jsonstream
+from .columnar import BatchValidator
 
 
 class Schema(object):
@@ -142,6 +146,9 @@ class Schema(object):
 
             Since lists are ordered, the first schema that didn't fail is used.
 
+        When no member has changed (all schemas returned the very same objects), the input value itself is returned,
+        without copies. Otherwise, a new iterable is created, and the input is left untouched.
+
     2. **Mappings** (`dict`, custom mappings):
 
         Each key-value pair in the input mapping is validated against the corresponding schema pair:
@@ -254,11 +261,21 @@ class Schema(object):
 
     compiled_schema_cls = CompiledSchema
 
-    def __init__(self, schema, default_keys=None, extra_keys=None):
+    #: Compiler engines, selectable with the `engine` argument
+    engines = {
+        'closure': CompiledSchema,
+        'codegen': CodegenCompiledSchema,
+    }
+
+    def __init__(self, schema, default_keys=None, extra_keys=None, engine=None, lazy=False, fail_fast=False,
+                 max_errors=0, aggregate_errors=False, copy_on_write=False):
         """ Creates a compiled `Schema` object from the given schema definition.
 
         Under the hood, it uses `SchemaCompiler`: see the [source](good/schema/compiler.py) if interested.
 
+        Compiled schemas are kept in a process-wide LRU cache, so structurally identical schemas are compiled once:
+        see `CompiledSchema.cache`.
+
         :param schema: Schema definition
         :type schema: *
         :param default_keys: Default mapping keys behavior:
@@ -272,14 +289,90 @@ class Schema(object):
             Defaults to `markers.Reject`
 
         :type extra_keys: *
+        :param engine: Compiler engine: one of the `Schema.engines`.
+
+            * `'closure'`: generic validator functions (default)
+            * `'codegen'`: generates specialized Python source for mappings. Fast with mappings of literal keys.
+
+            Defaults to `compiled_schema_cls`
+
+        :type engine: str|None
+        :param lazy: Lazy compilation: nested mappings and iterables in mapping values are compiled on first use.
+
+            This makes startup faster with huge schemas when only a fraction of them is actually used.
+            Note that in this mode, errors in such nested schemas are only reported on first use.
+
+        :type lazy: bool
+        :param fail_fast: Fail-fast mode: raise the first error, instead of collecting all of them.
+
+            In this mode, cheap checks go first, so bad input is rejected at minimal cost:
+            mapping keys are matched, and values with literal & type schemas are validated before values with
+            callables and nested structures.
+
+        :type fail_fast: bool
+        :param max_errors: Error budget: stop validation once that many errors are collected, and report only these.
+
+            Protects from huge error lists on huge inputs. Defaults to `0`: unlimited.
+
+        :type max_errors: int
+        :param aggregate_errors: Aggregate repeated failures of iterable members.
+
+            Identical errors (same message, expected value and relative path) at consecutive indices are reported once:
+            the error of the first index gets `info['index_range']` = `(first, last)` and `info['count']`.
+
+        :type aggregate_errors: bool
+        :param copy_on_write: Never modify the input: useful when it's shared, cached, or read-only.
+
+            By default, mappings are sanitized in place. In this mode, the input is left untouched,
+            and only the mappings and iterables that have actually changed are copied: when nothing has changed,
+            the input value itself is returned. Read-only mappings (e.g. `MappingProxyType`) are accepted for `dict`s.
+
+        :type copy_on_write: bool
         :raises SchemaError: Schema compilation error
         """
-        self.compiled = self.compiled_schema_cls(
+        assert max_errors >= 0, '`max_errors` must be a non-negative integer'
+        assert engine is None or engine in self.engines, '`engine` must be one of: {}'.format(', '.join(sorted(self.engines)))
+        compiled_schema_cls = self.compiled_schema_cls if engine is None else self.engines[engine]
+
+        self.compiled = compiled_schema_cls.cached(
             schema, [],
             default_keys,
-            extra_keys)
+            extra_keys,
+            lazy=lazy,
+            fail_fast=fail_fast,
+            max_errors=max_errors,
+            aggregate_errors=aggregate_errors,
+            copy_on_write=copy_on_write)
         self.name = self.compiled.name
 
+        # Asynchronous schema: compiled on first use, see `validate_async()`
+        self.async_compiled = None
+        self.cooperative_compiled = None
+
+        # Columnar batch validator: planned on first use
+        self._batch_validator = None
+
+        # The definition: for pickling
+        self._definition = (schema, default_keys, extra_keys, engine, lazy, fail_fast, max_errors, aggregate_errors,
+                            copy_on_write)
+
+        # Matcher: compiled on first use
+        self.matcher = compiled_schema_cls(
+            schema, [],
+            default_keys,
+            extra_keys,
+            matcher=True,
+            deferred=True,
+            lazy=lazy,
+            fail_fast=fail_fast,
+            max_errors=max_errors,
+            aggregate_errors=aggregate_errors,
+            copy_on_write=copy_on_write)
+
+    def __reduce__(self):
+        # Compiled schemas are closures: pickle the definition, and compile it again when unpickled
+        return type(self), self._definition
+
     def __repr__(self):
         return repr(self.compiled)
 
@@ -300,3 +393,213 @@ class Schema(object):
         :raises good.MultipleInvalid: Validation error on multiple values. See [`MultipleInvalid`](#multipleinvalid).
         """
         return self.compiled(value)
+
+    def matches(self, value):
+        """ Test whether the value is valid, without reporting any errors.
+
+        It works just like calling the `Schema`, but stops at the first failure and reports it with a boolean:
+        no `Invalid` errors are created. This makes it faster for the cases when you only need a yes/no answer.
+
+        ```python
+        schema = Schema({'age': int})
+
+        schema.matches({'age': 18})  #-> (True, {'age': 18})
+        schema.matches({'age': 'x'})  #-> (False, {'age': 'x'})
+        ```
+
+        Note that custom callables still may raise errors internally: they're just not reported.
+
+        Unlike validation, it never modifies the value: mappings are sanitized on copies,
+        just like in the copy-on-write mode (see [`Schema()`](#schema)).
+
+        :param value: Input value to validate
+        :return: (is-valid, sanitized-value)
+        :rtype: (bool, *)
+        """
+        return self.matcher(value)
+
+    def is_valid(self, value):
+        """ Test whether the value is valid, without reporting any errors.
+
+        See [`Schema.matches()`](#schemamatches).
+
+        ```python
+        schema = Schema({'age': int})
+
+        schema.is_valid({'age': 18})  #-> True
+        schema.is_valid({'age': 'x'})  #-> False
+        ```
+
+        :param value: Input value to validate
+        :rtype: bool
+        """
+        return self.matcher(value)[0]
+
+    def validate_many(self, values, workers=None, chunksize=100):
+        """ Validate many values in parallel, using a pool of worker processes.
+
+        Records are sent to the workers in chunks, and the results are yielded in input order:
+        `(True, sanitized-value)` for valid records, and `(False, error)` for invalid ones.
+
+        ```python
+        schema = Schema({'age': int})
+
+        list(schema.validate_many([{'age': 18}, {'age': 'x'}], workers=2))
+        #-> [(True, {'age': 18}), (False, Invalid(...))]
+        ```
+
+        Each worker compiles its own copy of the schema, which is transferred with `pickle`:
+        hence, the schema definition has to be picklable. Use module-level functions instead of lambdas.
+        The records, the sanitized values and the errors are pickled as well.
+
+        Note that in-place changes of the input mappings are not visible in the parent process:
+        always use the sanitized values.
+
+        :param values: Iterable of values to validate
+        :type values: collections.Iterable
+        :param workers: The number of worker processes. Defaults to the number of CPUs.
+
+            With `1` worker, values are validated serially in the current process.
+
+        :type workers: int|None
+        :param chunksize: The number of values sent to a worker at once
+        :type chunksize: int
+        :return: Generator of (is-valid, sanitized-value|error) for every value
+        :rtype: collections.Iterator[(bool, *)]
+        """
+        return parallel.validate_many(self, values, workers, chunksize)
+
+    def validate_json_stream(self, fp, lines=None, chunk_size=65536):
+        """ Validate a huge JSON array, or an NDJSON file, element by element.
+
+        The input is decoded incrementally, and every element is validated as soon as it's decoded,
+        so memory usage is bounded by the read buffer and the largest element.
+        Results are yielded in input order: `(index, sanitized-value)` for valid elements,
+        and `(index, error)` for invalid ones.
+
+        ```python
+        schema = Schema({'age': int})
+
+        with open('users.json', 'rb') as f:
+            for index, result in schema.validate_json_stream(f):
+                if isinstance(result, Invalid):
+                    print(result.info['offset'], result.info['length'])
+        ```
+
+        Errors have the element index prepended to their paths, and carry the byte offset and length of the element
+        in `Invalid.info`: `offset` and `length`. With these, bad records can be re-read from the file later,
+        e.g. with `mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)[offset:offset+length]`.
+
+        Invalid JSON is reported as an error as well. In a JSON array, it stops decoding, while in NDJSON
+        only the bad line is reported, and the rest of the lines are still validated.
+
+        :param fp: File object to read from: binary (UTF-8) or text.
+            Byte offsets are only meaningful for binary files.
+        :param lines: Input format: `True` for NDJSON, `False` for a JSON array.
+
+            With `None`, the format is detected: the input is a JSON array if it starts with '['.
+            Hence, NDJSON with arrays on every line has to be given explicitly.
+
+        :type lines: bool|None
+        :param chunk_size: The number of bytes to read at once
+        :type chunk_size: int
+        :return: Generator of (index, sanitized-value|error) for every element
+        :rtype: collections.Iterator[(int, *)]
+        """
+        return jsonstream.validate_json_stream(self, fp, lines, chunk_size)
+
+    def validate_async(self, value, concurrency=100):
+        """ Validate the value asynchronously, with asyncio coroutine validators.
+
+        Coroutine functions can be used anywhere a callable is, but they only work with this method:
+
+        ```python
+        async def unique_username(v):
+            if await users.exists(v):
+                raise Invalid(u'Username is taken')
+            return v
+
+        schema = Schema({'username': unique_username, 'friends': [unique_username]})
+
+        await schema.validate_async({'username': 'mark', 'friends': ['alex', 'anna']})
+        ```
+
+        Coroutine validators of all mapping values and iterable members are awaited concurrently,
+        and the results and errors are the same as with the synchronous validation.
+        Note that validators that wrap other schemas, like [`All`](#all) or [`Any`](#any), are synchronous:
+        coroutine functions can't be used within them.
+
+        The `fail_fast`, `max_errors` and `aggregate_errors` options are not supported for
+        mappings and iterables with coroutine validators.
+
+        Requires Python 3.7+.
+
+        :param value: Input value to validate
+        :param concurrency: The max number of coroutine validators running at the same time
+        :type concurrency: int
+        :return: Coroutine that returns the sanitized value
+        :raises good.Invalid: Validation error on a single value.
+        :raises good.MultipleInvalid: Validation error on multiple values.
+        """
+        # Python 3-only syntax: import on demand
+        from . import aio
+        return aio.validate(self, value, concurrency)
+
+    def validate_cooperative(self, value, max_items=1000, max_time=0.005):
+        """ Validate the value asynchronously, step by step, so that it does not block the event loop.
+
+        Large mappings and iterables are validated in slices: the coroutine yields to the event loop
+        once it has validated `max_items` mapping values or iterable members, or has been running for `max_time` seconds,
+        whichever comes first:
+
+        ```python
+        schema = Schema({'items': [{'id': int, 'name': str}]})
+
+        await schema.validate_cooperative(payload)  # other tasks run every 5ms
+        ```
+
+        The result and errors are exactly the same as with `Schema.__call__()`,
+        but note that other tasks can run during validation: they should not modify the value.
+
+        Callables are called as usual, and coroutine validators are not supported: see `validate_async()`.
+
+        Requires Python 3.7+.
+
+        :param value: Input value to validate
+        :param max_items: The max number of values to validate without yielding, or `None`
+        :type max_items: int|None
+        :param max_time: The max number of seconds to run without yielding, or `None`
+        :type max_time: float|None
+        :return: Coroutine that returns the sanitized value
+        :raises good.Invalid: Validation error on a single value.
+        :raises good.MultipleInvalid: Validation error on multiple values.
+        """
+        # Python 3-only syntax: import on demand
+        from . import aio
+        return aio.validate_cooperative(self, value, max_items, max_time)
+
+    def validate_batch(self, values):
+        """ Validate a batch of homogeneous records in columns, with NumPy.
+
+        When the schema is a mapping of literal keys, records are transposed into columns, and type, literal,
+        [`Range`](#range), [`Clamp`](#clamp), [`In`](#in) and [`Length`](#length) checks are vectorized.
+        Other value schemas are applied value by value, and records that fail are validated one by one:
+        the results are exactly the same as with `Schema.__call__()`.
+
+        ```python
+        schema = Schema({'id': int, 'age': All(int, Range(0, 150)), 'name': All(unicode, Length(1, 64))})
+
+        schema.validate_batch(records)
+        #-> [(True, {...}), (False, Invalid(...)), ...]
+        ```
+
+        Requires `numpy`: without it, all records are validated one by one.
+
+        :param values: The records to validate
+        :type values: list
+        :return: List of (is-valid, sanitized-value|error) for every record, in input order
+        :rtype: list[(bool, *)]
+        """
+        if self._batch_validator is None:
+            self._batch_validator = BatchValidator(self)
+        return self._batch_validator(list(values))
@@ -0,0 +1,260 @@
+""" Asynchronous validation with asyncio.
+
+Coroutine functions (and objects with `async def __call__()`) can be used anywhere a callable is,
+but only with [`Schema.validate_async()`](#schemavalidate_async): it uses `AsyncCompiledSchema`,
+which compiles mappings and iterables that contain coroutine validators into coroutine functions.
+Schemas without coroutine validators are compiled exactly like with `CompiledSchema`.
+
+In these coroutine functions, coroutine validators of all mapping values and iterable members
+are awaited concurrently, while the number of coroutine validators running at the same time is limited
+by a semaphore. The results and errors are the same as with the synchronous validation.
+
+`CooperativeCompiledSchema` is used by [`Schema.validate_cooperative()`](#schemavalidate_cooperative):
+it validates mappings and iterables element by element, and yields to the event loop in between,
+so that validation of a large value can be spread over many iterations of the event loop.
+
+Both drive the same step-by-step validators of mappings and iterables as the synchronous validation:
+see `CompiledSchema.steps`.
+
+This module requires Python 3.7+, and is only imported by `Schema.validate_async()` and `Schema.validate_cooperative()`.
+"""
+
+import sys
+import asyncio
+import contextvars
+import collections
+
+from .compiler import CompiledSchema, PENDING, SETTLE
+from .errors import Invalid
+from .util import get_literal_name, get_callable_name, const, LazyText, is_coroutine_callable
+
+
+#: Semaphore that limits the number of coroutine validators running at the same time: see `validate()`
+_semaphore = contextvars.ContextVar('good_semaphore')
+
+
+class AsyncCompiledSchema(CompiledSchema):
+    """ Schema compiler which supports coroutine validators.
+
+    Sets `is_async` on every compiled schema: whether `compiled` is a coroutine function.
+    Asynchronous schemas are `driven`: mappings and iterables which contain them drive their step-by-step validators
+    with `_drive()`, which runs the coroutine validators concurrently.
+    """
+
+    def __init__(self, schema, path, default_keys=None, extra_keys=None, matcher=False, deferred=False, **options):
+        # Containers need to know whether their members are asynchronous: no deferred compilation
+        super(AsyncCompiledSchema, self).__init__(schema, path, default_keys, extra_keys, matcher, False, **options)
+
+    def _compile(self):
+        super(AsyncCompiledSchema, self)._compile()
+        self.is_async = self.driven = asyncio.iscoroutinefunction(self.compiled)
+
+    @property
+    def supports_undefined(self):
+        # Asynchronous schemas can't provide a default synchronously: don't even try them
+        if self.is_async:
+            return False
+        return super(AsyncCompiledSchema, self).supports_undefined
+
+    def _compile_callable(self, schema):
+        if self.matcher or not is_coroutine_callable(schema):
+            return super(AsyncCompiledSchema, self)._compile_callable(schema)
+
+        # Prepare self
+        self.compiled_type = const.COMPILED_TYPE.CALLABLE
+        self.name = get_callable_name(schema)
+
+        # Error utils
+        enrich_exception = lambda e, value: e.enrich(
+            expected=self.name,
+            provided=LazyText(get_literal_name, value),
+            path=self.path,
+            validator=schema)
+
+        # Validator
+        async def validate_with_coroutine(v):
+            try:
+                # Await this coroutine, with the concurrency limit
+                async with _semaphore.get():
+                    return await schema(v)
+            except Invalid as e:
+                # Enrich & re-raise
+                enrich_exception(e, v)
+                raise
+            except const.transformed_exceptions as e:
+                message = _(u'{message}').format(
+                    Exception=type(e).__name__,
+                    message=str(e))
+                e = Invalid(message)
+                raise enrich_exception(e, v)
+
+        return validate_with_coroutine
+
+    def _compile_iterable(self, schema):
+        validate_iterable = super(AsyncCompiledSchema, self)._compile_iterable(schema)
+
+        # Members are cached: compiled once
+        if self.matcher or not any(self.sub_compile(s).is_async for s in schema):
+            return validate_iterable
+        return self._compile_async_steps(self.steps)
+
+    def _compile_mapping_validator(self, schema_type, compiled):
+        validate_mapping = super(AsyncCompiledSchema, self)._compile_mapping_validator(schema_type, compiled)
+        if not any(value_schema.is_async for key_schema, value_schema, is_literal, is_identity in compiled):
+            return validate_mapping
+        return self._compile_async_steps(self.steps)
+
+    def _compile_async_steps(self, steps):
+        """ Create a coroutine function which drives the step-by-step validator: see `_drive()`
+
+        :param steps: Step-by-step validator: see `CompiledSchema.steps`
+        :type steps: callable
+        :rtype: callable
+        """
+        async def validate_steps(value):
+            return await _drive(steps, value)
+        return validate_steps
+
+
+class CooperativeCompiledSchema(CompiledSchema):
+    """ Schema compiler for step-by-step validation.
+
+    Every schema is `driven`: the step-by-step validators of mappings and iterables (see `CompiledSchema.steps`)
+    ask their driver, `validate_cooperative()`, to validate every mapping value and iterable member,
+    so it can yield to the event loop in between, and run the steps of nested containers likewise.
+
+    Validation order, results and errors are the same as with the synchronous validation,
+    including the `fail_fast`, `max_errors` and `aggregate_errors` options.
+    Markers still use the synchronous validators: e.g. the value schema of [`Entire`](#entire) is not split.
+    """
+
+    driven = True
+
+
+async def _drive(steps, value):
+    """ Validate a value with a step-by-step validator asynchronously: see `CompiledSchema.steps`
+
+    Every request starts a task, and is pending until the validator asks for its outcome:
+    coroutine validators of all the values run concurrently.
+
+    :param steps: Step-by-step validator
+    :type steps: callable
+    :param value: The value to validate
+    :return: Sanitized value
+    """
+    result = []
+    validation = steps(value, result)
+    pending = collections.deque()  # Tasks of the pending values
+    try:
+        request = next(validation)
+        while True:
+            value_schema, v = request
+            try:
+                if value_schema is SETTLE:
+                    sanitized_value = await pending.popleft()
+                else:
+                    pending.append(asyncio.ensure_future(value_schema(v)))
+                    sanitized_value = PENDING
+            except Exception:
+                request = validation.throw(*sys.exc_info())
+            else:
+                request = validation.send(sanitized_value)
+    except StopIteration:
+        return result[0]
+    finally:
+        # Stopped early: e.g. on the first error in fail-fast mode
+        for task in pending:
+            task.cancel()
+
+
+async def validate(schema, value, concurrency):
+    """ Validate the value asynchronously: see `Schema.validate_async()`
+
+    :type schema: good.Schema
+    :param value: Input value to validate
+    :param concurrency: The max number of coroutine validators running at the same time
+    :type concurrency: int
+    :return: Sanitized value
+    """
+    # Compile on first use
+    if schema.async_compiled is None:
+        definition, default_keys, extra_keys, engine, lazy, fail_fast, max_errors, aggregate_errors, copy_on_write = \
+            schema._definition
+        schema.async_compiled = AsyncCompiledSchema.cached(
+            definition, [],
+            default_keys,
+            extra_keys,
+            lazy=lazy,
+            fail_fast=fail_fast,
+            max_errors=max_errors,
+            aggregate_errors=aggregate_errors,
+            copy_on_write=copy_on_write)
+    compiled = schema.async_compiled
+
+    # Validate
+    token = _semaphore.set(asyncio.Semaphore(concurrency))
+    try:
+        value = compiled(value)
+        if compiled.is_async:
+            value = await value
+        return value
+    finally:
+        _semaphore.reset(token)
+
+
+async def validate_cooperative(schema, value, max_items, max_time):
+    """ Validate the value step by step, yielding to the event loop: see `Schema.validate_cooperative()`
+
+    :type schema: good.Schema
+    :param value: Input value to validate
+    :param max_items: The max number of mapping values and iterable members to validate without yielding
+    :type max_items: int|None
+    :param max_time: The max number of seconds to run without yielding
+    :type max_time: float|None
+    :return: Sanitized value
+    """
+    # Compile on first use
+    if schema.cooperative_compiled is None:
+        definition, default_keys, extra_keys, engine, lazy, fail_fast, max_errors, aggregate_errors, copy_on_write = \
+            schema._definition
+        schema.cooperative_compiled = CooperativeCompiledSchema.cached(
+            definition, [],
+            default_keys,
+            extra_keys,
+            lazy=lazy,
+            fail_fast=fail_fast,
+            max_errors=max_errors,
+            aggregate_errors=aggregate_errors,
+            copy_on_write=copy_on_write)
+    compiled = schema.cooperative_compiled
+
+    # Yield once the budget is spent
+    clock = asyncio.get_running_loop().time
+    budget = [0, clock() + max_time if max_time is not None else None]  # The number of items, deadline
+
+    async def run(compiled, value):
+        """ Validate the value: run the steps of containers """
+        if compiled.steps is None:
+            return compiled(value)
+
+        result = []
+        validation = compiled.steps(value, result)
+        try:
+            request = next(validation)
+            while True:
+                budget[0] += 1
+                if max_items is not None and budget[0] >= max_items or budget[1] is not None and clock() >= budget[1]:
+                    await asyncio.sleep(0)
+                    budget[:] = 0, clock() + max_time if max_time is not None else None
+
+                value_schema, v = request
+                try:
+                    sanitized_value = await run(value_schema, v)
+                except Exception:
+                    request = validation.throw(*sys.exc_info())
+                else:
+                    request = validation.send(sanitized_value)
+        except StopIteration:
+            return result[0]
+
+    return await run(compiled, value)
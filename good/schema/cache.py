@@ -0,0 +1,100 @@
+""" Compiled schemas cache.
+
+Compiling a schema is costly, while applications tend to compile the very same structures over and over:
+validators like `Any()` or `Msg()` compile their schemas in constructors, and some applications build schemas
+per request.
+
+`CompiledSchema` keeps a process-wide LRU cache of compiled schemas, keyed by the structural fingerprint of
+the schema definition (see `CompiledSchema.fingerprint()`): this way, identical (sub-)schemas are compiled once and shared.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+
+#: Cache statistics
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'maxsize', 'currsize'))
+
+
+class Ref(object):
+    """ Reference to an object which is compared by identity.
+
+    Used in fingerprints for objects that are opaque to the compiler: callables, Markers, schemas.
+    Since the cache holds the reference, the object can't be garbage-collected and its `id()` stays unique.
+    """
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+    def __eq__(self, other):
+        return isinstance(other, Ref) and self.obj is other.obj
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Ref({!r})'.format(self.obj)
+
+
+class CompileCache(object):
+    """ Size-bounded LRU cache with hit/miss/eviction counters.
+
+    Thread-safe.
+
+    :param maxsize: The maximum number of cached items. `0` disables the cache.
+    :type maxsize: int
+    """
+
+    def __init__(self, maxsize):
+        assert maxsize >= 0, '`maxsize` must be a non-negative integer'
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """ Get an item from the cache, and mark it as recently used
+
+        :param key: Cache key
+        :param default: The value to return on cache miss
+        """
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items[key] = value  # move to the end
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """ Put an item into the cache, evicting the least recently used items if it's full """
+        with self._lock:
+            self._items.pop(key, None)
+            if not self.maxsize:
+                return
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ Remove all items and reset the statistics """
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """ Get cache statistics
+
+        :rtype: CacheInfo
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._items))
@@ -0,0 +1,361 @@
+""" Source-generating compiler backend.
+
+`CodegenCompiledSchema` works exactly like `CompiledSchema`, except for mappings:
+instead of a generic `validate_mapping()` closure which walks the sorted list of key schemas on every call,
+it emits Python source specialized for the particular mapping schema, and compiles it once:
+
+* Literal keys are unrolled into direct `in` checks, so there's no loop over key schemas
+* Markers which have nothing to do (see `Marker.is_noop()`) are not called at all
+* Type and literal value schemas are checked inline, and the compiled sub-schema is only called
+    when the check fails: this way, errors are reported by the sub-schema itself and are exactly the same
+* Nested mapping schemas are inlined into the same function, so there's no call per nested mapping
+* Other sub-schemas are called directly, bypassing `CompiledSchema.__call__()`
+
+Use it with `Schema(..., engine='codegen')`.
+"""
+
+import six
+import weakref
+import itertools
+import linecache
+
+from . import signals
+from .compiler import CompiledSchema, Identity
+from .errors import Invalid, MultipleInvalid
+from .util import get_type_name, get_literal_name, const, LazyText
+
+
+class SourceWriter(object):
+    """ Helper to emit indented lines of Python source """
+
+    def __init__(self):
+        self.lines = []
+        self.level = 0
+
+    def __call__(self, line):
+        """ Emit a line at the current indentation level """
+        self.lines.append(u'    ' * self.level + line if line else line)
+
+    def indent(self):
+        self.level += 1
+
+    def dedent(self):
+        self.level -= 1
+
+    def source(self):
+        return u'\n'.join(self.lines) + u'\n'
+
+
+class CodegenCompiledSchema(CompiledSchema):
+    """ Schema compiler which generates specialized Python source for mappings.
+
+    See the module docstring for details.
+    """
+
+    #: Counter for unique file names of the generated sources
+    _source_counter = itertools.count()
+
+    def _inline_type(self, schema):
+        """ Detect whether the schema can be checked inline, and how.
+
+        :param schema: Schema definition
+        :return: const.COMPILED_TYPE.TYPE | const.COMPILED_TYPE.LITERAL | None
+        :rtype: str|None
+        """
+        schema_type = self.get_schema_type(schema)
+        if schema_type == const.COMPILED_TYPE.TYPE and not (six.PY2 and schema is basestring):
+            return schema_type
+        if schema_type == const.COMPILED_TYPE.LITERAL:
+            return schema_type
+        return None
+
+    def _emit_value(self, w, ns, scopes, s, i, value_schema, literal_key, in_place=False):
+        """ Emit value validation for a single match: `k`, `sk`, `v` variables
+
+        :param w: Source writer
+        :type w: SourceWriter
+        :param ns: Namespace for the generated code
+        :type ns: dict
+        :param scopes: Inlining state: see `_emit_mapping()`
+        :param s: Suffix of the names in the current scope: see `_emit_mapping()`
+        :type s: str
+        :param i: Key schema index
+        :type i: int
+        :param value_schema: Compiled value schema
+        :type value_schema: CompiledSchema
+        :param literal_key: Whether the key schema is a literal, and hence the key is never transformed
+        :type literal_key: bool
+        :param in_place: Whether `v` is taken from the input mapping as is, and hence valid values are not assigned
+        :type in_place: bool
+        """
+        ns['vs{}{}'.format(i, s)] = value_schema
+        ns['vf{}{}'.format(i, s)] = value_schema if self.lazy else value_schema.compiled  # lazy: compiled on first use
+
+        # Value validation.
+        # For inline checks, the compiled value schema is only called when the check fails: it raises the error.
+        inline = self._inline_type(value_schema.schema)
+        if inline == const.COMPILED_TYPE.TYPE:
+            ns['vt{}{}'.format(i, s)] = value_schema.schema
+            check = u'type(v{s}) is vt{i}{s}'
+        elif inline == const.COMPILED_TYPE.LITERAL:
+            ns['vt{}{}'.format(i, s)] = type(value_schema.schema)
+            ns['vl{}{}'.format(i, s)] = value_schema.schema
+            check = u'type(v{s}) is vt{i}{s} and v{s} == vl{i}{s}'
+        else:
+            check = None
+
+        # Nested mappings are inlined, once: when the key is present. Otherwise, the sources would multiply with nesting
+        plan = self._inline_plan(value_schema, scopes) if check is None and in_place else None
+
+        w(u'try:')
+        w.indent()
+        if plan is not None:
+            schema_type, compiled = plan
+            scopes[1].append(value_schema)
+            n = u'_{}'.format(next(scopes[0]))
+            # Sanitized in place, just like the validator would do
+            w(u'd{n} = v{s}'.format(n=n, s=s))
+            self._emit_mapping(w, ns, scopes, n, value_schema, schema_type, compiled)
+            scopes[1].pop()
+        elif check is None:
+            w(u'd{s}[sk{s}] = vf{i}{s}(v{s})'.format(i=i, s=s))
+        elif in_place and literal_key:
+            # Valid values are kept as is
+            w(u'if not ({check}):'.format(check=check.format(i=i, s=s)))
+            w.indent()
+            w(u'd{s}[sk{s}] = vf{i}{s}(v{s})'.format(i=i, s=s))
+            w.dedent()
+        else:
+            w(u'd{s}[sk{s}] = v{s} if {check} else vf{i}{s}(v{s})'.format(check=check.format(i=i, s=s), i=i, s=s))
+        if not literal_key:
+            w(u'if k{s} != sk{s}:'.format(s=s))
+            w.indent()
+            w(u'del d{s}[k{s}]'.format(s=s))
+            w.dedent()
+        w.dedent()
+        w(u'except RemoveValue:')
+        w.indent()
+        w(u'del d{s}[k{s}]'.format(s=s))
+        w.dedent()
+        w(u'except Invalid as e:')
+        w.indent()
+        w(u'errors{s}.append(e.enrich(expected=vs{i}{s}.name, provided=LazyText(get_literal_name, v{s}), '
+          u'path=path{s} + [k{s}], validator=vs{i}{s}))'.format(i=i, s=s))
+        w.dedent()
+
+    def _inline_plan(self, value_schema, scopes):
+        """ Detect whether the value schema is a mapping which can be inlined, and get its definition
+
+        Only mappings compiled by this backend are inlined, unless they're compiled lazily,
+        or the copy-on-write mode needs a wrapper around them.
+        A mapping is never inlined into itself.
+
+        :param value_schema: Compiled value schema
+        :type value_schema: CompiledSchema
+        :param scopes: Inlining state: see `_emit_mapping()`
+        :return: (schema type, compiled key and value schemas) or `None`
+        :rtype: (type, list)|None
+        """
+        if self.lazy or self.copy_on_write or not isinstance(value_schema, CodegenCompiledSchema):
+            return None
+        if any(value_schema is inlined for inlined in scopes[1]):
+            return None
+        return value_schema.__dict__.get('_codegen_plan')
+
+    def _emit_execute(self, w, s, i):
+        """ Emit marker execution for the `matches` variable """
+        w(u'try:')
+        w.indent()
+        w(u'matches{s} = km{i}{s}.execute(d{s}, matches{s})'.format(i=i, s=s))
+        w.dedent()
+        w(u'except Invalid as e:')
+        w.indent()
+        w(u'errors{s}.append(e.enrich(expected=ks{i}{s}.name, provided=None, path=path{s}, validator=km{i}{s}))'.format(i=i, s=s))
+        w(u'matches{s} = []'.format(s=s))
+        w.dedent()
+
+    def _emit_matches(self, w, ns, scopes, s, i, value_schema, literal_key):
+        """ Emit value validation for every item in the `matches` variable """
+        w(u'for k{s}, sk{s}, v{s} in matches{s}:'.format(s=s))
+        w.indent()
+        self._emit_value(w, ns, scopes, s, i, value_schema, literal_key)
+        w.dedent()
+
+    def _emit_mapping(self, w, ns, scopes, s, owner, schema_type, compiled):
+        """ Emit validation of the `d` variable with a mapping schema
+
+        Raises the errors at the end, just like a call to the validator would do.
+
+        Nested mappings are emitted in their own scopes: all the names of a scope end with its suffix,
+        which is empty for the top-level one.
+
+        :param w: Source writer
+        :type w: SourceWriter
+        :param ns: Namespace for the generated code
+        :type ns: dict
+        :param scopes: Inlining state: (scope counter, the stack of inlined value schemas)
+        :type scopes: (itertools.count, list[CompiledSchema])
+        :param s: Suffix of the names in this scope
+        :type s: str
+        :param owner: The compiled mapping schema
+        :type owner: CodegenCompiledSchema
+        :param schema_type: Mapping type
+        :param compiled: Compiled key and value schemas: see `CompiledSchema._compile_mapping()`
+        :type compiled: list
+        """
+        ns['schema_type{}'.format(s)] = schema_type
+        ns['err_type{}'.format(s)] = owner.Invalid(_(u'Wrong value type'), get_type_name(schema_type))
+        ns['path{}'.format(s)] = owner.path
+
+        w(u'if not isinstance(d{s}, schema_type{s}):'.format(s=s))
+        w.indent()
+        w(u'raise err_type{s}(provided=get_type_name(type(d{s})))'.format(s=s))
+        w.dedent()
+        w(u'errors{s} = []'.format(s=s))
+        w(u'd_keys{s} = set(d{s})'.format(s=s))
+
+        for i, (key_schema, value_schema, is_literal, is_identity) in enumerate(compiled):
+            marker = key_schema.compiled
+            noop_matched, noop_unmatched = marker.is_noop(True), marker.is_noop(False)
+
+            ns['ks{}{}'.format(i, s)] = key_schema
+            ns['km{}{}'.format(i, s)] = marker
+
+            w(u'')
+            w(u'# {!r}'.format(marker).replace(u'\n', u' '))
+
+            if is_literal:
+                # Literal: direct matching, unrolled
+                ns['k{}{}'.format(i, s)] = marker.key_schema.schema
+                w(u'if k{i}{s} in d_keys{s}:'.format(i=i, s=s))
+                w.indent()
+                w(u'd_keys{s}.remove(k{i}{s})'.format(i=i, s=s))
+                if noop_matched:
+                    w(u'k{s} = sk{s} = k{i}{s}'.format(i=i, s=s))
+                    w(u'v{s} = d{s}[k{s}]'.format(s=s))
+                    self._emit_value(w, ns, scopes, s, i, value_schema, True, in_place=True)
+                else:
+                    w(u'matches{s} = [(k{i}{s}, k{i}{s}, d{s}[k{i}{s}])]'.format(i=i, s=s))
+                    self._emit_execute(w, s, i)
+                    self._emit_matches(w, ns, scopes, s, i, value_schema, True)
+                w.dedent()
+                if not noop_unmatched:
+                    w(u'else:')
+                    w.indent()
+                    w(u'matches{s} = []'.format(s=s))
+                    self._emit_execute(w, s, i)
+                    self._emit_matches(w, ns, scopes, s, i, value_schema, True)
+                    w.dedent()
+                continue
+
+            # Non-literals: collect matches
+            w(u'matches{s} = []'.format(s=s))
+            w(u'if d_keys{s}:'.format(s=s))
+            w.indent()
+            if marker.key_schema.schema is Identity:
+                # Catch-all
+                w(u'matches{s} = [(k{s}, k{s}, d{s}[k{s}]) for k{s} in d_keys{s}]'.format(s=s))
+                w(u'd_keys{s} = set()'.format(s=s))
+            elif self._inline_type(marker.key_schema.schema) == const.COMPILED_TYPE.TYPE:
+                # Type: inline check
+                ns['kt{}{}'.format(i, s)] = marker.key_schema.schema
+                w(u'for k{s} in tuple(d_keys{s}):'.format(s=s))
+                w.indent()
+                w(u'if type(k{s}) is kt{i}{s}:'.format(i=i, s=s))
+                w.indent()
+                w(u'matches{s}.append((k{s}, k{s}, d{s}[k{s}]))'.format(s=s))
+                w(u'd_keys{s}.remove(k{s})'.format(s=s))
+                w.dedent()
+                w.dedent()
+            else:
+                # Generic: use the matcher
+                w(u'for k{s} in tuple(d_keys{s}):'.format(s=s))
+                w.indent()
+                w(u'okay, sk{s} = ks{i}{s}(k{s})'.format(i=i, s=s))
+                w(u'if okay:')
+                w.indent()
+                w(u'matches{s}.append((k{s}, sk{s}, d{s}[k{s}]))'.format(s=s))
+                w(u'd_keys{s}.remove(k{s})'.format(s=s))
+                w.dedent()
+                w.dedent()
+            w.dedent()
+
+            # Execute the marker, unless it has nothing to do
+            if noop_matched and noop_unmatched:
+                pass
+            elif noop_matched:
+                w(u'if not matches{s}:'.format(s=s))
+                w.indent()
+                self._emit_execute(w, s, i)
+                w.dedent()
+            elif noop_unmatched:
+                w(u'if matches{s}:'.format(s=s))
+                w.indent()
+                self._emit_execute(w, s, i)
+                w.dedent()
+            else:
+                self._emit_execute(w, s, i)
+
+            # Validate values
+            self._emit_matches(w, ns, scopes, s, i, value_schema, False)
+
+        w(u'')
+        w(u'if errors{s}:'.format(s=s))
+        w.indent()
+        w(u'raise MultipleInvalid.if_multiple(errors{s})'.format(s=s))
+        w.dedent()
+
+    def _compile_mapping_validator(self, schema_type, compiled):
+        # Fail-fast mode and error budget are not specialized
+        if self.fail_fast or self.max_errors:
+            return super(CodegenCompiledSchema, self)._compile_mapping_validator(schema_type, compiled)
+
+        # Namespace for the generated code
+        ns = {
+            'Invalid': Invalid,
+            'MultipleInvalid': MultipleInvalid,
+            'RemoveValue': signals.RemoveValue,
+            'get_type_name': get_type_name,
+            'get_literal_name': get_literal_name,
+            'LazyText': LazyText,
+        }
+
+        w = SourceWriter()
+        w(u'def validate_mapping(d):')
+        w.indent()
+        self._emit_mapping(w, ns, (itertools.count(1), []), u'', self, schema_type, compiled)
+        w(u'return d')
+
+        # Compile
+        source = w.source()
+        filename = '<good-codegen-{}>'.format(next(self._source_counter))
+        six.exec_(compile(source, filename, 'exec'), ns)
+        validate_mapping = ns['validate_mapping']
+        validate_mapping.source = source
+        _register_source(filename, source, validate_mapping)
+
+        # Parent mappings inline this one
+        self._codegen_plan = (schema_type, compiled)
+        return validate_mapping
+
+
+#: Weak references to the functions whose generated sources are in `linecache`: { filename: weakref }
+_sources = {}
+
+
+def _register_source(filename, source, function):
+    """ Register the generated source in `linecache` for tracebacks, while the function exists
+
+    :param filename: File name of the source
+    :type filename: str
+    :param source: Generated source
+    :type source: unicode
+    :param function: The function compiled from the source
+    :type function: callable
+    """
+    def unregister(ref):
+        linecache.cache.pop(filename, None)
+        _sources.pop(filename, None)
+
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    _sources[filename] = weakref.ref(function, unregister)
@@ -0,0 +1,296 @@
+""" Columnar batch validation with NumPy.
+
+Validating a batch of flat records one by one calls a closure for every value of every record.
+When records are homogeneous -- mappings with the same literal keys -- the batch can be transposed into columns,
+and simple checks are evaluated for the whole column at once with NumPy:
+
+* Type schemas: `int`, `float`, `str`, ...
+* Literal schemas
+* [`Range`](#range), [`Clamp`](#clamp), [`In`](#in), [`Length`](#length) after a type check,
+    including [`All()`](#all) combinations, e.g. `All(int, Range(0, 150))`
+
+Other value schemas are opaque: they're called value by value, but only for the records which have passed
+the vectorized checks.
+
+Records which do not fit the columns (missing or extra keys, not a `dict`), as well as records which fail any check,
+are validated with the compiled schema: this way, errors and sanitized values are exactly the same.
+
+NumPy is an optional dependency: without it, all records are validated with the compiled schema.
+"""
+
+import six
+
+from . import markers
+from .errors import Invalid
+from .util import const, primitive_type
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Column(object):
+    """ Validation plan for a single mapping key
+
+    :param key: Mapping key
+    :param required: Whether the key is required
+    :type required: bool
+    :param checks: Vectorized checks: list of (kind, args) tuples
+    :type checks: list[(str, tuple)]
+    :param compiled: Compiled value schema: used for opaque columns, or `None` if all checks are vectorized
+    :type compiled: CompiledSchema|None
+    """
+
+    def __init__(self, key, required, checks, compiled):
+        self.key = key
+        self.required = required
+        self.checks = checks
+        self.compiled = compiled
+
+
+class BatchValidator(object):
+    """ Columnar validator for batches of records
+
+    :param schema: The schema
+    :type schema: good.Schema
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+
+        #: Columns, or `None` if the schema can't be validated in columns
+        self.columns = self._plan(schema.compiled) if np is not None else None
+        #: Keys of the columnar records: all of them, and the required ones
+        self.keys = self.required_keys = None
+        if self.columns is not None:
+            self.keys = frozenset(c.key for c in self.columns)
+            self.required_keys = frozenset(c.key for c in self.columns if c.required)
+
+    @classmethod
+    def _plan(cls, compiled):
+        """ Make a plan for the compiled mapping schema
+
+        :type compiled: CompiledSchema
+        :rtype: list[Column]|None
+        """
+        if not isinstance(compiled.schema, dict) or not compiled.schema:
+            return None
+        if compiled.default_keys not in (markers.Required, markers.Optional):
+            return None
+
+        columns = []
+        for key, value in compiled.schema.items():
+            # Only literal keys, plain or with Required()/Optional(): other markers have their own behavior
+            if isinstance(key, markers.Marker):
+                if type(key) not in (markers.Required, markers.Optional):
+                    return None
+                marker, key = type(key), key.key
+            else:
+                marker = compiled.default_keys
+            if primitive_type(key) != const.COMPILED_TYPE.LITERAL:
+                return None
+
+            checks = cls._plan_checks(value)
+            columns.append(Column(key, marker is markers.Required, checks or [],
+                                  None if checks else compiled.sub_compile(value, [key])))
+        return columns
+
+    @classmethod
+    def _plan_checks(cls, schema):
+        """ Make vectorized checks for the value schema
+
+        :return: List of checks, or `None` if the value schema is opaque
+        :rtype: list[(str, tuple)]|None
+        """
+        # Import here: validators depend on the Schema
+        from ..validators import All, Range, Clamp, In, Length
+
+        # Flatten All()
+        schemas = [s.compiled.schema for s in schema.compiled] if type(schema) is All else [schema]
+
+        # The first one has to be a type or a literal
+        first = schemas[0]
+        first_type = primitive_type(first)
+        if first_type == const.COMPILED_TYPE.TYPE and not (six.PY2 and first is basestring):
+            checks = [('type', (first,))]
+            value_type = first
+        elif first_type == const.COMPILED_TYPE.LITERAL:
+            checks = [('type', (type(first),)), ('literal', (first,))]
+            value_type = type(first)
+        else:
+            return None
+
+        # Validators
+        numbers = six.integer_types + (float,)
+        numeric = value_type in numbers and value_type is not bool
+        sized = value_type in (six.text_type, six.binary_type)
+        for s in schemas[1:]:
+            if checks[-1][0] == 'clamp':
+                return None  # Clamp() modifies the value: only supported as the last one
+            elif type(s) is Range and numeric:
+                checks.append(('range', (s.min, s.max)))
+            elif type(s) is Clamp and numeric:
+                checks.append(('clamp', (s.min, s.max)))
+            elif type(s) is In and (numeric or sized) and isinstance(s.container, (list, tuple, set, frozenset)) and \
+                    all(type(v) in numbers if numeric else type(v) is value_type for v in s.container):
+                # NumPy compares numbers and strings with each other: only homogeneous containers
+                checks.append(('in', (list(s.container),)))
+            elif type(s) is Length and sized:
+                checks.append(('length', (s.min, s.max)))
+            else:
+                return None
+        return checks
+
+    def __call__(self, values):
+        """ Validate the records
+
+        :param values: The records
+        :type values: list
+        :return: List of (is-valid, sanitized-value|error) for every record
+        :rtype: list[(bool, *)]
+        """
+        results = [None] * len(values)
+
+        # Pick the records that fit the columns
+        if self.columns is not None:
+            keys, required_keys = self.keys, self.required_keys
+            if keys == required_keys:
+                n_keys = len(keys)
+                rows = [i for i, d in enumerate(values) if type(d) is dict and len(d) == n_keys and keys.issuperset(d)]
+            else:
+                rows = [i for i, d in enumerate(values)
+                        if type(d) is dict and keys.issuperset(d) and required_keys.issubset(d)]
+            if rows:
+                self._validate_columns(values, rows, results)
+
+        # Validate the rest with the compiled schema
+        compiled = self.schema.compiled
+        for i, result in enumerate(results):
+            if result is None:
+                try:
+                    results[i] = True, compiled(values[i])
+                except Invalid as e:
+                    results[i] = False, e
+        return results
+
+    def _validate_columns(self, values, rows, results):
+        """ Validate the records in columns, and store the results for the valid ones
+
+        :param values: The records
+        :type values: list[dict]
+        :param rows: Indexes of the records that fit the columns
+        :type rows: list[int]
+        :param results: Results to fill in
+        :type results: list
+        """
+        records = [values[i] for i in rows]
+        ok = np.ones(len(records), dtype=bool)
+        updates = []  # Sanitized values: (column, indexes, values)
+
+        # Vectorized checks
+        opaque = []
+        for column in self.columns:
+            # Optional columns: only check the records that have the key
+            if column.required:
+                present = None
+                col = _objects([d[column.key] for d in records])
+            else:
+                present = np.fromiter((column.key in d for d in records), dtype=bool, count=len(records))
+                col = _objects([d.get(column.key) for d in records])
+
+            if column.compiled is not None:
+                opaque.append((column, col, present))
+                continue
+
+            for kind, args in column.checks:
+                if kind == 'type':
+                    matches = _objects(list(map(type, col))) == _objects([args[0]])
+                    ok &= matches if present is None else matches | ~present
+                    continue
+
+                # Other checks only apply to the records that are still valid
+                idx = np.flatnonzero(ok if present is None else ok & present)
+                if not len(idx):
+                    break
+                if kind == 'literal':
+                    ok[idx[~(col[idx] == _objects([args[0]]))]] = False
+                elif kind in ('range', 'clamp'):
+                    vals = _numbers(col[idx].tolist())
+                    min, max = args
+                    low = vals < min if min is not None else np.zeros(len(idx), dtype=bool)
+                    high = vals > max if max is not None else np.zeros(len(idx), dtype=bool)
+                    if kind == 'range':
+                        ok[idx[low | high]] = False
+                    else:
+                        updates.append((column, idx[low], [min] * int(low.sum())))
+                        updates.append((column, idx[high], [max] * int(high.sum())))
+                elif kind == 'in':
+                    ok[idx[~np.isin(_numbers(col[idx].tolist()), args[0])]] = False
+                elif kind == 'length':
+                    lengths = np.fromiter(map(len, col[idx]), dtype=np.int64, count=len(idx))
+                    min, max = args
+                    if min is not None:
+                        ok[idx[lengths < min]] = False
+                    if max is not None:
+                        ok[idx[lengths > max]] = False
+
+        # Opaque columns: only for the records that are still valid
+        for column, col, present in opaque:
+            idx = np.flatnonzero(ok if present is None else ok & present)
+            sanitized = []
+            for i in idx:
+                try:
+                    sanitized.append(column.compiled(col[i]))
+                except Invalid:
+                    ok[i] = False
+                    sanitized.append(None)
+            updates.append((column, idx, sanitized))
+
+        # Apply sanitized values to the valid records.
+        # Copy-on-write mode: records are copied on the first change
+        copy_on_write = self.schema.compiled.copy_on_write
+        copied = set()
+        for column, idx, sanitized in updates:
+            for i, value in zip(idx, sanitized):
+                if ok[i]:
+                    if copy_on_write:
+                        if records[i][column.key] is value:
+                            continue
+                        if i not in copied:
+                            records[i] = dict(records[i])
+                            copied.add(i)
+                    records[i][column.key] = value
+
+        # Results
+        for i in np.flatnonzero(ok).tolist():
+            results[rows[i]] = True, records[i]
+
+
+def _objects(values):
+    """ Make a 1-dimensional array of objects
+
+    Unlike `numpy.array()`, it does not look into nested sequences.
+
+    :type values: list
+    :rtype: numpy.ndarray
+    """
+    try:
+        return np.fromiter(values, dtype=object, count=len(values))
+    except (TypeError, ValueError):  # NumPy < 1.23 can't make object arrays from iterators
+        arr = np.empty(len(values), dtype=object)
+        for i, v in enumerate(values):
+            arr[i] = v
+        return arr
+
+
+def _numbers(values):
+    """ Make an array of numbers or strings, with the NumPy dtype, if possible
+
+    :type values: list
+    :rtype: numpy.ndarray
+    """
+    try:
+        return np.array(values)
+    except OverflowError:  # huge integers
+        return _objects(values)
@@ -1,8 +1,13 @@
 import six
+import sys
+import copy
+import threading
+import collections
 
 from . import markers, signals
+from .cache import CompileCache, Ref
 from .errors import SchemaError, Invalid, MultipleInvalid
-from .util import get_type_name, get_literal_name, get_callable_name,  const, primitive_type
+from .util import get_type_name, get_literal_name, get_callable_name,  const, primitive_type, LazyText, is_coroutine_callable, get_match_method, get_prefetch_method
 
 
 def Identity(v):
@@ -15,6 +20,63 @@ def Identity(v):
 Identity.name = _(u'*')  # Set a name on it (for repr())
 
 
+#: State of the current compilation, see `CompiledSchema.cached()`
+_compilation = threading.local()
+
+#: Marker for missing keys
+_missing = object()
+
+#: Answer to a request of a step-by-step validator: the value is validated later. See `CompiledSchema.steps`
+PENDING = object()
+
+#: Request of a step-by-step validator: get the outcome of the earliest pending value. See `CompiledSchema.steps`
+SETTLE = object()
+
+
+def run_steps(steps, value):
+    """ Validate a value with a step-by-step validator synchronously: see `CompiledSchema.steps`
+
+    Requested schemas are simply called, and pending values are never used.
+
+    :param steps: Step-by-step validator
+    :type steps: callable
+    :param value: The value to validate
+    :return: Sanitized value
+    """
+    result = []
+    validation = steps(value, result)
+    # Most validators finish without a single request: a `for` loop finishes them at the lowest cost
+    for request in validation:
+        try:
+            while True:
+                value_schema, v = request
+                try:
+                    sanitized_value = value_schema(v)
+                except Exception:
+                    request = validation.throw(*sys.exc_info())
+                else:
+                    request = validation.send(sanitized_value)
+        except StopIteration:
+            break
+    return result[0]
+
+
+class _Deferred(object):
+    """ Attribute of a deferred schema: compiles the schema on first access.
+
+    It's a non-data descriptor, so once the schema is compiled, the instance attribute takes over.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        instance._compile()
+        return instance.__dict__[self.name]
+
+
 class CompiledSchema(object):
     """ Schema compiler.
 
@@ -29,24 +91,87 @@ class CompiledSchema(object):
             This is used with mapping validation: a "matcher" is a lightweight alternative to CompiledSchema which economizes exceptions in favor of just returning booleans.
 
             Note that some values cannot be matchers: e.g. callables, which can typecast dictionary keys.
+            Validators with a `match(v) -> (matched, value)` method (see `ValidatorBase.match()`) are used as matchers as is,
+            unless a subclass overrides `__call__()` only: see `get_match_method()`.
+    :param deferred: Do not compile this schema until it's used.
+    :param options: Compilation options, propagated to sub-schemas: see `default_options`
     """
 
-    def __init__(self, schema, path, default_keys=None, extra_keys=None, matcher=False):
+    #: Process-wide cache of compiled schemas, see `cached()`
+    cache = CompileCache(1024)
+
+    #: Compilation options with their defaults. See `Schema()` for details.
+    default_options = {
+        # Lazy compilation: nested mappings & iterables in mapping values are compiled on first use
+        'lazy': False,
+        # Fail-fast mode: raise the first error
+        'fail_fast': False,
+        # Error budget: stop validation once that many errors are collected (0: unlimited)
+        'max_errors': 0,
+        # Aggregate identical errors at consecutive iterable indices into one
+        'aggregate_errors': False,
+        # Never modify input mappings: sanitize copies, and only keep the ones that have changed
+        'copy_on_write': False,
+    }
+
+    #: Compiled state. Deferred schemas compile on first access.
+    name = _Deferred('name')
+    compiled_type = _Deferred('compiled_type')
+    compiled = _Deferred('compiled')
+
+    #: Step-by-step validator of a mapping or an iterable, `None` for other schemas.
+    #: It's a generator function, `steps(value, result)`, which validates the value just like `compiled`
+    #: and appends the sanitized value to the `result` list, but asks its driver to validate the members
+    #: which have `driven` schemas: it yields a request, `(value_schema, value)`,
+    #: and expects the sanitized value to be sent back, or the error to be thrown in.
+    #: The driver may answer `PENDING` instead: the value is then validated in the background,
+    #: and once the generator needs its outcome, it yields `(SETTLE, None)`: this request gets the outcome
+    #: of the earliest pending value, the same way.
+    #: `compiled` drives it synchronously with `run_steps()`; `aio` drives it asynchronously.
+    steps = _Deferred('steps')
+
+    #: Whether step-by-step validators of containers ask their driver to validate this schema: see `steps`
+    driven = False
+
+    def __init__(self, schema, path, default_keys=None, extra_keys=None, matcher=False, deferred=False, **options):
         assert default_keys is None or issubclass(default_keys, markers.Marker), '`default_keys` value must be a Marker or None'
+        assert set(options) <= set(self.default_options), 'Unknown options: {}'.format(', '.join(set(options) - set(self.default_options)))
 
         self.path = path
         self.schema = schema
         self.default_keys = default_keys or markers.Required
         self.extra_keys = extra_keys or markers.Reject
         self.matcher = matcher
+        for name, default in self.default_options.items():
+            setattr(self, name, options.get(name, default))
 
         # Compile
-        self.name = None
-        self.compiled_type = None
-        self.compiled = self.compile_schema(self.schema)
+        # When deferred, `name`, `compiled_type`, `compiled` and `steps` are not set: `_Deferred` will compile on first access.
+        if not deferred:
+            self._compile()
 
-        assert self.compiled_type is not None, 'Compiler did not set a schema `compiled_type`'
-        assert isinstance(self.name, six.text_type), 'Compiler did not set a valid schema name: {!r} (must be unicode)'.format(self.name)
+    def _compile(self):
+        """ Compile the schema: set `name`, `compiled_type`, `compiled`, `steps`
+
+        Compilation happens on a scratch copy, and the results are published at once when it succeeds:
+        concurrent users of a shared deferred schema (see `cached()`) never see it half-built.
+        """
+        scratch = object.__new__(type(self))
+        scratch.__dict__.update(self.__dict__)
+        scratch.name = None
+        scratch.compiled_type = None
+        scratch.steps = None
+        scratch.compiled = scratch.compile_schema(scratch.schema)
+
+        assert scratch.compiled_type is not None, 'Compiler did not set a schema `compiled_type`'
+        assert isinstance(scratch.name, six.text_type), 'Compiler did not set a valid schema name: {!r} (must be unicode)'.format(scratch.name)
+
+        # Publish
+        self.__dict__.update(scratch.__dict__)
+
+    def __reduce__(self):
+        # Compiled closures can't be pickled: pickle the definition, and compile it on first use when unpickled
+        return type(self), (self.schema, self.path, self.default_keys, self.extra_keys, self.matcher, True), self.get_options()
 
     def __call__(self, value):
         """ Validate value against the compiled schema
@@ -100,16 +225,30 @@ class CompiledSchema(object):
         1. A [`Required`](#required) mapping key was not provided, and it's mapped to `Default()`
         2. .. no more supported cases. Yet.
 
+        The answer is remembered. `Required` markers resolve it at compile time for `Default`, types and literals
+        (see `Required.on_compiled()`), and other schemas are probed on the first missing key.
+
         :rtype: bool
         """
-        # Test
+        # Remembered
         try:
-            yes = self(const.UNDEFINED) is not const.UNDEFINED
-        except (Invalid, SchemaError):
+            return self.__dict__['_supports_undefined']
+        except KeyError:
+            pass
+
+        # Literals, types, mappings and iterables never accept `Undefined`: no need to try (and compile, when deferred)
+        if self.get_schema_type(self.schema) in (const.COMPILED_TYPE.LITERAL, const.COMPILED_TYPE.TYPE,
+                                                 const.COMPILED_TYPE.MAPPING, const.COMPILED_TYPE.ITERABLE):
             yes = False
+        else:
+            # Test
+            try:
+                yes = self(const.UNDEFINED) is not const.UNDEFINED
+            except (Invalid, SchemaError, signals.RemoveValue):
+                yes = False
 
         # Remember (lame @cached_property)
-        self.__dict__['supports_undefined'] = yes
+        self.__dict__['_supports_undefined'] = yes
         return yes
 
     #region Compilation Utils
@@ -170,7 +309,75 @@ class CompiledSchema(object):
                           x.compiled.key_schema.priority if x.compiled_type == const.COMPILED_TYPE.MARKER else 0
                       ), reverse=True)
 
-    def sub_compile(self, schema, path=None, matcher=False):
+    @classmethod
+    def fingerprint(cls, schema, memo=None):
+        """ Get a structural fingerprint of the schema definition.
+
+        Structurally identical schemas have equal fingerprints: literals, types, iterables and mappings are compared
+        by value, while everything else (callables, markers, schemas) is compared by identity.
+
+        :param schema: Schema definition
+        :type schema: *
+        :param memo: Fingerprints of iterables & mappings that were already analyzed: { id: (schema, fingerprint) }
+        :type memo: dict|None
+        :return: Hashable fingerprint
+        """
+        schema_type = cls.get_schema_type(schema)
+
+        if schema_type == const.COMPILED_TYPE.LITERAL:
+            return type(schema), schema  # 1 != True
+        elif schema_type in (const.COMPILED_TYPE.TYPE, const.COMPILED_TYPE.ENUM):
+            return schema
+        elif schema_type not in (const.COMPILED_TYPE.ITERABLE, const.COMPILED_TYPE.MAPPING):
+            return Ref(schema)
+
+        # Structures are analyzed recursively, hence remember them: sub-schemas are fingerprinted again when compiled.
+        # The memo holds a reference to the schema, so its `id()` can't be reused.
+        if memo is not None and id(schema) in memo and memo[id(schema)][0] is schema:
+            return memo[id(schema)][1]
+
+        if schema_type == const.COMPILED_TYPE.ITERABLE:
+            fingerprint = type(schema), tuple(cls.fingerprint(v, memo) for v in schema)
+        else:
+            fingerprint = type(schema), tuple((cls.fingerprint(k, memo), cls.fingerprint(v, memo)) for k, v in schema.items())
+
+        if memo is not None:
+            memo[id(schema)] = schema, fingerprint
+        return fingerprint
+
+    @classmethod
+    def cached(cls, schema, path, default_keys=None, extra_keys=None, matcher=False, deferred=False, **options):
+        """ Get a compiled schema from the process-wide cache, or compile it.
+
+        Markers are never cached, since they're mutated when compiled as mapping keys.
+
+        Arguments are the same as for the constructor.
+
+        :rtype: CompiledSchema
+        :raises SchemaError: Schema compilation error
+        """
+        if not cls.cache.maxsize or cls.get_schema_type(schema) == const.COMPILED_TYPE.MARKER:
+            return cls(schema, path, default_keys, extra_keys, matcher, deferred, **options)
+
+        # Fingerprints memo is shared by all nested compilations
+        memo = getattr(_compilation, 'fingerprints', None)
+        if memo is None:
+            _compilation.fingerprints = {}
+            try:
+                return cls.cached(schema, path, default_keys, extra_keys, matcher, deferred, **options)
+            finally:
+                del _compilation.fingerprints
+
+        key = (cls, cls.fingerprint(schema, memo), tuple(path),
+               default_keys, cls.fingerprint(extra_keys), matcher, deferred,
+               tuple((name, options.get(name, default)) for name, default in sorted(cls.default_options.items())))
+        compiled = cls.cache.get(key)
+        if compiled is None:
+            compiled = cls(schema, path, default_keys, extra_keys, matcher, deferred, **options)
+            cls.cache.put(key, compiled)
+        return compiled
+
+    def sub_compile(self, schema, path=None, matcher=False, deferred=False):
         """ Compile a sub-schema
 
         :param schema: Validation schema
@@ -179,16 +386,43 @@ class CompiledSchema(object):
         :type path: list|None
         :param matcher: Compile a matcher?
         :type matcher: bool
+        :param deferred: Defer compilation till the first use?
+        :type deferred: bool
         :rtype: CompiledSchema
         """
-        return type(self)(
+        return type(self).cached(
             schema,
             self.path + (path or []),
             None,
             None,
-            matcher
+            matcher,
+            deferred,
+            **self.get_options()
         )
 
+    def get_options(self):
+        """ Get compilation options of this schema, for sub-schemas
+
+        :rtype: dict
+        """
+        return {name: getattr(self, name) for name in self.default_options}
+
+    def sub_matcher(self, schema, deferred=False):
+        """ Compile a sub-schema as a matcher, to be used for values
+
+        Markers can't be matchers for values: e.g. `Reject` raises errors when used on a value,
+        so they're compiled as validators, which are then used as callables.
+
+        :param schema: Validation schema
+        :type schema: *
+        :param deferred: Defer compilation till the first use?
+        :type deferred: bool
+        :rtype: CompiledSchema
+        """
+        if self.get_schema_type(schema) == const.COMPILED_TYPE.MARKER:
+            schema = self.sub_compile(schema)
+        return self.sub_compile(schema, matcher=True, deferred=deferred)
+
     def Invalid(self, message, expected):
         """ Helper for Invalid errors.
 
@@ -289,7 +523,7 @@ class CompiledSchema(object):
             # Equality check
             if v != schema:
                 # expected=<value>, provided=<value>
-                raise err_value(get_literal_name(v))
+                raise err_value(LazyText(get_literal_name, v))
             # Fine
             return v
         return validate_literal
@@ -330,7 +564,9 @@ class CompiledSchema(object):
 
     def _compile_schema(self, schema):
         """ Compile another schema """
-        assert self.matcher == schema.matcher
+        if self.matcher != schema.matcher:
+            # Can't reuse it: use as a callable
+            return self._compile_callable(schema)
 
         self.name = schema.name
         self.compiled_type = schema.compiled_type
@@ -338,8 +574,6 @@ class CompiledSchema(object):
         return schema.compiled
 
     def _compile_enum(self, schema):
-        assert not self.matcher, 'Enum cannot be a matcher'
-
         # Prepare self
         self.compiled_type = const.COMPILED_TYPE.ENUM
         self.name = six.text_type(schema.__name__)
@@ -347,12 +581,21 @@ class CompiledSchema(object):
         # Error partials
         err_value = self.Invalid(_(u'Invalid {enum} value').format(enum=self.name), self.name)
 
+        # Matcher
+        if self.matcher:
+            def match_enum(v):
+                try:
+                    return True, schema(v)
+                except ValueError:
+                    return False, v
+            return match_enum
+
         # Validator
         def validate_enum(v):
             try:
                 return schema(v)
             except ValueError:
-                raise err_value(get_literal_name(v))
+                raise err_value(LazyText(get_literal_name, v))
         return validate_enum
 
 
@@ -365,10 +608,16 @@ class CompiledSchema(object):
         # Error utils
         enrich_exception = lambda e, value: e.enrich(
             expected=self.name,
-            provided=get_literal_name(value),
+            provided=LazyText(get_literal_name, value),
             path=self.path,
             validator=schema)
 
+        # Coroutine functions only work with `Schema.validate_async()`
+        if is_coroutine_callable(schema):
+            def validate_with_coroutine(v):
+                raise SchemaError(_(u'{name} is a coroutine function: use Schema.validate_async()').format(name=self.name))
+            return validate_with_coroutine
+
         # Validator
         def validate_with_callable(v):
             try:
@@ -387,6 +636,11 @@ class CompiledSchema(object):
 
         # Matcher
         if self.matcher:
+            # Validators can match without raising errors: see `ValidatorBase.match()`
+            match = get_match_method(schema)
+            if match is not None:
+                return match
+
             def match_with_callable(v):
                 try:
                     return True, validate_with_callable(v)
@@ -400,7 +654,7 @@ class CompiledSchema(object):
         """ Compile iterable: iterable of schemas treated as allowed values """
         # Compile each member as a schema
         schema_type = type(schema)
-        schema_subs = tuple(map(self.sub_compile, schema))
+        schema_subs = tuple(map(self.sub_matcher if self.matcher else self.sub_compile, schema))
 
         # When the schema is an iterable with a single item (e.g. [dict(...)]),
         # Invalid errors from schema members should be immediately used.
@@ -418,48 +672,180 @@ class CompiledSchema(object):
         err_type = self.Invalid(_(u'Wrong value type'), get_type_name(schema_type))
         err_value = self.Invalid(_(u'Invalid value'), self.name)
 
-        # Validator
-        def validate_iterable(l):
+        fail_fast = self.fail_fast
+        max_errors = self.max_errors
+        aggregate_errors = self.aggregate_errors
+
+        # Validators can prepare for validating all values at once: see `ValidatorBase.prefetch()`.
+        # E.g. file validators look the paths up concurrently
+        prefetch = tuple(get_prefetch_method(s.schema) for s in schema_subs
+                         if s.compiled_type == const.COMPILED_TYPE.CALLABLE)
+        prefetch = tuple(p for p in prefetch if p is not None)
+
+        # Schema members to try: ((position, member, driven), ...)
+        members = tuple((j, s, s.driven) for j, s in enumerate(schema_subs))
+        # Schema members to try with a pending value, from its position on: the first one gets its outcome
+        members_resumed = [((j, s, SETTLE),) + members[j + 1:] for j, s in enumerate(schema_subs)]
+
+        # Step-by-step validator
+        def iterable_steps(l, result):
             # Type check
             if not isinstance(l, schema_type):
                 # expected=<type>, provided=<type>
                 raise err_type(provided=get_type_name(type(l)))
 
+            for p in prefetch:
+                p(l)
+
             # Each `v` member should match to any `schema` member
             errors = []  # Errors for every value
-            values = []  # Sanitized values
-            for value_index, value in list(enumerate(l)):
-                # Walk through schema members and test if any of them match
-                for value_schema in schema_subs:
-                    try:
-                        # Try to validate
-                        values.append(value_schema(value))
-                        break  # Success!
-                    except signals.RemoveValue:
-                        # `value_schema` commanded to drop this value
-                        break
-                    except Invalid as e:
-                        if error_passthrough:
-                            # Error-Passthrough enabled: add the original error
-                            errors.append(e.enrich(path=[value_index]))
+            n_errors = 0  # The number of errors, including the nested ones
+            run = None  # Aggregation: (last index, relative path, last error)
+            items = list(l)
+            values = None  # Sanitized values. Copy-on-write: only created once some value has changed
+            n_done = 0  # The number of values done with, in order
+            done = {}  # Values done with while some preceding ones are pending: { index: (error, removed, sanitized-value) }
+            pending = []  # Pending values: (index, schema member position)
+            positions = None  # Schema member positions of the values pending in the previous round: { index: position }
+            stop = False  # Fail-fast mode, error budget: do not validate the rest
+
+            # Values are validated in rounds: pending values go on with their outcomes in the next round
+            work = enumerate(items)
+            while True:
+                for value_index, value in work:
+                    # Walk through schema members and test if any of them match
+                    error = None
+                    removed = False
+                    sanitized_value = None
+                    for j, value_schema, driven in members if positions is None else members_resumed[positions[value_index]]:
+                        try:
+                            if not driven:
+                                # Try to validate
+                                sanitized_value = value_schema(value)
+                            elif driven is SETTLE:
+                                # The outcome of the pending value
+                                sanitized_value = yield SETTLE, None
+                            else:
+                                # Ask the driver
+                                sanitized_value = yield value_schema, value
+                        except signals.RemoveValue:
+                            # `value_schema` commanded to drop this value
+                            removed = True
                             break
+                        except Invalid as e:
+                            if error_passthrough:
+                                # Error-Passthrough enabled: add the original error
+                                error = e
+                                break
+                            else:
+                                # Error-Passthrough disabled: Ignore errors and hope other members will succeed better
+                                pass
                         else:
-                            # Error-Passthrough disabled: Ignore errors and hope other members will succeed better
-                            pass
-                else:
-                    errors.append(err_value(get_literal_name(value), path=[value_index]))
+                            # Success! Or the driver will tell later
+                            break
+                    else:
+                        error = err_value(LazyText(get_literal_name, value))
+                    if sanitized_value is PENDING:
+                        pending.append((value_index, j))
+                        continue
+
+                    # Values are done with in order
+                    if value_index != n_done:
+                        done[value_index] = (error, removed, sanitized_value)
+                        continue
+                    while True:
+                        if error is None:
+                            if removed:
+                                if values is None:
+                                    values = items[:n_done]
+                            elif values is not None:
+                                values.append(sanitized_value)
+                            elif sanitized_value is not items[n_done]:
+                                values = items[:n_done]
+                                values.append(sanitized_value)
+                        elif aggregate_errors and not isinstance(error, MultipleInvalid) and \
+                                run is not None and run[0] == n_done - 1 and run[1] == error.path and \
+                                run[2].message == error.message and run[2].expected == error.expected:
+                            # Aggregation: the same failure as at the previous index extends the run.
+                            # The first error of the run gets `info['index_range']` = (first, last) and `info['count']`.
+                            first = run[2].info.get('index_range', (n_done - 1,))[0]
+                            run[2].info.update(index_range=(first, n_done), count=n_done - first + 1)
+                            run = (n_done, run[1], run[2])
+                        else:
+                            if aggregate_errors and not isinstance(error, MultipleInvalid):
+                                run = (n_done, list(error.path), error)
+                            errors.append(error.enrich(path=[n_done]))
+                            n_errors += len(error.errors) if isinstance(error, MultipleInvalid) else 1
+                            # Fail-fast mode, error budget: do not validate the rest
+                            stop = fail_fast or bool(max_errors and n_errors >= max_errors)
+
+                        n_done += 1
+                        if not done or stop or n_done not in done:
+                            break
+                        error, removed, sanitized_value = done.pop(n_done)
+                    if stop:
+                        break
+
+                # Next round: the pending values
+                if stop or not pending:
+                    break
+                positions = dict(pending)
+                work = [(value_index, items[value_index]) for value_index, j in pending]
+                pending = []
 
             # Errors?
             if errors:
-                raise MultipleInvalid.if_multiple(errors)
+                raise MultipleInvalid.if_multiple(errors, max_errors)
 
+            # Nothing has changed: the original object is returned, no copies
+            if values is None:
+                result.append(l if type(l) is schema_type else schema_type(items))
             # Typecast and finish
-            return schema_type(values)
+            else:
+                result.append(schema_type(values))
+
+        # Validator
+        def validate_iterable(l):
+            return run_steps(iterable_steps, l)
 
         # Matcher
         if self.matcher:
-            return self._compile_callable(validate_iterable)  # Stupidly use it as callable
+            def match_iterable(l):
+                # Type check
+                if not isinstance(l, schema_type):
+                    return False, l
+
+                # Each `v` member should match to any `schema` member, but there's no need to collect errors
+                items = list(l)
+                values = None  # Copy-on-write
+                for value_index, value in enumerate(items):
+                    for value_schema in schema_subs:
+                        try:
+                            okay, sanitized_value = value_schema(value)
+                        except signals.RemoveValue:
+                            # `value_schema` commanded to drop this value
+                            if values is None:
+                                values = items[:value_index]
+                            break
+                        if okay:
+                            if values is not None:
+                                values.append(sanitized_value)
+                            elif sanitized_value is not value:
+                                values = items[:value_index]
+                                values.append(sanitized_value)
+                            break
+                    else:
+                        return False, l
+
+                # Nothing has changed: the original object is returned
+                if values is None:
+                    return True, l if type(l) is schema_type else schema_type(items)
+
+                # Typecast and finish
+                return True, schema_type(values)
+            return match_iterable
 
+        self.steps = iterable_steps
         return validate_iterable
 
     def _compile_marker(self, schema):
@@ -482,7 +868,6 @@ class CompiledSchema(object):
 
     def _compile_mapping(self, schema):
         """ Compile mapping: key-value matching """
-        assert not self.matcher, 'Mappings cannot be matchers'
 
         # This stuff is tricky, but thankfully, I like comments :)
 
@@ -498,7 +883,10 @@ class CompiledSchema(object):
 
         # Compile both keys & values as schemas.
         # Key schemas are compiled as "Matchers" for performance.
-        compiled = {self.sub_compile(key, matcher=True): self.sub_compile(value)
+        # With lazy compilation, nested structures in values are only compiled on first use.
+        deferred_types = (const.COMPILED_TYPE.MAPPING, const.COMPILED_TYPE.ITERABLE) if self.lazy else ()
+        compiled = {self.sub_compile(key, matcher=True):
+                        self.sub_compile(value, deferred=self.get_schema_type(value) in deferred_types)
                     for key, value in schema.items()}
 
         # Notify Markers that they were compiled.
@@ -518,7 +906,7 @@ class CompiledSchema(object):
         # In addition, since mapping keys are mostly literals, we want direct matching instead of the costly function calls.
         # Hence, remember which of them are literals or 'catch-all' markers.
         is_literal  = lambda key_schema: key_schema.compiled.key_schema.compiled_type == const.COMPILED_TYPE.LITERAL
-        is_identity = lambda identity: key_schema.compiled.key_schema is Identity
+        is_identity = lambda key_schema: key_schema.compiled.key_schema.schema is Identity
 
         compiled = [ (key_schema, compiled[key_schema], is_literal(key_schema), is_identity(key_schema))
                      for key_schema in self.sort_schemas(compiled.keys())]
@@ -533,101 +921,379 @@ class CompiledSchema(object):
             mapping_keys=_(u',').join(key_schema.name for key_schema, value_schema, is_literal, is_identity in compiled)
         )
 
-        # Error partials
-        schema_type = type(schema)
-        err_type = self.Invalid(_(u'Wrong value type'), get_type_name(schema_type))
+        if self.matcher:
+            validate = self._compile_mapping_matcher(type(schema), compiled)
+        else:
+            validate = self._compile_mapping_validator(type(schema), compiled)
+
+        # Step-by-step validators copy the input themselves.
+        # Matchers are predicates: they never modify the input either
+        if (self.copy_on_write or self.matcher) and self.steps is None:
+            validate = self._compile_copy_on_write(type(schema), validate)
+        return validate
+
+    def _compile_copy_on_write_utils(self, schema_type):
+        """ Create the copy-on-write helpers for a mapping schema
+
+        Mapping validators sanitize the input in place: in copy-on-write mode, they're given a shallow copy.
+        When no key or value has changed, the copy is dropped and the input mapping itself is the result.
+        Since nested mappings and iterables do the same, the result only has new containers along the changed paths,
+        and the input is never modified.
+
+        Returns two functions:
+
+        * `copy_input(d)`: get a copy to validate, or `None` if the input is not a mapping (and is invalid anyway).
+          When the schema is a `dict`, read-only mappings (e.g. `MappingProxyType`) are accepted as well.
+        * `pick_result(d, sanitized)`: get the validation result: `d` itself when the copy has no changes
+
+        :param schema_type: Mapping type
+        :type schema_type: type
+        :rtype: (callable, callable)
+        """
+        def copy_input(d):
+            if isinstance(d, schema_type):
+                return copy.copy(d)
+            elif schema_type is dict and isinstance(d, collections.Mapping):
+                return dict(d)
+            return None
+
+        def pick_result(d, sanitized):
+            if len(sanitized) != len(d):
+                return sanitized
+            for k, v in sanitized.items():
+                if d.get(k, _missing) is not v:
+                    return sanitized
+            return d
+
+        return copy_input, pick_result
+
+    def _compile_copy_on_write(self, schema_type, validate):
+        """ Wrap a mapping validator (or matcher) for the copy-on-write mode: see `_compile_copy_on_write_utils()`
+
+        :param schema_type: Mapping type
+        :type schema_type: type
+        :param validate: Mapping validator or matcher
+        :type validate: callable
+        :rtype: callable
+        """
+        copy_input, pick_result = self._compile_copy_on_write_utils(schema_type)
+
+        if self.matcher:
+            def match_mapping_copy_on_write(d):
+                sanitized = copy_input(d)
+                if sanitized is None:
+                    return validate(d)
+                okay, sanitized = validate(sanitized)
+                return okay, pick_result(d, sanitized) if okay else d
+            return match_mapping_copy_on_write
+
+        def validate_mapping_copy_on_write(d):
+            sanitized = copy_input(d)
+            if sanitized is None:
+                return validate(d)  # reports the error
+            return pick_result(d, validate(sanitized))
+        return validate_mapping_copy_on_write
+
+    def _compile_mapping_plan(self, compiled):
+        """ Create a function which picks matching input keys for key schemas of the prepared mapping schema
+
+        The function returns a tuple:
+
+        * claims: { position: [(input-key, sanitized-key), ...] } -- input keys that matched every key schema
+        * plan: sorted list of (position, execute) for key schemas that have to be executed,
+          where `execute` tells whether the marker has some job to do (see `Marker.is_noop()`)
+
+        :param compiled: Sorted list of (key-schema, value-schema, is-literal, is-identity)
+        :type compiled: list[CompiledSchema, CompiledSchema, bool, bool]
+        :rtype: callable
+        """
+        # Mappings may have thousands of keys, while the input only has a few of them.
+        # Walking every key schema for every input costs O(schema size), so instead, we prepare some indexes:
+        # then every input key is looked up once, and only the key schemas that have some job to do are executed.
+
+        # Non-literal key schemas have to be tested one by one, but most of them can only match keys of a single type.
+        # Type dispatch table: { key type: ((position, matcher), ...) } -- candidate key schemas for a key type.
+        # Key schemas which match for sure (types, catch-all markers) are given with `matcher=None` and are not even called.
+        non_literals = []  # (position, key type | None, matcher | None)
+        for i, (key_schema, value_schema, is_literal, is_identity) in enumerate(compiled):
+            marker_key_schema = key_schema.compiled.key_schema
+            if is_literal:
+                continue
+            elif is_identity:
+                non_literals.append((i, None, None))
+            elif marker_key_schema.compiled_type == const.COMPILED_TYPE.TYPE \
+                    and isinstance(marker_key_schema.schema, six.class_types) \
+                    and not (six.PY2 and marker_key_schema.schema is basestring):
+                non_literals.append((i, marker_key_schema.schema, None))
+            else:
+                non_literals.append((i, None, key_schema))  # opaque: can match anything
+
+        dispatch = {}
+        def get_candidates(key_type):
+            """ Get candidate key schemas for a key type: ((position, matcher), ...) """
+            try:
+                return dispatch[key_type]
+            except KeyError:
+                return dispatch.setdefault(key_type, tuple(
+                    (i, matcher) for i, match_type, matcher in non_literals
+                    if match_type is None or match_type is key_type))
+
+        # Literal keys index: { literal: (position, preceding candidates) }
+        # Non-literal key schemas with higher priorities come first and may steal a literal key: e.g. `Remove(str)`.
+        # These are remembered so the literal key is offered to them first.
+        literals = {}
+        for i, (key_schema, value_schema, is_literal, is_identity) in enumerate(compiled):
+            if is_literal:
+                k = key_schema.compiled.key_schema.schema
+                literals.setdefault(k, (i, tuple(c for c in get_candidates(type(k)) if c[0] < i)))
+
+        # Markers are classified in advance: those which have nothing to do are never executed (e.g. `Optional`, `Allow`).
+        # executes: [ (execute-when-unmatched, execute-when-matched), ... ] -- indexed with `matched`
+        executes = [(not key_schema.compiled.is_noop(False), not key_schema.compiled.is_noop(True))
+                    for key_schema, value_schema, is_literal, is_identity in compiled]
+
+        # Key schemas that have to be executed even when nothing has matched: e.g. `Required`, `Entire`
+        always = frozenset(i for i, (unmatched, matched) in enumerate(executes) if unmatched)
+
+        # Plan: (position, execute) for every key schema that has matched something, or has something to do anyway
+        make_plan = lambda claims: [(i, executes[i][i in claims]) for i in sorted(always.union(claims))]
+
+        # "Exact keyset" fast path.
+        # When the input has exactly the keys which are required anyway, the execution plan is known in advance.
+        exact_claims = {i: ((k, k),) for k, (i, preceding) in literals.items()
+                        if i in always and not preceding}
+        exact_keys = frozenset(k for i, ((k, _k),) in exact_claims.items())
+        exact_plan = make_plan(exact_claims)
+
+        def get_plan(d):
+            # For each input key, pick the key schema with the highest priority that matches it.
+            # Since we always have Extra which is a catch-all -- this will always result into a full input coverage.
+            # Note that key schemas can change the key (e.g. `Coerce(int)`), so for every key
+            # we store both the initial value (`input-key`) and the sanitized value (`sanitized-key`).
+
+            d_keys = set(d.keys())
+
+            if d_keys == exact_keys:
+                return exact_claims, exact_plan
+
+            claims = {}  # { position: [(input-key, sanitized-key), ...] }
+            for k in d_keys:
+                if k in literals:
+                    # Since mapping keys are mostly literals --
+                    # direct matching saves lots of function calls, which introduces a HUGE performance improvement
+                    i, preceding = literals[k]
+                    k_literal = compiled[i][0].compiled.key_schema.schema
+                else:
+                    i, preceding = None, get_candidates(type(k))
+
+                # Non-literal schemas have to be tested one by one.
+                # In contrast to literals, such key schemas may have multiple matches (e.g. `{ int: 1 }`).
+                for j, matcher in preceding:
+                    # Since all key schemas are compiled as matchers -- we get a tuple (key-matched, sanitized-key)
+                    okay, sanitized_k = matcher(k) if matcher is not None else (True, k)
+                    if okay:
+                        claims.setdefault(j, []).append((k, sanitized_k))
+                        break
+                else:
+                    assert i is not None, 'Key did not match any key schema: {!r}'.format(k)
+                    claims.setdefault(i, []).append((k_literal, k_literal))
+
+            return claims, make_plan(claims)
+
+        return get_plan
+
+    def _compile_mapping_validator(self, schema_type, compiled):
+        """ Create a validator function for the prepared mapping schema
+
+        It drives the step-by-step validator synchronously: see `_compile_mapping_steps()`
+
+        :param schema_type: Mapping type
+        :type schema_type: type
+        :param compiled: Sorted list of (key-schema, value-schema, is-literal, is-identity)
+        :type compiled: list[CompiledSchema, CompiledSchema, bool, bool]
+        :rtype: callable
+        """
+        self.steps = mapping_steps = self._compile_mapping_steps(schema_type, compiled)
 
         # Validator
         def validate_mapping(d):
+            return run_steps(mapping_steps, d)
+
+        return validate_mapping
+
+    def _compile_mapping_steps(self, schema_type, compiled):
+        """ Create a step-by-step validator for the prepared mapping schema: see `steps`
+
+        Values of `driven` schemas are requested from the driver. Pending values are settled before the next marker
+        that has something to do, so it sees the sanitized values.
+
+        In fail-fast mode, it stops at the first error, and orders the checks so that bad input is rejected at minimal cost:
+
+        1. Key schemas are matched, markers are executed (e.g. `Required` misses, `Reject`),
+            and values are validated, if their schemas are cheap to check: literals, types, enums
+        2. Other values are validated: callables, nested structures
+        3. Finally, markers that come after the catch-all `Extra` (e.g. `Entire`) are executed:
+            they can't match any keys, and validate the mapping itself.
+
+        In copy-on-write mode, it validates a copy: see `_compile_copy_on_write_utils()`
+
+        :param schema_type: Mapping type
+        :type schema_type: type
+        :param compiled: Sorted list of (key-schema, value-schema, is-literal, is-identity)
+        :type compiled: list[CompiledSchema, CompiledSchema, bool, bool]
+        :rtype: callable
+        """
+        # Error partials
+        err_type = self.Invalid(_(u'Wrong value type'), get_type_name(schema_type))
+
+        # Execution plan
+        get_plan = self._compile_mapping_plan(compiled)
+
+        # Fail-fast mode is an error budget of 1
+        fail_fast = self.fail_fast
+        max_errors = self.max_errors
+        budget = 1 if fail_fast else max_errors
+
+        copy_on_write = self.copy_on_write
+        copy_input, pick_result = self._compile_copy_on_write_utils(schema_type)
+
+        # Cheap value schemas
+        cheap_types = (const.COMPILED_TYPE.LITERAL, const.COMPILED_TYPE.TYPE, const.COMPILED_TYPE.ENUM)
+        cheap = [self.get_schema_type(value_schema.schema) in cheap_types
+                 for key_schema, value_schema, is_literal, is_identity in compiled]
+
+        # Key schemas after `Extra`
+        finalizers = next((i for i, (key_schema, value_schema, is_literal, is_identity) in enumerate(compiled)
+                           if key_schema.priority < markers.Extra.priority), len(compiled))
+
+        # Value schemas to ask the driver for
+        driven = [value_schema.driven for key_schema, value_schema, is_literal, is_identity in compiled]
+
+        # The last plan step, past the key schemas: it has some job to do, so pending values are settled first
+        finish_step = len(compiled)
+        finish = [(finish_step, True)]
+
+        def value_error(e, value_schema, k, v):
+            """ Enrich a value validation error """
+            return e.enrich(
+                expected=value_schema.name,
+                provided=LazyText(get_literal_name, v),
+                path=self.path + [k],
+                validator=value_schema
+            )
+
+        # Step-by-step validator
+        def mapping_steps(d, result):
+            # Copy-on-write: validate a copy
+            d_input = None
+            if copy_on_write:
+                sanitized = copy_input(d)
+                if sanitized is not None:
+                    d_input, d = d, sanitized
+
             # Type check
             if not isinstance(d, schema_type):
                 # expected=<type>, provided=<type>
                 raise err_type(provided=get_type_name(type(d)))
 
-            # For each schema key, pick matching input key-value pairs.
-            # Since we always have Extra which is a catch-all -- this will always result into a full input coverage.
-            # Also, key schemas are sorted according to the priority, we're handling each set of matching keys in order.
-
-            errors = []  # Collect errors on the fly
-            d_keys = set(d.keys())  # Make a copy of dict keys for destructive iteration
-
-            for key_schema, value_schema, is_literal, is_identity in compiled:
-                # First, collect matching (key, value) pairs for the `key_schema`.
-                # Note that `key_schema` can change the value (e.g. `Coerce(int)`), so for every key
-                # we store both the initial value (`input-key`) and the sanitized value (`sanitized-key`).
-                # This results into a list of triples: [(input-key, sanitized-key, input-value), ...].
+            # Pick matching input keys for key schemas
+            claims, plan = get_plan(d)
+
+            # Fail-fast mode: expensive values are postponed, and validated before the markers after `Extra`.
+            # Plan: (position, None) -- validate the postponed values
+            if fail_fast:
+                n_first = next((n for n, (i, execute) in enumerate(plan) if i >= finalizers), len(plan))
+                plan = plan[:n_first] + [(i, None) for i, execute in plan[:n_first] if not cheap[i]] + plan[n_first:]
+            plan = plan + finish
+
+            errors = []  # Collect errors on the fly. Pending values reserve their place with `None`
+            n_errors = 0  # The number of errors, including the nested ones
+            pending = []  # Pending values: (value-schema, error index, input-key, sanitized-key, input-value)
+            postponed = {}  # Fail-fast mode: matches with expensive values. { position: matches }
+
+            # Key schemas are sorted according to the priority, we're handling each set of matching keys in order.
+            for i, execute in plan:
+                if execute:
+                    # Markers that have something to do see the sanitized values: settle the pending values first
+                    for value_schema, error_index, k, sanitized_k, v in pending:
+                        try:
+                            d[sanitized_k] = yield SETTLE, None
+                            if k != sanitized_k:
+                                del d[k]
+                        except signals.RemoveValue:
+                            del d[k]
+                        except Invalid as e:
+                            errors[error_index] = value_error(e, value_schema, k, v)
+                            n_errors += len(e.errors) if isinstance(e, MultipleInvalid) else 1
+                    del pending[:]
 
-                matches = []
+                    if i == finish_step:
+                        break
 
-                if is_literal:  # (short-circuit for literals)
-                    # Since mapping keys are mostly literals --
-                    # save some iterations & function calls in favor of direct matching,
-                    # which introduces a HUGE performance improvement
-                    k = key_schema.schema.key  # get the literal from the marker
-                    if k in d_keys:
-                        # (See comments below)
-                        matches.append(( k, k, d[k] ))
-                        d_keys.remove(k)
-                elif is_identity:  # (short-circuit for Marker(Identity))
-                    # When this value is an identity function -- we plainly add all keys to it.
-                    # This is to short-circuit catch-all markers like `Extra`, which, being executed last,
-                    # just gets all remaining keys.
-                    matches.extend((k, k, d[k]) for k in d_keys)
-                    d_keys = None  # empty it since we've processed everything
-                elif d_keys:
-                    # For non-literal schemas we have to walk all input keys
-                    # and detect those that match the current `key_schema`.
-                    # In contrast to literals, such keys may have multiple matches (e.g. `{ int: 1 }`).
-
-                    # Note that this condition branch includes the logic from the short-circuited logic implemented above,
-                    # but is less performant.
-
-                    for k in tuple(d_keys):
-                        # Exec key schema on the input key.
-                        # Since all key schemas are compiled as matchers -- we get a tuple (key-matched, sanitized-key)
-
-                        okay, sanitized_k = key_schema(k)
-
-                        # If this key has matched -- append it to the list of matches for the current `key_schema`.
-                        # Also, remove the key from the original input so it does not match any other key schemas
-                        # with lower priorities.
-                        if okay:
-                            matches.append(( k, sanitized_k, d[k] ))
-                            d_keys.remove(k)
+                # Error budget: do not validate the rest
+                if budget and n_errors >= budget:
+                    break
 
-                # Now, having a `key_schema` and a list of matches for it, do validation.
-                # If the key is a marker -- execute the marker first so it has a chance to modify the input,
-                # and then proceed with value validation.
+                key_schema, value_schema, is_literal, is_identity = compiled[i]
 
-                # Execute Marker first.
-                if key_schema.compiled_type == const.COMPILED_TYPE.MARKER:
-                    # Note that Markers can raise errors as well.
-                    # Since they're compiled - all marker errors are raised as `Invalid`.
-                    try:
-                        matches = key_schema.compiled.execute(d, matches)
-                    except Invalid as e:
-                        # Add marker errors to the list of Invalid reports for this schema.
-                        # Using enrich(), we're also setting `path` prefix, and other info known at this step.
-                        errors.append(e.enrich(
-                            # Markers are responsible to set `expected`, `provided`, `validator`
-                            expected=key_schema.name,
-                            provided=None,  # Marker's required to set that
-                            path=self.path,
-                            validator=key_schema.compiled
-                        ))
-                        # If a marker raised an error -- the (key, value) pair is already Invalid, and no
-                        # further validation is required.
+                if execute is None:
+                    matches = postponed.pop(i, ())
+                else:
+                    # Collect the list of triples: [(input-key, sanitized-key, input-value), ...]
+                    # Values are picked only now, since markers with higher priorities could have modified them.
+                    matches = [(k, sanitized_k, d[k]) for k, sanitized_k in claims.get(i, ())]
+
+                    # Now, having a `key_schema` and a list of matches for it, do validation.
+                    # If the key is a marker -- execute the marker first so it has a chance to modify the input,
+                    # and then proceed with value validation.
+
+                    # Execute Marker first, unless it has nothing to do.
+                    marker = key_schema.compiled
+                    if execute:
+                        # Note that Markers can raise errors as well.
+                        # Since they're compiled - all marker errors are raised as `Invalid`.
+                        try:
+                            matches = marker.execute(d, matches)
+                        except Invalid as e:
+                            # Add marker errors to the list of Invalid reports for this schema.
+                            # Using enrich(), we're also setting `path` prefix, and other info known at this step.
+                            errors.append(e.enrich(
+                                # Markers are responsible to set `expected`, `provided`, `validator`
+                                expected=key_schema.name,
+                                provided=None,  # Marker's required to set that
+                                path=self.path,
+                                validator=marker
+                            ))
+                            n_errors += len(e.errors) if isinstance(e, MultipleInvalid) else 1
+                            # If a marker raised an error -- the (key, value) pair is already Invalid, and no
+                            # further validation is required.
+                            continue
+
+                    if fail_fast and not cheap[i] and i < finalizers:
+                        postponed[i] = matches
                         continue
 
                 # Proceed with validation.
                 # Now, we validate values for every (key, value) pairs in the current list of matches,
                 # and rebuild the mapping.
+                is_driven = driven[i]
                 for k, sanitized_k, v in matches:
+                    if budget and n_errors >= budget:
+                        break
                     try:
-                        # Execute the value schema and store it into the rebuilt mapping
-                        # using the sanitized key, which might be different from the original key.
-                        d[sanitized_k] = value_schema(v)
+                        if is_driven:
+                            # Ask the driver
+                            sanitized_v = yield value_schema, v
+                            if sanitized_v is PENDING:
+                                pending.append((value_schema, len(errors), k, sanitized_k, v))
+                                errors.append(None)
+                                continue
+                        else:
+                            # Execute the value schema
+                            sanitized_v = value_schema(v)
 
+                        # Store it into the rebuilt mapping using the sanitized key, which might be different from the original key.
+                        d[sanitized_k] = sanitized_v
                         # Remove the original key in case `key_schema` has transformed it.
                         if k != sanitized_k:
                             del d[k]
@@ -637,24 +1303,83 @@ class CompiledSchema(object):
                     except Invalid as e:
                         # Any value validation errors are appended to the list of Invalid reports for the schema
                         # enrich() adds more info on the collected errors.
-                        errors.append(e.enrich(
-                            expected=value_schema.name,
-                            provided=get_literal_name(v),
-                            path=self.path + [k],
-                            validator=value_schema
-                        ))
-
-            assert not d_keys, 'Keys must be empty after destructive iteration. Remainder: {!r}'.format(d_keys)
+                        errors.append(value_error(e, value_schema, k, v))
+                        n_errors += len(e.errors) if isinstance(e, MultipleInvalid) else 1
 
-            # Errors?
+            # Errors? Pending values have reserved their places
+            if errors:
+                errors = [e for e in errors if e is not None]
             if errors:
                 # Note that we did not care about whether a sub-schema raised a single Invalid or MultipleInvalid,
                 # since MultipleInvalid will flatten the list for us.
-                raise MultipleInvalid.if_multiple(errors)
+                raise MultipleInvalid.if_multiple(errors, max_errors)
 
             # Finish
-            return d
+            result.append(d if d_input is None else pick_result(d_input, d))
 
-        return validate_mapping
+        return mapping_steps
+
+    def _compile_mapping_matcher(self, schema_type, compiled):
+        """ Create a matcher function for the prepared mapping schema
+
+        It works just like the validator, but stops at the first failure, and does not create any errors.
+
+        :param schema_type: Mapping type
+        :type schema_type: type
+        :param compiled: Sorted list of (key-schema, value-schema, is-literal, is-identity)
+        :type compiled: list[CompiledSchema, CompiledSchema, bool, bool]
+        :rtype: callable
+        """
+        # Execution plan
+        get_plan = self._compile_mapping_plan(compiled)
+
+        # Value matchers.
+        # Markers still use the value validators, hence matchers are compiled separately.
+        # With lazy compilation, nested structures are only compiled on first use.
+        deferred_types = (const.COMPILED_TYPE.MAPPING, const.COMPILED_TYPE.ITERABLE) if self.lazy else ()
+        value_matchers = []
+        for key_schema, value_schema, is_literal, is_identity in compiled:
+            value_matchers.append(self.sub_matcher(
+                value_schema.schema,
+                deferred=self.get_schema_type(value_schema.schema) in deferred_types))
+
+        # Matcher
+        def match_mapping(d):
+            # Type check
+            if not isinstance(d, schema_type):
+                return False, d
+
+            # Pick matching input keys for key schemas
+            claims, plan = get_plan(d)
+
+            for i, execute in plan:
+                key_schema = compiled[i][0]
+                value_matcher = value_matchers[i]
+                matches = [(k, sanitized_k, d[k]) for k, sanitized_k in claims.get(i, ())]
+
+                # Execute Marker first, unless it has nothing to do
+                if execute:
+                    okay, matches = key_schema.compiled.try_execute(d, matches)
+                    if not okay:
+                        return False, d
+
+                # Match values
+                for k, sanitized_k, v in matches:
+                    try:
+                        okay, v = value_matcher(v)
+                    except signals.RemoveValue:
+                        # `value_schema` commanded to drop this value
+                        del d[k]
+                        continue
+                    if not okay:
+                        return False, d
+                    d[sanitized_k] = v
+                    if k != sanitized_k:
+                        del d[k]
+
+            # Finish
+            return True, d
+
+        return match_mapping
 
     #endregion
@@ -19,6 +19,8 @@ from good import Invalid, MultipleInvalid
 
 import six
 
+from .util import LazyText, const, primitive_type, get_primitive_name
+
 
 class BaseError(Exception):
     """ Base validation exception """
@@ -50,7 +52,10 @@ class Invalid(BaseError):
         E.g. if an invalid value was encountered at ['a'].b[1], then path=['a', 'b', 1].
 
     :type path: list
-    :param validator: The validator that has failed: a schema item
+    :param validator: The validator that has failed: a schema item.
+
+        When the error is pickled, validators other than types and literals are replaced with their names.
+
     :type validator: *
     :param info: Custom values that might be provided by the validator. No built-in validator uses this.
     :type info: dict
@@ -65,6 +70,52 @@ class Invalid(BaseError):
         self.validator = validator
         self.info = info
 
+    #region Lazy fields
+
+    # Errors are created often, and they're enriched at every level of nesting, but are rarely rendered.
+    # Hence, `expected` and `provided` can be given as `LazyText` which is only computed when read,
+    # and path prefixes are collected in a linked list of shared nodes, and only joined when read:
+    # `_path_prefixes = (outer-prefix, (inner-prefix, None))`
+
+    @property
+    def expected(self):
+        if isinstance(self._expected, LazyText):
+            self._expected = self._expected()
+        return self._expected
+
+    @expected.setter
+    def expected(self, value):
+        self._expected = value
+
+    @property
+    def provided(self):
+        if isinstance(self._provided, LazyText):
+            self._provided = self._provided()
+        return self._provided
+
+    @provided.setter
+    def provided(self, value):
+        self._provided = value
+
+    @property
+    def path(self):
+        if self._path_prefixes is not None:
+            path = []
+            node = self._path_prefixes
+            while node is not None:
+                prefix, node = node
+                path.extend(prefix)
+            self._path = path + self._path
+            self._path_prefixes = None
+        return self._path
+
+    @path.setter
+    def path(self, value):
+        self._path = value
+        self._path_prefixes = None
+
+    #endregion
+
     def __iter__(self):
         """ Iterate over container errors.
 
@@ -74,6 +125,15 @@ class Invalid(BaseError):
         """
         yield self
 
+    def __reduce__(self):
+        # Pickle the actual values: lazy fields are materialized.
+        # Validators are often closures and lambdas, which can't be pickled: only types and literals are kept,
+        # other validators are replaced with their names.
+        validator = self.validator
+        if primitive_type(validator) not in (const.COMPILED_TYPE.LITERAL, const.COMPILED_TYPE.TYPE, const.COMPILED_TYPE.ENUM):
+            validator = get_primitive_name(validator)
+        return type(self), (self.message, self.expected, self.provided, self.path, validator), {'info': self.info}
+
     def __repr__(self):
         return '{cls}({0.message!r}, ' \
                'expected={0.expected!r}, ' \
@@ -129,9 +189,9 @@ class Invalid(BaseError):
         This is used when validating a value within a container.
 
         :param expected: Invalid.expected default
-        :type expected: unicode|None
+        :type expected: unicode|LazyText|None
         :param provided: Invalid.provided default
-        :type provided: unicode|None
+        :type provided: unicode|LazyText|None
         :param path: Prefix to prepend to Invalid.path
         :type path: list|None
         :param validator: Invalid.validator default
@@ -139,14 +199,15 @@ class Invalid(BaseError):
         """
         for e in self:
             # defaults on fields
-            if e.expected is None and expected is not None:
-                e.expected = expected
-            if e.provided is None and provided is not None:
-                e.provided = provided
+            if e._expected is None and expected is not None:
+                e._expected = expected
+            if e._provided is None and provided is not None:
+                e._provided = provided
             if e.validator is None and validator is not None:
                 e.validator = validator
             # path prefix
-            e.path = (path or []) + e.path
+            if path:
+                e._path_prefixes = (path, e._path_prefixes)
         return self
 
     if six.PY3:
@@ -193,7 +254,7 @@ class MultipleInvalid(Invalid):
 
         # Create from errors
         e = errors[0]
-        super(MultipleInvalid, self).__init__(e.message, e.expected, e.provided, e.path, e.validator, **e.info)
+        super(MultipleInvalid, self).__init__(e.message, e._expected, e._provided, e.path, e.validator, **e.info)
 
         #: The collected errors
         self.errors = errors
@@ -201,6 +262,9 @@ class MultipleInvalid(Invalid):
     def __iter__(self):
         return iter(self.errors)
 
+    def __reduce__(self):
+        return type(self), (self.errors,)
+
     def __repr__(self):
         return '{cls}({0!r})'.format(self.errors, cls=type(self).__name__)
 
@@ -220,14 +284,20 @@ class MultipleInvalid(Invalid):
         return ers
 
     @classmethod
-    def if_multiple(cls, errors):
+    def if_multiple(cls, errors, max_errors=0):
         """ Provided a list of errors, choose which one to throw: `Invalid` or `MultipleInvalid`.
 
         `MultipleInvalid` is only used for multiple errors.
 
         :param errors: The list of collected errors
         :type errors: list[Invalid]
+        :param max_errors: Only keep that many errors (0: unlimited)
+        :type max_errors: int
         :rtype: Invalid|MultipleInvalid
         """
         assert errors, 'Errors list is empty'
+        if len(errors) == 1:
+            return errors[0]
+        if max_errors:
+            errors = cls.flatten(errors)[:max_errors]
         return errors[0] if len(errors) == 1 else MultipleInvalid(errors)
@@ -0,0 +1,342 @@
+""" Streaming validation of huge JSON arrays and NDJSON files.
+
+Loading a multi-gigabyte JSON export just to validate it needs all of it in memory at once.
+`validate_json_stream()` decodes the input incrementally instead: a top-level JSON array element by element,
+or NDJSON (newline-delimited JSON) line by line, and validates every element as soon as it's decoded.
+Memory usage is bounded by the read buffer and the largest element.
+
+Errors carry the byte offset and length of the element in the input, so bad records can be re-read later,
+e.g. through a memory-mapped view of the file: see `validate_json_stream()`.
+"""
+
+import re
+import json
+import codecs
+
+import six
+
+from .errors import Invalid
+
+
+#: Insignificant JSON whitespace
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+#: Array delimiter, with the surrounding whitespace
+_delimiter = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+#: Number characters up to the end of the buffer: the number might continue in the next chunk
+_number_tail = re.compile(r'[0-9.eE+-]*\Z')
+
+#: Position of a decoding error in its message (Python 2)
+_error_pos = re.compile(r'\(char (\d+)')
+
+#: Decoding errors this close to the end of the buffer might be caused by a value split between chunks
+_truncation_window = 16
+
+
+class JsonStreamReader(object):
+    """ Incremental reader of JSON documents from a file object
+
+    Holds a text buffer, and tracks the byte offset of the current position in the input.
+
+    :param fp: File object: binary (UTF-8) or text
+    :param chunk_size: The number of bytes (or characters) to read at once
+    :type chunk_size: int
+    """
+
+    def __init__(self, fp, chunk_size=65536):
+        assert chunk_size > 0, '`chunk_size` must be positive'
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+
+        #: Text buffer
+        self.text = u''
+        #: Current position in the buffer
+        self.pos = 0
+        #: Byte offset of the current position in the input
+        self.offset = 0
+        #: Whether the input is exhausted
+        self.eof = False
+
+    def read(self):
+        """ Read more input into the buffer
+
+        The buffer at least doubles, so values that span many chunks are read in amortized linear time.
+
+        :return: False if the input is exhausted
+        :rtype: bool
+        """
+        if self.eof:
+            return False
+
+        # Drop the consumed text
+        self.text = self.text[self.pos:]
+        self.pos = 0
+
+        chunk = self.fp.read(max(self.chunk_size, len(self.text)))
+        if not chunk:
+            self.eof = True
+            self.text += self._decoder.decode(b'', True)
+            return False
+        if isinstance(chunk, six.binary_type):
+            chunk = self._decoder.decode(chunk)
+        self.text += chunk
+        return True
+
+    def advance(self, pos):
+        """ Consume the buffer up to the position """
+        self.offset += len(self.text[self.pos:pos].encode('utf-8'))
+        self.pos = pos
+
+    def skip(self, pos):
+        """ Consume the buffer up to the position, when it's known to be ASCII: whitespace, delimiters """
+        self.offset += pos - self.pos
+        self.pos = pos
+
+    def peek(self):
+        """ Skip whitespace, and get the next character
+
+        :return: The next character, or an empty string at the end of the input
+        :rtype: unicode
+        """
+        while True:
+            self.skip(_whitespace.match(self.text, self.pos).end())
+            if self.pos < len(self.text) or not self.read():
+                return self.text[self.pos:self.pos + 1]
+
+    def decode(self):
+        """ Decode a JSON value at the current position
+
+        A value at the very end of the buffer might be incomplete (e.g. a number), so it's only accepted
+        when followed by something, or at the end of the input.
+        Likewise, more input is only read on errors that might be caused by an incomplete value:
+        a genuine syntax error is reported right away, without buffering the rest of the input.
+
+        :return: (value, end position)
+        :raises ValueError: invalid JSON
+        """
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.text, self.pos)
+            except ValueError as e:
+                if not _is_truncated(e, self.text) or not self.read():
+                    raise
+                continue
+            if not _number_tail.match(self.text, end) or not self.read():
+                return value, end
+
+    def line(self):
+        """ Get the next line, without the line break
+
+        :return: The line, or `None` at the end of the input
+        :rtype: unicode|None
+        """
+        start = self.pos
+        while True:
+            end = self.text.find(u'\n', start)
+            if end >= 0:
+                break
+            start = len(self.text) - self.pos  # position in the buffer after read()
+            if not self.read():
+                end = len(self.text)
+                break
+            # `read()` drops the consumed text
+        if self.pos == end and self.eof:
+            return None
+        line = self.text[self.pos:end]
+        self.advance(min(end + 1, len(self.text)))
+        return line
+
+
+def iter_json_array(fp, chunk_size=65536):
+    """ Decode the elements of a top-level JSON array incrementally
+
+    Decoding stops at the first syntax error: the rest of the input can't be trusted.
+
+    :param fp: File object: binary (UTF-8) or text
+    :param chunk_size: The number of bytes to read at once
+    :type chunk_size: int
+    :return: Generator of (index, offset, length, value|Invalid)
+    :rtype: collections.Iterator[(int, int, int, *)]
+    """
+    reader = JsonStreamReader(fp, chunk_size)
+    index = 0
+
+    # Byte order mark
+    if reader.peek() == u'\ufeff':
+        reader.advance(reader.pos + 1)
+
+    # Opening bracket
+    if reader.peek() != u'[':
+        yield index, reader.offset, 0, _syntax_error(_(u'Expecting a JSON array'), index, reader)
+        return
+    reader.skip(reader.pos + 1)
+    if reader.peek() == u']':
+        reader.skip(reader.pos + 1)
+        return
+
+    while True:
+        # Element
+        reader.peek()
+        offset = reader.offset
+        try:
+            value, end = reader.decode()
+        except ValueError as e:
+            yield index, offset, 0, _syntax_error(_json_error(e), index, reader)
+            return
+        reader.advance(end)
+        yield index, offset, reader.offset - offset, value
+        index += 1
+
+        # Delimiter
+        m = _delimiter.match(reader.text, reader.pos)
+        if m is not None:
+            c = m.group(1)
+            reader.skip(m.end())
+        else:
+            # Whitespace up to the end of the buffer
+            c = reader.peek()
+            if c not in (u',', u']'):
+                yield index, reader.offset, 0, _syntax_error(_(u"Expecting ',' or ']'"), index, reader)
+                return
+            reader.skip(reader.pos + 1)
+        if c == u']':
+            break
+
+    # Trailing data
+    if reader.peek():
+        yield index, reader.offset, 0, _syntax_error(_(u'Extra data after the JSON array'), index, reader)
+
+
+def iter_json_lines(fp, chunk_size=65536):
+    """ Decode NDJSON lines incrementally
+
+    Empty lines are skipped. A line with a syntax error is reported, and decoding goes on with the next line.
+
+    :param fp: File object: binary (UTF-8) or text
+    :param chunk_size: The number of bytes to read at once
+    :type chunk_size: int
+    :return: Generator of (index, offset, length, value|Invalid)
+    :rtype: collections.Iterator[(int, int, int, *)]
+    """
+    reader = JsonStreamReader(fp, chunk_size)
+    index = 0
+
+    while True:
+        offset = reader.offset
+        line = reader.line()
+        if line is None:
+            break
+
+        # Byte order mark
+        if offset == 0 and line.startswith(u'\ufeff'):
+            line = line[1:]
+            offset = 3
+        if not line.strip():
+            continue
+
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            value = Invalid(_(u'Invalid JSON: {message}').format(message=_json_error(e)), _(u'JSON'), line, [index])
+        yield index, offset, len(line.encode('utf-8')), value
+        index += 1
+
+
+def _is_truncated(e, text):
+    """ Test whether a decoding error might be caused by a value split between chunks
+
+    :param e: Decoding error
+    :type e: ValueError
+    :param text: The buffer that was decoded
+    :type text: unicode
+    :rtype: bool
+    """
+    # Strings may be arbitrarily long: the closing quote might be in the next chunk
+    if _json_error(e).startswith(u'Unterminated string'):
+        return True
+
+    # Otherwise, the error has to be close to the end of the buffer
+    pos = getattr(e, 'pos', None)
+    if pos is None:
+        m = _error_pos.search(six.text_type(e))
+        if m is None:
+            return True
+        pos = int(m.group(1))
+    return len(text) - pos < _truncation_window
+
+
+def _json_error(e):
+    """ Get the message of a JSON decoding error
+
+    Positions in the message are relative to the buffer, so they're dropped when possible.
+
+    :type e: ValueError
+    :rtype: unicode
+    """
+    return six.text_type(getattr(e, 'msg', e))
+
+
+def _syntax_error(message, index, reader):
+    """ Make an error for invalid JSON
+
+    :rtype: Invalid
+    """
+    provided = reader.text[reader.pos:reader.pos + 20] or _(u'-end-')
+    return Invalid(_(u'Invalid JSON: {message}').format(message=message), _(u'JSON'), provided, [index])
+
+
+def validate_json_stream(schema, fp, lines=None, chunk_size=65536):
+    """ Validate the elements of a JSON array, or NDJSON lines, incrementally: see `Schema.validate_json_stream()`
+
+    :type schema: good.Schema
+    :param fp: File object: binary (UTF-8) or text
+    :param lines: Input format: `True` for NDJSON, `False` for a JSON array, `None` to detect
+    :type lines: bool|None
+    :param chunk_size: The number of bytes to read at once
+    :type chunk_size: int
+    :return: Generator of (index, sanitized-value|Invalid)
+    :rtype: collections.Iterator[(int, *)]
+    """
+    # Detect the format: a JSON array starts with '['
+    if lines is None:
+        head = first = fp.read(chunk_size)
+        while first:
+            first = head.lstrip(b'\xef\xbb\xbf \t\r\n' if isinstance(head, six.binary_type) else u'\ufeff \t\r\n')
+            if first:
+                break
+            first = fp.read(chunk_size)
+            head += first
+        lines = first[:1] not in (b'[', u'[')
+        fp = _Prepend(head, fp)
+
+    decoded = (iter_json_lines if lines else iter_json_array)(fp, chunk_size)
+    for index, offset, length, value in decoded:
+        if not isinstance(value, Invalid):
+            try:
+                yield index, schema(value)
+                continue
+            except Invalid as e:
+                value = e.enrich(path=[index])
+
+        # Byte offsets
+        value.info.update(offset=offset, length=length)
+        for e in value:
+            e.info.update(offset=offset, length=length)
+        yield index, value
+
+
+class _Prepend(object):
+    """ File object wrapper that gives some data read in advance first """
+
+    def __init__(self, head, fp):
+        self.head = head
+        self.fp = fp
+
+    def read(self, size):
+        if self.head:
+            head, self.head = self.head, self.head[:0]
+            return head
+        return self.fp.read(size)
@@ -52,6 +52,7 @@ class Marker(object):
     Note that `execute()` is always called, regardless of whether the marker has matched anything:
     this gives markers a chance to modify the input to its taste.
     This opens the possibilities of implementing custom markers which validate the whole schema!
+    The only exception is when the marker reports with `is_noop()` that it has nothing to do.
 
     Finally, note that a marker does not necessarily decorate something: it can be used as a class:
 
@@ -163,6 +164,37 @@ class Marker(object):
         """
         return matches  # No-op by default
 
+    def is_noop(self, matched):
+        """ Tell whether `execute()` has nothing to do, so the compiler can skip calling it.
+
+        Markers that override `execute()` should override this method as well:
+        otherwise, they're executed every time.
+
+        :param matched: Whether the marker has matched anything
+        :type matched: bool
+        :rtype: bool
+        """
+        return type(self).execute is Marker.execute
+
+    def try_execute(self, d, matches):
+        """ Execute the marker, but report failures with a boolean instead of raising errors.
+
+        This is used by matchers (see `Schema.matches()`), which only need to know whether the input is valid.
+        The default implementation just catches the errors of `execute()`:
+        markers may override it to avoid creating exceptions.
+
+        :param d: The original user input
+        :type d: dict
+        :param matches: List of (input-key, sanitized-input-key, input-value) triples that matched the given marker
+        :type matches: list[tuple]
+        :returns: (is-okay, matches)
+        :rtype: (bool, list[tuple])
+        """
+        try:
+            return True, self.execute(d, matches)
+        except Invalid:
+            return False, matches
+
 
 class Required(Marker):
     """ `Required(key)` is used to decorate mapping keys and hence specify that these keys must always be present in
@@ -199,6 +231,19 @@ class Required(Marker):
     priority = 0
     error_message = _(u'Required key not provided')
 
+    def on_compiled(self, name=None, key_schema=None, value_schema=None, as_mapping_key=None):
+        super(Required, self).on_compiled(name, key_schema, value_schema, as_mapping_key)
+
+        # Resolve the `Default` behavior at compile time, rather than on the first missing key.
+        # Only for schemas that are safe to probe: other callables may fail on `Undefined` in any way,
+        # and are probed on the first missing key.
+        if value_schema is not None and self.value_schema is value_schema:
+            from ..validators import Default
+            if isinstance(value_schema.schema, Default) or \
+                    value_schema.get_schema_type(value_schema.schema) in (const.COMPILED_TYPE.LITERAL, const.COMPILED_TYPE.TYPE):
+                value_schema.supports_undefined
+        return self
+
     def execute(self, d, matches):
         # If a Required() key is present -- it expects to ALWAYS have one or more matches
 
@@ -216,6 +261,19 @@ class Required(Marker):
                 raise Invalid(self.error_message, self.name, _(u'-none-'), path)
         return matches
 
+    def is_noop(self, matched):
+        # Only has work to do when nothing has matched
+        return matched and type(self).execute is Required.execute
+
+    def try_execute(self, d, matches):
+        if matches or type(self).execute is not Required.execute:
+            return super(Required, self).try_execute(d, matches)
+
+        # Nothing has matched: only valid when the value schema supports Undefined
+        if self.value_schema.supports_undefined:
+            return super(Required, self).try_execute(d, matches)
+        return False, matches
+
 
 class Optional(Marker):
     """ `Optional(key)` is controversial to [`Required(key)`](#required): specified that the mapping key is not required.
@@ -309,6 +367,10 @@ class Remove(Marker):
         # Clean the list of matches so further processing does not assign them again
         return []
 
+    def is_noop(self, matched):
+        # Nothing to remove
+        return not matched and type(self).execute is Remove.execute
+
     def __call__(self, v):
         if not self.as_mapping_key:
             # When used on a value -- drop it
@@ -353,6 +415,15 @@ class Reject(Marker):
             raise MultipleInvalid.if_multiple(errors)
         return matches
 
+    def is_noop(self, matched):
+        # Nothing to complain on
+        return not matched and type(self).execute is Reject.execute
+
+    def try_execute(self, d, matches):
+        if type(self).execute is not Reject.execute:
+            return super(Reject, self).try_execute(d, matches)
+        return not matches, matches
+
 
 class Allow(Marker):
     """ `Allow(key)` is a no-op marker that never complains on anything.
@@ -436,6 +507,21 @@ class Extra(Marker):
         # However, CompiledSchema does this anyway at the next step, so doing nothing here
         return matches
 
+    def is_noop(self, matched):
+        if type(self).execute is not Extra.execute:
+            return False
+
+        # Delegated to the value marker
+        if isinstance(self.value_schema.compiled, Marker):
+            return self.value_schema.compiled.is_noop(matched)
+        return True
+
+    def try_execute(self, d, matches):
+        # Delegate to the value marker
+        if type(self).execute is Extra.execute and isinstance(self.value_schema.compiled, Marker):
+            return self.value_schema.compiled.try_execute(d, matches)
+        return super(Extra, self).try_execute(d, matches)
+
 
 class Entire(Optional):
     """ `Entire` is a convenience marker that validates the entire mapping using validators provided as a value.
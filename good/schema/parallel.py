@@ -0,0 +1,81 @@
+""" Parallel validation with a process pool.
+
+Validating lots of records one by one only uses a single core.
+`validate_many()` sends chunks of records to a pool of worker processes, each having its own copy of the `Schema`:
+since compiled schemas are closures, workers get the pickled schema definition, and compile it again.
+"""
+
+import multiprocessing
+
+from .errors import Invalid
+
+
+#: The schema used by the current worker process, see `_init_worker()`
+_worker_schema = None
+
+
+def _init_worker(schema):
+    """ Worker initializer: keep the schema
+
+    :type schema: good.Schema
+    """
+    global _worker_schema
+    _worker_schema = schema
+
+
+def _validate(schema, value):
+    """ Validate a single record
+
+    :return: (is-valid, sanitized-value|error)
+    :rtype: (bool, *)
+    """
+    try:
+        return True, schema(value)
+    except Invalid as e:
+        return False, e
+
+
+def _validate_in_worker(value):
+    """ Validate a single record in the worker process """
+    return _validate(_worker_schema, value)
+
+
+def validate_many(schema, values, workers=None, chunksize=100):
+    """ Validate the records in parallel, and yield the results in input order.
+
+    :param schema: The schema to validate the records with
+    :type schema: good.Schema
+    :param values: Iterable of records
+    :type values: collections.Iterable
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+
+        With `1` worker, records are validated serially in the current process.
+
+    :type workers: int|None
+    :param chunksize: The number of records sent to a worker at once
+    :type chunksize: int
+    :return: Generator of (is-valid, sanitized-value|error) for every record
+    :rtype: collections.Iterator[(bool, *)]
+    """
+    assert workers is None or workers >= 1, '`workers` must be a positive integer'
+    assert chunksize >= 1, '`chunksize` must be a positive integer'
+
+    # Serial
+    if workers == 1:
+        for value in values:
+            yield _validate(schema, value)
+        return
+
+    # Parallel
+    pool = multiprocessing.Pool(workers, _init_worker, (schema,))
+    try:
+        for result in pool.imap(_validate_in_worker, values, chunksize):
+            yield result
+    except BaseException:
+        # Failed, or the generator was closed early: stop the workers right away
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
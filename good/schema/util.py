@@ -1,6 +1,7 @@
 """ Misc utilities """
 
 import six
+import inspect
 import collections
 from datetime import date, time, datetime
 
@@ -36,6 +37,32 @@ class Undefined(object):
         return '<Undefined>'
 
 
+class LazyText(object):
+    """ Text which is only computed when it's needed.
+
+    Used for error messages: e.g. `LazyText(get_literal_name, v)` does not stringify a huge value unless it's read.
+
+    :param func: Function that computes the text
+    :type func: callable
+    :param args: Arguments for the function
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __call__(self):
+        """ Compute the text
+
+        :rtype: unicode
+        """
+        return self.func(*self.args)
+
+    def __repr__(self):
+        return repr(self())
+
+
 __type_names = {
     None:             _(u'None'),
     type(None):       _(u'None'),
@@ -114,6 +141,57 @@ def get_callable_name(c):
         return six.text_type(c)
 
 
+def get_match_method(c):
+    """ Get the `match(v)` method of a callable validator (see `ValidatorBase.match()`), if it can be trusted.
+
+    Only validators derived from `ValidatorBase` have this protocol: other callables might have an unrelated `match()`.
+    A subclass that only overrides `__call__` still inherits `match()`, which knows nothing about the override:
+    hence `match()` is only used when it's defined by the class that defines `__call__`, or by its subclass.
+
+    :type c: callable
+    :return: The bound `match()` method, or `None` if the callable has to be called
+    :rtype: callable|None
+    """
+    from ..validators.base import ValidatorBase  # circular import
+    if not isinstance(c, ValidatorBase):
+        return None
+
+    # Find the classes which define the methods
+    mro = inspect.getmro(type(c))
+    match_owner = next((i for i, cls in enumerate(mro) if 'match' in vars(cls)), None)
+    call_owner = next((i for i, cls in enumerate(mro) if '__call__' in vars(cls)), None)
+    if match_owner is None or call_owner is None or match_owner > call_owner:
+        return None
+    return c.match
+
+
+def get_prefetch_method(c):
+    """ Get the `prefetch(values)` method of a callable validator (see `ValidatorBase.prefetch()`), if it has one
+
+    :type c: callable
+    :return: The bound `prefetch()` method, or `None` if the validator does not override it
+    :rtype: callable|None
+    """
+    from ..validators.base import ValidatorBase  # circular import
+    if not isinstance(c, ValidatorBase):
+        return None
+    if six.get_unbound_function(type(c).prefetch) is six.get_unbound_function(ValidatorBase.prefetch):
+        return None
+    return c.prefetch
+
+
+def is_coroutine_callable(c):
+    """ Test whether the callable is a coroutine function, or an object with an `async def __call__()`
+
+    :type c: callable
+    :rtype: bool
+    """
+    iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)  # Python 3.5+
+    if iscoroutinefunction is None:
+        return False
+    return iscoroutinefunction(c) or (not inspect.isroutine(c) and iscoroutinefunction(getattr(c, '__call__', None)))
+
+
 def get_primitive_name(schema):
     """ Get a human-friendly name for the given primitive.
 
@@ -6,3 +6,4 @@ from .numbers import *
 from .strings import *
 from .dates import *
 from .files import *
+from .arrays import *
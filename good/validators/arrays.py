@@ -0,0 +1,143 @@
+from .base import ValidatorBase
+from .values import In, Length
+from .numbers import Range, Clamp
+from .. import Invalid
+from ..schema.util import get_type_name
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Array(ValidatorBase):
+    """ Validate a NumPy array: its dtype, shape and elements, without per-element Python calls.
+
+    In contrast to an [iterable schema](#iterables), which validates the elements one by one and builds a list,
+    this one uses vectorized operations, and returns the array itself:
+
+    ```python
+    import numpy as np
+    from good import Schema, Array, Range, Clamp
+
+    schema = Schema(Array(np.floating, (None, 3), Range(0, 1)))
+
+    schema(np.zeros((10, 3)))  #-> the same array
+    schema(np.ones((10, 2)))
+    #-> Invalid: Wrong array shape: expected (*, 3), got (10, 2)
+    schema(np.full((10, 3), 2.0))
+    #-> Invalid: Value must be at most 1 @ [0][0]: expected 1, got 2.0
+
+    schema = Schema(Array(elements=Clamp(0, 1)))
+    schema(np.array([-1., 0.5, 2.]))  #-> array([0., 0.5, 1.]) -- a clipped copy
+    ```
+
+    Element validators are applied in order. Supported ones:
+
+    * [`Range`](#range): elements must be in the range
+    * [`Clamp`](#clamp): out-of-range elements are clipped. A copy is returned when any element is clipped.
+    * [`In`](#in): elements must be in the collection
+    * [`Length`](#length): string elements must have the length in the range. Only for string arrays.
+
+    Only the first invalid element is reported, with its index in the `path`.
+
+    Requires `numpy`.
+
+    :param dtype: Expected dtype, or an abstract NumPy type like `numpy.floating`. Checked with `numpy.issubdtype()`.
+        `None` accepts any dtype.
+    :type dtype: numpy.dtype|type|str|None
+    :param shape: Expected shape. Use `None` for dimensions of any size. `None` accepts any shape.
+    :type shape: tuple|None
+    :param elements: Element validators
+    :type elements: Range|Clamp|In|Length|list
+    """
+
+    def __init__(self, dtype=None, shape=None, elements=()):
+        assert np is not None, 'Array() requires numpy'
+
+        # Elements
+        if not isinstance(elements, (list, tuple)):
+            elements = (elements,)
+        assert all(isinstance(e, (Range, Clamp, In, Length)) for e in elements), \
+            'Array() elements must be Range(), Clamp(), In() or Length()'
+        assert dtype is None or not any(isinstance(e, Length) for e in elements) or np.issubdtype(dtype, np.character), \
+            'Array() elements can only be Length() for string dtypes'
+
+        self.dtype = dtype
+        self.shape = None if shape is None else tuple(shape)
+        self.elements = tuple(elements)
+
+        # Prepare
+        self._in = [np.asarray(list(e.container)) for e in self.elements if isinstance(e, In)]
+        if dtype is None:
+            self.dtype_name = u''
+        elif isinstance(dtype, type) and issubclass(dtype, np.generic):
+            self.dtype_name = u'{}'.format(dtype.__name__)  # NumPy types, including abstract ones: `numpy.floating`
+        else:
+            self.dtype_name = u'{}'.format(np.dtype(dtype).name)
+        self.shape_name = u'' if shape is None else \
+            u'({})'.format(u', '.join(u'*' if d is None else u'{}'.format(d) for d in self.shape) +
+                           (u',' if len(self.shape) == 1 else u''))
+
+        # Name
+        self.name = _(u'Array({})').format(_(u', ').join(x for x in (self.dtype_name, self.shape_name) if x))
+
+    def __call__(self, v):
+        # Type
+        if not isinstance(v, np.ndarray):
+            raise Invalid(_(u'Wrong value type'), self.name, get_type_name(type(v)))
+
+        # Dtype
+        if self.dtype is not None and not np.issubdtype(v.dtype, self.dtype):
+            raise Invalid(_(u'Wrong array type'), self.dtype_name, u'{}'.format(v.dtype.name))
+
+        # Shape
+        if self.shape is not None and (
+                len(v.shape) != len(self.shape) or
+                any(d is not None and d != vd for d, vd in zip(self.shape, v.shape))):
+            raise Invalid(_(u'Wrong array shape'), self.shape_name, u'{}'.format(v.shape))
+
+        # Elements
+        ins = iter(self._in)
+        for validator in self.elements:
+            if isinstance(validator, (Range, Clamp)):
+                try:
+                    low = v < validator.min if validator.min is not None else np.zeros(v.shape, dtype=bool)
+                    high = v > validator.max if validator.max is not None else np.zeros(v.shape, dtype=bool)
+                except TypeError:  # cannot compare
+                    raise Invalid(_(u'Value should be a number'), _(u'Number'), u'{}'.format(v.dtype.name))
+
+                # Clamp: clip the array, if necessary
+                if isinstance(validator, Clamp):
+                    if low.any() or high.any():
+                        v = np.clip(v, validator.min, validator.max)
+                    continue
+
+                bad = low | high
+            elif isinstance(validator, In):
+                bad = ~np.isin(v, next(ins))
+            elif isinstance(validator, Length):
+                if not np.issubdtype(v.dtype, np.character):  # no lengths
+                    raise Invalid(_(u'Value should be a string'), _(u'String'), u'{}'.format(v.dtype.name))
+                lengths = np.char.str_len(v)
+                bad = np.zeros(v.shape, dtype=bool)
+                if validator.min is not None:
+                    bad |= lengths < validator.min
+                if validator.max is not None:
+                    bad |= lengths > validator.max
+
+            if bad.any():
+                # Report the first one: let the validator format the error
+                index = tuple(int(i) for i in np.argwhere(bad)[0])
+                element = v[index].item()
+                try:
+                    validator(element)
+                except Invalid as e:
+                    raise e.enrich(validator.name, u'{}'.format(element), list(index), validator)
+                raise Invalid(_(u'Invalid value'), validator.name, u'{}'.format(element), list(index), validator)
+
+        # Finish
+        return v
+
+
+__all__ = ('Array',)
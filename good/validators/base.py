@@ -1,5 +1,8 @@
 import six
 
+from .. import Invalid
+from ..schema.util import const
+
 
 class ValidatorBase(object):
     """ Base for class-based validators """
@@ -8,6 +11,11 @@ class ValidatorBase(object):
     #: Must be overridden in subclasses, and potentially hold the value
     name = u'???'
 
+    #: Whether the validator is pure: its result depends on the input value only, and it has no side effects.
+    #: Pure validators can be memoized with [`Cached`](#cached), while impure ones refuse that.
+    #: `None` means unknown.
+    pure = None
+
     def __call__(self, v):
         """ Do validation
 
@@ -17,6 +25,36 @@ class ValidatorBase(object):
         """
         raise NotImplementedError
 
+    def match(self, v):
+        """ Match the value: validate it, but report a failure without raising errors
+
+        The compiler uses it for mapping keys, which are matched against every key schema:
+        non-matching keys are perfectly normal there, and raising an `Invalid` just to discard it is a waste.
+
+        The default implementation calls the validator. Override it with a cheaper check
+        which accepts (and transforms) exactly the same values.
+
+        :param v: Input value
+        :return: (matched, sanitized-value). When not matched, the input value is returned as is.
+        :rtype: (bool, *)
+        """
+        try:
+            return True, self(v)
+        except (Invalid,) + const.transformed_exceptions:
+            return False, v
+
+    def prefetch(self, values):
+        """ Prepare for validating many values at once: e.g. look them all up concurrently, and cache the results
+
+        When the validator is a member of an iterable schema, the compiler calls it with the whole input iterable
+        before validating its values one by one. Values might be invalid: validation will report them.
+
+        The default implementation does nothing, and the compiler does not even call it.
+
+        :param values: Input values
+        :type values: iterable
+        """
+
     def __repr__(self):
         return self.name
 
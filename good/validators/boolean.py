@@ -63,6 +63,8 @@ class Truthy(ValidatorBase):
     ```
     """
 
+    pure = True
+
     @classmethod
     def truthy(cls, v):
         return bool(v)
@@ -82,6 +84,8 @@ class Falsy(ValidatorBase):
     Supplementary to [`Truthy`](#truthy).
     """
 
+    pure = True
+
     @classmethod
     def falsy(cls, v):
         return not bool(v)
@@ -125,6 +129,9 @@ class Boolean(ValidatorBase):
     schema(u'yes')  #-> True
     ```
     """
+
+    pure = True
+
     #: Case-insensitive constants for boolean strings
     _true_values_ci  = (u'y', u'Y', u'yes', u'Yes', u'YES', u'true',  u'True',  u'TRUE',  u'on',  u'On',  u'ON' )
     _false_values_ci = (u'n', u'N', u'no',  u'No',  u'NO',  u'false', u'False', u'FALSE', u'off', u'Off', u'OFF')
@@ -1,5 +1,8 @@
 from __future__ import division
+import re
+import sys
 import six
+import datetime as datetime_module
 from datetime import date, time, datetime, tzinfo, timedelta
 
 
@@ -21,6 +24,23 @@ class FixedOffset(tzinfo):
 
     ZERO = timedelta(0)
 
+    #: Interned instances, see `get()`
+    _instances = {}
+
+    @classmethod
+    def get(cls, offset):
+        """ Get a shared instance for the "+HHMM" formatted offset.
+
+        Timestamps carry just a few distinct offsets, so there's no point in creating a tzinfo for every value.
+
+        :type offset: str
+        :rtype: FixedOffset
+        """
+        try:
+            return cls._instances[offset]
+        except KeyError:
+            return cls._instances.setdefault(offset, cls(offset))
+
     @classmethod
     def parse_z(cls, offset):
         """ Parse %z offset into `timedelta` """
@@ -161,6 +181,10 @@ class DateTime(ValidatorBase):
     2. If is *naive* -- apply `localize` and make it *aware* (if `localize` is specified)
     3. If is *aware* -- apply `astz` to convert it (if `astz` is specified)
 
+    Formats made only of numeric directives (`%Y %m %d %H %M %S %f`, and `%z` on Python 3.7+) -- including ISO 8601 ones,
+    like `'%Y-%m-%dT%H:%M:%S.%f%z'` -- are parsed with a precompiled regular expression, which is much faster
+    than `strptime()`. The result is exactly the same.
+
     :param formats: Supported format string, or an iterable of formats to try them all.
     :type formats: str|Iterable[str]
     :param localize: Adjust *naive* `datetimes` to a timezone, making it *aware*.
@@ -179,10 +203,21 @@ class DateTime(ValidatorBase):
         Only called for *aware* `datetime`s, including those created by `localize`
 
     :type astz: datetime.tzinfo|Callable
+    :param adaptive: Try the formats that succeed more often first.
+
+        With many formats, most values fail with every format but one. When enabled, the validator counts the successes,
+        and moves each format ahead of the preceding one once it has succeeded more times.
+
+        Only enable it when the formats are unambiguous, that is, no value can be parsed with two of them:
+        otherwise, the result depends on the history.
+
+    :type adaptive: bool
     """
 
     name = get_type_name(datetime)
 
+    pure = True
+
     # Test whether Python supports %z
     try:
         datetime.strptime('+0000', '%z')
@@ -190,12 +225,37 @@ class DateTime(ValidatorBase):
     except:
         python_supports_z = False
 
-    def __init__(self, formats, localize=None, astz=None):
+    #: Regular expressions for the numeric directives: the same that `strptime()` uses
+    fast_directives = {
+        'Y': r'(?P<Y>\d\d\d\d)',
+        'm': r'(?P<m>1[0-2]|0[1-9]|[1-9])',
+        'd': r'(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])',
+        'H': r'(?P<H>2[0-3]|[0-1]\d|\d)',
+        'M': r'(?P<M>[0-5]\d|\d)',
+        'S': r'(?P<S>6[0-1]|[0-5]\d|\d)',
+        'f': r'(?P<f>[0-9]{1,6})',
+    }
+
+    #: Regular expression for %z: only the common offsets, others are parsed with `strptime()`.
+    #: Python < 3.7 accepts fewer offset formats, so they're always parsed with `strptime()`.
+    fast_z = r'(?P<z>(?-i:Z)|[+-]\d\d:?[0-5]\d)' if sys.version_info >= (3, 7) else None
+
+    #: Interned timezones for %z: { offset string: timezone }
+    _timezones = {}
+
+    def __init__(self, formats, localize=None, astz=None, adaptive=False):
         # Ensure a tuple
         self.formats = tuple([formats]
                              if isinstance(formats, six.string_types) else
                              formats)
 
+        # Parsers: (position, format, fast parser), in the order they're tried
+        self.parsers = tuple((i, format, self.compile_format(format)) for i, format in enumerate(self.formats))
+
+        # Adaptive order: the number of successes for every position
+        self.adaptive = adaptive
+        self.hits = [0] * len(self.formats)
+
         # Converters
         if isinstance(localize, tzinfo):
             self.localize = lambda dt: dt.replace(tzinfo=localize)
@@ -231,6 +291,75 @@ class DateTime(ValidatorBase):
                 raise
             six.reraise(RuntimeError, e)
 
+    @classmethod
+    def compile_format(cls, format):
+        """ Compile a format into a regular expression for fast parsing, if possible.
+
+        :param format: Format string
+        :type format: str
+        :return: (regexp, exhaustive), or `None` if the format has other directives.
+            `exhaustive` tells whether a mismatch means that `strptime()` would fail as well.
+        :rtype: (re.RegexObject, bool)|None
+        """
+        pattern = []
+        exhaustive = True
+        for directive, space, literal in re.findall(r'%(.)|(\s+)|(.)', format, re.S):
+            if directive in cls.fast_directives:
+                pattern.append(cls.fast_directives[directive])
+            elif directive == 'z' and cls.fast_z is not None:
+                pattern.append(cls.fast_z)
+                exhaustive = False
+            elif directive or literal == '%':
+                return None  # other directives, stray '%'
+            elif space:
+                pattern.append(r'\s+')  # like strptime() does
+            else:
+                pattern.append(re.escape(literal))
+
+        try:
+            return re.compile(u''.join(pattern) + r'\Z', re.IGNORECASE), exhaustive
+        except re.error:  # duplicate directives: let strptime() report that
+            return None
+
+    @classmethod
+    def fast_strptime(cls, match):
+        """ Make a datetime from the match of a fast parser regexp
+
+        :type match: re.MatchObject
+        :rtype: datetime
+        :raises ValueError: Invalid date
+        """
+        get = match.groupdict().get
+
+        # Timezone: looked up by the offset string
+        z = get('z')
+        if z is None:
+            tz = None
+        else:
+            try:
+                tz = cls._timezones[z]
+            except KeyError:
+                tz = cls._timezones.setdefault(z, cls.make_timezone(z))
+
+        f = get('f')
+        return datetime(int(get('Y') or 1900), int(get('m') or 1), int(get('d') or 1),
+                        int(get('H') or 0), int(get('M') or 0), int(get('S') or 0),
+                        int(f + '0' * (6 - len(f))) if f else 0,
+                        tz)
+
+    @classmethod
+    def make_timezone(cls, z):
+        """ Make a timezone for the %z offset string, just like `strptime()` does
+
+        :type z: str
+        :rtype: datetime.timezone
+        :raises ValueError: Invalid offset
+        """
+        if z == 'Z':
+            return datetime_module.timezone(timedelta(0))
+        offset = timedelta(hours=int(z[1:3]), minutes=int(z[-2:]))
+        return datetime_module.timezone(-offset if z[0] == '-' else offset)
+
     @classmethod
     def strptime(cls, value, format):
         """ Parse a datetime string using the provided format.
@@ -254,11 +383,20 @@ class DateTime(ValidatorBase):
 
             # Parse
             dt = datetime.strptime(value[:-5], format[:-2])  # cutoff '%z' and '+0000'
-            tz = FixedOffset(value[-5:])  # parse %z into tzinfo
+            tz = FixedOffset.get(value[-5:])  # parse %z into tzinfo
 
             # Localize
             return dt.replace(tzinfo=tz)
 
+    def promote(self, n):
+        """ Adaptive order: count a success of the parser at position `n`, and move it ahead if it's more successful """
+        parsers, hits = self.parsers, self.hits
+        i = parsers[n][0]
+        hits[i] += 1
+        if n and hits[i] > hits[parsers[n - 1][0]]:
+            # Replace the tuple at once: other threads may be iterating over it
+            self.parsers = parsers[:n - 1] + (parsers[n], parsers[n - 1]) + parsers[n + 1:]
+
     def __call__(self, v):
         # Input types
         if isinstance(v, datetime):
@@ -267,13 +405,25 @@ class DateTime(ValidatorBase):
             raise Invalid(_(u'Invalid value type'), provided=get_type_name(type(v)))
         else:
             # Try all formats
-            for format in self.formats:
+            for n, (i, format, fast) in enumerate(self.parsers):
                 # Parse
                 try:
-                    dt = self.strptime(v, format)
+                    if fast is None:
+                        dt = self.strptime(v, format)
+                    else:
+                        regexp, exhaustive = fast
+                        match = regexp.match(v)
+                        if match is not None:
+                            dt = self.fast_strptime(match)
+                        elif exhaustive:
+                            continue
+                        else:
+                            dt = self.strptime(v, format)
                 except ValueError:
                     continue
                 else:
+                    if self.adaptive:
+                        self.promote(n)
                     break
             else:
                 # Nothing worked
@@ -330,6 +480,8 @@ class Time(DateTime):
 
     name = get_type_name(time)
 
+    pure = False
+
     def __call__(self, v):
         if isinstance(v, time):
             v = datetime.combine(datetime.today(), v)
@@ -1,19 +1,188 @@
 import os
+import six
+import stat
+import threading
+from time import time
+from multiprocessing.pool import ThreadPool
+
 from .base import ValidatorBase
 from .. import Invalid
+from ..schema.cache import CompileCache
+
+
+class StatCache(CompileCache):
+    """ Cache of filesystem lookups, shared by the file validators.
+
+    Validating many paths costs a blocking `stat()` syscall per path, often for the very same paths over and over.
+    Pass a `StatCache` to [`PathExists`](#pathexists), [`IsFile`](#isfile), [`IsDir`](#isdir), and they only
+    look a path up once in `ttl` seconds:
+
+    ```python
+    from good import Schema, IsFile, IsDir, StatCache
+
+    cache = StatCache(maxsize=100000, ttl=60)
+    schema = Schema({'files': [IsFile(cache)], 'dirs': [IsDir(cache)]})
+
+    schema(manifest)
+    cache.info()  #-> CacheInfo(hits=..., misses=..., evictions=..., maxsize=100000, currsize=...)
+    ```
+
+    In addition, when a list of paths is validated with such a validator (e.g. `[IsFile(cache)]`),
+    paths missing from the cache are looked up concurrently on a thread pool before validation: see `prefetch()`.
+    The threads are started on first use, and are stopped with `close()`, or when used as a context manager:
+
+    ```python
+    with StatCache(maxsize=100000, ttl=60) as cache:
+        schema = Schema([IsFile(cache)])
+        schema(paths)
+    ```
+
+    Thread-safe.
+
+    :param maxsize: The maximum number of cached paths. `0` disables the cache.
+    :type maxsize: int
+    :param ttl: Time-to-live of cached lookups, seconds
+    :type ttl: float
+    :param workers: The number of threads for concurrent lookups. `0` disables concurrent lookups.
+    :type workers: int
+    """
+
+    def __init__(self, maxsize=10000, ttl=1.0, workers=8):
+        assert ttl > 0, '`ttl` must be positive'
+        assert workers >= 0, '`workers` must be a non-negative integer'
+        super(StatCache, self).__init__(maxsize)
+        self.ttl = ttl
+        self.workers = workers
+        self._pool = None  # created on first use
+        self._pool_lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires <= time():
+                self.misses += 1  # expired: dropped
+                return default
+            self._items[key] = (expires, value)  # move to the end
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        super(StatCache, self).put(key, (time() + self.ttl, value))
+
+    def stat(self, path):
+        """ Get the file mode of a path, using the cache
+
+        :param path: The path
+        :type path: str
+        :return: File mode (`st_mode`), or `None` if the path does not exist
+        :rtype: int|None
+        """
+        mode = self.get(path, _missing)
+        if mode is _missing:
+            mode = _stat(path)
+            self.put(path, mode)
+        return mode
+
+    def prefetch(self, paths):
+        """ Look up the paths missing from the cache concurrently, and cache them
+
+        Values which are not valid paths are ignored: validators will report them.
+
+        :param paths: Paths
+        :type paths: iterable
+        """
+        if not self.maxsize or not self.workers:
+            return
+
+        # Paths which are not cached, or have expired: they're looked up without touching the statistics
+        now = time()
+        with self._lock:
+            paths = list(set(p for p in paths
+                             if isinstance(p, six.string_types + (six.binary_type,)) and
+                             not (p in self._items and self._items[p][0] > now)))
+        if len(paths) < 2:
+            return  # not worth it
+
+        # Look them up concurrently
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            result = self._pool.map_async(_stat, paths, chunksize=max(1, len(paths) // (self.workers * 4)))
+        for path, mode in zip(paths, result.get()):
+            super(StatCache, self).put(path, (time() + self.ttl, mode))  # does not count as a miss
+
+    def close(self):
+        """ Stop the threads of concurrent lookups
+
+        The cache remains usable: threads are started again when needed.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            if pool is not None:
+                pool.close()  # lookups in progress are finished
+        if pool is not None:
+            pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+#: Marker for cache misses
+_missing = object()
+
+
+def _stat(path):
+    """ Get the file mode of a path: `None` if it does not exist """
+    try:
+        return os.stat(path).st_mode
+    except (OSError, ValueError):
+        return None
 
 
 class PathExists(ValidatorBase):
-    """ Verify that the path exists. """
+    """ Verify that the path exists.
+
+    :param cache: Filesystem lookups cache, shared by validators: see [`StatCache`](#statcache)
+    :type cache: StatCache|None
+    """
 
     name = u'Existing path'
 
-    def __init__(self):
+    pure = False
+
+    def __init__(self, cache=None):
         super(PathExists, self).__init__()
+        assert cache is None or isinstance(cache, StatCache), '`cache` must be a StatCache'
+        self.cache = cache
 
-    def __call__(self, v):
-        if not os.path.exists(v):
+    def stat(self, v):
+        """ Get the file mode of the path
+
+        :rtype: int
+        :raises Invalid: the path does not exist
+        """
+        mode = _stat(v) if self.cache is None else self.cache.stat(v)
+        if mode is None:
             raise Invalid(_(u'Path does not exist'), provided=u'Missing path')
+        return mode
+
+    def prefetch(self, values):
+        """ Prepare for validating many paths: look them up concurrently, when using a cache.
+
+        See `ValidatorBase.prefetch()`.
+        """
+        if self.cache is not None:
+            self.cache.prefetch(values)
+
+    def __call__(self, v):
+        self.stat(v)
         return v
 
 
@@ -34,8 +203,7 @@ class IsFile(PathExists):
     name = u'File path'
 
     def __call__(self, v):
-        super(IsFile, self).__call__(v)
-        if not os.path.isfile(v):
+        if not stat.S_ISREG(self.stat(v)):
             raise Invalid(_(u'Is not a file'), provided=u'Not a file')
         return v
 
@@ -46,11 +214,10 @@ class IsDir(PathExists):
     name = u'Directory path'
 
     def __call__(self, v):
-        super(IsDir, self).__call__(v)
-        if not os.path.isdir(v):
+        if not stat.S_ISDIR(self.stat(v)):
             raise Invalid(_(u'Is not a directory'), provided=u'Not a directory')
         return v
 
 
 
-__all__ = ('IsFile', 'IsDir', 'PathExists',)
+__all__ = ('IsFile', 'IsDir', 'PathExists', 'StatCache',)
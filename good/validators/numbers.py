@@ -27,6 +27,8 @@ class Range(ValidatorBase):
     :type max: int|float|None
     """
 
+    pure = True
+
     def __init__(self, min=None, max=None):
         # `min` validator
         self.min_error = lambda: Invalid(_(u'Value must be at least {min}').format(min=min), get_literal_name(min))
@@ -55,6 +57,13 @@ class Range(ValidatorBase):
         # Ok
         return v
 
+    def match(self, v):
+        try:
+            return not (self.min is not None and v < self.min or
+                        self.max is not None and v > self.max), v
+        except TypeError:
+            return False, v
+
 
 class Clamp(ValidatorBase):
     """ Clamp a value to the defined range, inclusive.
@@ -79,6 +88,8 @@ class Clamp(ValidatorBase):
     :type max: int|float|None
     """
 
+    pure = True
+
     def __init__(self, min=None, max=None):
         self.min = min
         self.max = max
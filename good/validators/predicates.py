@@ -1,6 +1,30 @@
+import six
+
 from .. import Schema, Invalid, MultipleInvalid, Required, Optional
+from ..schema.compiler import CompiledSchema
 from .base import ValidatorBase
-from ..schema.util import get_literal_name, const
+from ..schema.util import get_literal_name, get_match_method, const
+
+
+def _matcher(compiled):
+    """ Get a matcher for a sub-schema: a function which returns `(matched, sanitized-value)` instead of raising errors.
+
+    Validators with a `match()` method are matched without raising errors: see `ValidatorBase.match()`.
+
+    :type compiled: Schema
+    :rtype: callable
+    """
+    if compiled.compiled.compiled_type == const.COMPILED_TYPE.CALLABLE:
+        match = get_match_method(compiled.compiled.schema)
+        if match is not None:
+            return match
+
+    def match(v):
+        try:
+            return True, compiled(v)
+        except Invalid:
+            return False, v
+    return match
 
 
 class Maybe(ValidatorBase):
@@ -45,6 +69,7 @@ class Maybe(ValidatorBase):
         self.schema = Schema(schema)
         self.none = none
         self.name = _(u'{schema}?').format(schema=self.schema.name)
+        self._match = _matcher(self.schema)
 
     def __call__(self, v):
         # Empty & Default behavior
@@ -61,6 +86,11 @@ class Maybe(ValidatorBase):
             # Reraise
             raise
 
+    def match(self, v):
+        if v == self.none or v is const.UNDEFINED:
+            return True, self.none
+        return self._match(v)
+
 
 class Any(ValidatorBase):
     """ Try the provided schemas in order and use the first one that succeeds.
@@ -81,30 +111,110 @@ class Any(ValidatorBase):
     schema(0)  #-> 'false'
     ```
 
+    Alternatives are not tried blindly: types, literals, mappings and iterables can only succeed with values
+    of a certain type, so for every input type, `Any` remembers which alternatives are worth trying.
+    Types and literals are even checked inline, without raising errors.
+
     :param schemas: List of schemas to try.
+    :param adaptive: Try the alternatives that succeed more often first.
+
+        When enabled, `Any` counts the successes of every alternative, and moves each one ahead of the preceding
+        one once it has succeeded more times (for every input type separately).
+
+        Only enable it when no value can succeed with two of the alternatives: otherwise, the result depends on the history.
+        The error is the same anyway.
+    :type adaptive: bool
     """
 
-    def __init__(self, *schemas):
+    def __init__(self, *schemas, **kwargs):
+        adaptive = kwargs.pop('adaptive', False)
+        assert not kwargs, 'Unknown arguments: {}'.format(', '.join(kwargs))
+
         # Flatten (for the sake of friendlier error messages)
-        schemas = sum(tuple(s.compiled if type(s) == Any else (s,)
+        schemas = sum(tuple(s.schemas if type(s) == Any else (s,)
                             for s in schemas), ())
 
         # Compile
+        self.schemas = schemas
         self.compiled = tuple(Schema(schema) for schema in schemas)
 
         # Name
         self.name = _(u'Any({})').format(_(u'|'.join(x.name for x in self.compiled)))
 
-    def __call__(self, v):
+        # Alternatives: (position, schema type, schema, matcher)
+        self.alternatives = tuple((i, CompiledSchema.get_schema_type(schema), schema, _matcher(compiled))
+                                  for i, (schema, compiled) in enumerate(zip(schemas, self.compiled)))
+
+        # Dispatch table: { input type: alternatives to try }
+        self.dispatch = {}
+
+        # Adaptive order: the number of successes for every position
+        self.adaptive = adaptive
+        self.hits = [0] * len(self.alternatives)
+
+    def get_candidates(self, value_type):
+        """ Get the alternatives that can succeed for the input type
+
+        :type value_type: type
+        :rtype: tuple
+        """
+        candidates = []
+        for alternative in self.alternatives:
+            i, schema_type, schema, match = alternative
+            if schema_type == const.COMPILED_TYPE.TYPE and not (six.PY2 and schema is basestring):
+                if value_type is not schema:
+                    continue  # strict type check
+            elif schema_type == const.COMPILED_TYPE.LITERAL:
+                if value_type is not type(schema):
+                    continue  # strict type check
+            elif schema_type in (const.COMPILED_TYPE.MAPPING, const.COMPILED_TYPE.ITERABLE):
+                if not issubclass(value_type, type(schema)):
+                    continue  # isinstance() check
+                schema_type = None  # to be called
+            else:
+                schema_type = None  # opaque: to be called
+            candidates.append((i, schema_type, schema, match))
+        return tuple(candidates)
+
+    def promote(self, value_type, n):
+        """ Adaptive order: count a success of the candidate at position `n`, and move it ahead if it's more successful """
+        candidates, hits = self.dispatch[value_type], self.hits
+        i = candidates[n][0]
+        hits[i] += 1
+        if n and hits[i] > hits[candidates[n - 1][0]]:
+            # Replace the tuple at once: other threads may be iterating over it
+            self.dispatch[value_type] = candidates[:n - 1] + (candidates[n], candidates[n - 1]) + candidates[n + 1:]
+
+    def match(self, v):
+        value_type = type(v)
+        try:
+            candidates = self.dispatch[value_type]
+        except KeyError:
+            candidates = self.dispatch.setdefault(value_type, self.get_candidates(value_type))
+
         # Try schemas in order
-        for schema in self.compiled:
-            try:
-                return schema(v)
-            except Invalid:
-                pass
+        for n, (i, schema_type, schema, match) in enumerate(candidates):
+            if schema_type is None:
+                matched, value = match(v)
+                if not matched:
+                    continue
+            elif schema_type == const.COMPILED_TYPE.LITERAL and v != schema:
+                continue
+            else:
+                value = v
+
+            if self.adaptive:
+                self.promote(value_type, n)
+            return True, value
 
         # Nothing worked
-        raise Invalid(_(u'Invalid value'))
+        return False, v
+
+    def __call__(self, v):
+        matched, v = self.match(v)
+        if not matched:
+            raise Invalid(_(u'Invalid value'))
+        return v
 
 
 class All(ValidatorBase):
@@ -141,6 +251,7 @@ class All(ValidatorBase):
 
         # Name
         self.name = _(u'All({})').format(_(u' & '.join(x.name for x in self.compiled)))
+        self._matchers = tuple(map(_matcher, self.compiled))
 
     def __call__(self, v):
         # Apply schemas in order and transform the value iteratively
@@ -150,6 +261,13 @@ class All(ValidatorBase):
         # Finished
         return v
 
+    def match(self, v):
+        for match in self._matchers:
+            matched, v = match(v)
+            if not matched:
+                return False, v
+        return True, v
+
 
 class Neither(ValidatorBase):
     """ Value must not match any of the schemas.
@@ -188,20 +306,20 @@ class Neither(ValidatorBase):
             if len(self.compiled) == 1 else
             _(u'None({})')
         ).format(_(u','.join(x.name for x in self.compiled)))
+        self._matchers = tuple(map(_matcher, self.compiled))
 
     def __call__(self, v):
         # Try schemas in order
-        for schema in self.compiled:
-            try:
-                schema(v)
-            except Invalid:
-                pass  # error is okay
-            else:
+        for schema, match in zip(self.compiled, self._matchers):
+            if match(v)[0]:
                 raise Invalid(_(u'Value not allowed'), _(u'Not({})').format(schema.name), validator=schema.compiled.schema)
 
         # All ok
         return v
 
+    def match(self, v):
+        return not any(match(v)[0] for match in self._matchers), v
+
 
 class Inclusive(ValidatorBase):
     """ `Inclusive` validates the defined inclusive group of mapping keys:
@@ -82,6 +82,8 @@ class Match(ValidatorBase):
     :type expected: unicode
     """
 
+    pure = True
+
     def __init__(self, pattern, message=None, expected=None):
         self.rex = re.compile(pattern)  # accepts compiled patterns as well
         self.name = expected or _(u'(special format)')
@@ -101,6 +103,12 @@ class Match(ValidatorBase):
         else:
             return v
 
+    def match(self, v):
+        try:
+            return self.rex.match(v) is not None, v
+        except TypeError:
+            return False, v
+
 
 class Replace(Match):
     """ RegExp substitution.
@@ -153,6 +161,13 @@ class Replace(Match):
         else:
             return v
 
+    def match(self, v):
+        try:
+            replaced, n_subs = self.rex.subn(self.repl, v)
+        except TypeError:
+            return False, v
+        return (True, replaced) if n_subs else (False, v)
+
 
 class Url(ValidatorBase):
     """ Validate a URL, make sure it's in the absolute format, including the protocol.
@@ -173,6 +188,8 @@ class Url(ValidatorBase):
     :type protocols: str|list[str]
     """
 
+    pure = True
+
     _url_rex = r'^' \
                r'(?:' r'(?P<scheme>[^:]+)' r'://?)?' \
                r'(?:' r'(?P<auth>[^@/]+(?::[^@/]*)?)' r'@)?' \
@@ -1,6 +1,6 @@
 from .base import ValidatorBase
 from .. import Invalid
-from ..schema.util import get_primitive_name, get_type_name
+from ..schema.util import get_primitive_name, get_type_name, const
 
 
 class Type(ValidatorBase):
@@ -23,6 +23,9 @@ class Type(ValidatorBase):
 
     :type types: list[type]
     """
+
+    pure = True
+
     def __init__(self, *types):
         self.types = types
         self.name = _(u'|').join(get_type_name(x) for x in self.types)
@@ -34,6 +37,9 @@ class Type(ValidatorBase):
         # Fine
         return v
 
+    def match(self, v):
+        return isinstance(v, self.types), v
+
 
 class Coerce(ValidatorBase):
     """ Coerce a value to a type with the provided callable.
@@ -58,6 +64,8 @@ class Coerce(ValidatorBase):
     :type constructor: callable|type
     """
 
+    pure = True
+
     def __init__(self, constructor):
         self.constructor = constructor
         self.name = _(u'*{type}').format(type=get_primitive_name(constructor))
@@ -68,4 +76,10 @@ class Coerce(ValidatorBase):
         except (TypeError, ValueError):
             raise Invalid(_(u'Invalid value'))
 
+    def match(self, v):
+        try:
+            return True, self.constructor(v)
+        except (Invalid,) + const.transformed_exceptions:
+            return False, v
+
 __all__ = ('Type', 'Coerce',)
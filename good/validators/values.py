@@ -1,3 +1,4 @@
+import itertools
 import collections
 
 from .base import ValidatorBase
@@ -6,9 +7,9 @@ from ..schema.util import get_literal_name, get_type_name, get_primitive_name, c
 
 # Try to load Enum type (if supported)
 try:
-    from enum import EnumMeta as _EnumMeta
+    from enum import Enum as _Enum, EnumMeta as _EnumMeta
 except ImportError:
-    _EnumMeta = None
+    _Enum = _EnumMeta = None
 
 
 class In(ValidatorBase):
@@ -34,32 +35,60 @@ class In(ValidatorBase):
     :param container: Collection of allowed values.
 
         In addition to naive tuple/list/set/dict, this can be any object that supports `in` operation.
+        Lists and tuples of hashable values are looked up in a `frozenset` copy: no need to convert them.
     :type container: collections.Container
     """
 
+    pure = True
+
+    #: The max number of container members to show in the name
+    name_members = 10
+
     def __init__(self, container):
         assert isinstance(container, collections.Container), '`container` must support `in` operation'
         self.container = container
 
+        # Lists and tuples are scanned: freeze them into a set, if possible
+        self._set = None
+        if isinstance(container, (list, tuple)):
+            try:
+                self._set = frozenset(container)
+            except TypeError:  # unhashable members
+                pass
+
         # Name
         if isinstance(self.container, Map):
             self.name = self.container.name  # Inherit name
         else:
-            # Format
+            # Format: only the first few members
             if isinstance(self.container, collections.Iterable):
-                cs = _(u',').join(map(get_literal_name, self.container))
+                members = list(itertools.islice(self.container, self.name_members + 1))
+                cs = _(u',').join(map(get_literal_name, members[:self.name_members]))
+                if len(members) > self.name_members:
+                    cs += _(u',...')
             else:
                 cs = get_primitive_name(self.container)
             self.name = _(u'In({container})').format(container=cs)
 
+    def _contains(self, v):
+        if self._set is not None:
+            try:
+                return v in self._set
+            except TypeError:  # unhashable value: scan the container
+                pass
+        return v in self.container
+
     def __call__(self, v):
         # Test
-        if v not in self.container:
+        if not self._contains(v):
             raise Invalid(_(u'Unsupported value'))
 
         # Okay
         return v
 
+    def match(self, v):
+        return self._contains(v), v
+
 
 class Length(ValidatorBase):
     """ Validate that the provided collection has length in a certain range.
@@ -97,6 +126,8 @@ class Length(ValidatorBase):
     :type max: int|None
     """
 
+    pure = True
+
     def __init__(self, min=None, max=None):
         # `min` validator
         self.min_error = lambda length: Invalid(_(u'Too short ({min} is the least)').format(min=min),
@@ -129,6 +160,13 @@ class Length(ValidatorBase):
         # Ok
         return v
 
+    def match(self, v):
+        if not isinstance(v, collections.Sized):
+            return False, v
+        length = len(v)
+        return not (self.min is not None and length < self.min or
+                    self.max is not None and length > self.max), v
+
 
 class Default(ValidatorBase):
     """ Initialize a value to a default if it's not provided.
@@ -319,6 +357,8 @@ class Map(ValidatorBase):
     :param mode: Matching mode: one of Map.KEY, Map.VAL, Map.BOTH
     """
 
+    pure = True
+
     KEY = 1
     VAL = 2
     BOTH = KEY|VAL
@@ -347,6 +387,14 @@ class Map(ValidatorBase):
                 self.lookup = lambda k: k if isinstance(k, enum) else self.enum[k]
             if self.mode & self.VAL:
                 self.rlookup = lambda v: self.enum(v)
+
+            # Merged table.
+            # Members themselves are not in the table: e.g. `IntEnum` members are equal to their values.
+            table = {}
+            if self.mode & self.VAL:
+                table.update(getattr(enum, '_value2member_map_', {}))
+            if self.mode & self.KEY:
+                table.update(enum.__members__)
         else:
             # Object?
             if not isinstance(enum, collections.Mapping):
@@ -366,34 +414,71 @@ class Map(ValidatorBase):
                 self.mapping_rev = {v: k for k, v in self.mapping.items()}
                 self.rlookup = lambda v: self.mapping_rev[v]
 
-    def __getitem__(self, v):
+            # Merged table
+            table = {}
+            if self.mode & self.VAL:
+                table.update(self.mapping_rev)
+            if self.mode & self.KEY:
+                table.update(self.mapping)  # forward lookup goes first
+
+        #: Merged lookup table for all modes: one probe per value.
+        #: Unhashable values, as well as enums with a custom `_missing_()`, still use `lookup` and `rlookup`.
+        self.table = table
+        missing = getattr(self.enum, '_missing_', None)
+        self._fallback = bool(self.mode & self.VAL) and missing is not None and \
+            missing.__func__ is not _Enum._missing_.__func__
+
+    def _find(self, v):
+        """ Look the value up
+
+        :return: (found, mapped-value)
+        :rtype: (bool, *)
+        """
+        # Enum members pass through
+        if self.enum is not None and isinstance(v, self.enum):
+            return True, v
+
+        # Table
+        try:
+            return True, self.table[v]
+        except KeyError:
+            if not self._fallback:
+                return False, None
+        except TypeError:  # unhashable
+            pass
+
         # Try both forward and reverse lookups
         for lookup in (self.lookup, self.rlookup):
             # If enabled
             if lookup:
                 try:
                     # Try to get the mapped value
-                    return lookup(v)
+                    return True, lookup(v)
                 except Exception as e:
                     # Ok, try again
                     pass
 
         # Nothing worked
-        raise KeyError(v)
+        return False, None
+
+    def __getitem__(self, v):
+        found, value = self._find(v)
+        if not found:
+            raise KeyError(v)
+        return value
 
     def __contains__(self, v):
-        try:
-            self[v]
-        except KeyError:
-            return False
-        else:
-            return True
+        return self._find(v)[0]
 
     def __call__(self, v):
-        try:
-            return self[v]
-        except KeyError:
+        found, value = self._find(v)
+        if not found:
             raise Invalid(_(u'Unsupported value'))
+        return value
+
+    def match(self, v):
+        found, value = self._find(v)
+        return (True, value) if found else (False, v)
 
 
 __all__ = ('In', 'Length', 'Default', 'Fallback', 'Map')
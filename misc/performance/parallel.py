@@ -0,0 +1,67 @@
+#! /usr/bin/env python
+
+""" Parallel validation benchmark: serial loop vs `Schema.validate_many()` with worker processes.
+
+Uses random dictionary schemas from the [performance test](performance.py), and compares the serial loop
+with process pools of different sizes.
+"""
+
+from __future__ import print_function, division
+
+import good
+from performance import generate_dict_schema
+
+import multiprocessing
+from datetime import datetime
+
+
+def serial(schema, samples):
+    """ The serial loop, as in the performance test """
+    for sample in samples:
+        try:
+            schema(sample)
+        except good.Invalid as e:
+            # Ignore errors
+            pass
+
+
+def parallel(schema, samples, workers, chunksize):
+    """ Validate with `Schema.validate_many()` """
+    for okay, result in schema.validate_many(samples, workers=workers, chunksize=chunksize):
+        pass
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='Parallel')
+    parser.add_argument('samples', type=int, help='The number of samples to test with')
+    parser.add_argument('size', type=int, help='Dictionary size')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help='The max number of workers')
+    parser.add_argument('--chunksize', type=int, default=1000, help='The number of samples per chunk')
+    args = parser.parse_args()
+
+    # Half of the samples are invalid
+    samples = []
+    for valid in (True, False):
+        schema, gen = generate_dict_schema(args.size, valid)
+        samples.extend(sample for i, sample in zip(range(0, args.samples // 2), gen))
+    compiled_schema = good.Schema(schema)
+
+    # Serial
+    start = datetime.utcnow()
+    serial(compiled_schema, samples)
+    t_serial = (datetime.utcnow() - start).total_seconds()
+    print('{mode:<12} time: {sec: 8.4f}s  vps: {vps: 10.2f}'.format(mode='serial', sec=t_serial, vps=len(samples) / t_serial))
+
+    # Parallel
+    for workers in range(1, args.workers + 1):
+        start = datetime.utcnow()
+        parallel(compiled_schema, samples, workers, args.chunksize)
+        t = (datetime.utcnow() - start).total_seconds()
+        print('{mode:<12} time: {sec: 8.4f}s  vps: {vps: 10.2f}  speedup: {speedup: 5.2f}x'.format(
+            mode='workers={}'.format(workers),
+            sec=t,
+            vps=len(samples) / t,
+            speedup=t_serial / t
+        ))
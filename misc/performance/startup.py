@@ -0,0 +1,82 @@
+#! /usr/bin/env python
+
+""" Startup benchmark: eager vs lazy schema compilation.
+
+Generates a huge nested schema, and measures how long it takes to compile it and validate a sample
+which only uses a small fraction of the schema.
+"""
+
+from __future__ import print_function, division
+
+import good
+from good.schema.compiler import CompiledSchema
+
+from datetime import datetime
+
+
+def generate_nested_schema(width, depth):
+    """ Generate a nested schema of optional sections, and a sample which only uses the first section of each level
+
+    :param width: The number of sections on every level
+    :type width: int
+    :param depth: Nesting depth
+    :type depth: int
+    :returns: schema, sample
+    :rtype: dict, dict
+    """
+    if depth == 0:
+        return {good.Optional('k{}'.format(i)): int for i in range(width)}, {'k0': 0}
+
+    sub_schema, sub_sample = generate_nested_schema(width, depth - 1)
+    schema = {good.Optional('s{}'.format(i)): dict(sub_schema, n=int) for i in range(width)}
+    schema.update({good.Optional('l{}'.format(i)): [dict(sub_schema)] for i in range(width)})
+    return schema, {'s0': dict(sub_sample, n=0)}
+
+
+def count_nodes(schema):
+    """ Count nodes in the schema definition """
+    if isinstance(schema, dict):
+        return sum(1 + count_nodes(v) for v in schema.values())
+    elif isinstance(schema, list):
+        return sum(count_nodes(v) for v in schema)
+    return 1
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='Startup')
+    parser.add_argument('width', type=int, help='The number of sections on every level')
+    parser.add_argument('depth', type=int, help='Nesting depth')
+    parser.add_argument('repeat', type=int, nargs='?', default=5, help='The number of runs')
+    parser.add_argument('--cache', action='store_true', help='Use the compiled schemas cache')
+    args = parser.parse_args()
+
+    # Identical sub-schemas are only compiled once when the cache is used
+    if not args.cache:
+        CompiledSchema.cache.maxsize = 0
+
+    schema, sample = generate_nested_schema(args.width, args.depth)
+    print('Schema nodes: {}'.format(count_nodes(schema)))
+
+    for lazy in (False, True):
+        best_compile = best_first_use = None
+        for i in range(args.repeat):
+            CompiledSchema.cache.clear()
+
+            start = datetime.utcnow()
+            compiled_schema = good.Schema(schema, default_keys=good.Optional, lazy=lazy)
+            compiled = datetime.utcnow()
+            compiled_schema(sample)
+            used = datetime.utcnow()
+
+            t_compile, t_first_use = (compiled - start).total_seconds(), (used - compiled).total_seconds()
+            best_compile = min(t_compile, best_compile or t_compile)
+            best_first_use = min(t_first_use, best_first_use or t_first_use)
+
+        print('{mode:<6} compile: {compile: 8.4f}s  first use: {first_use: 8.4f}s  total: {total: 8.4f}s'.format(
+            mode='lazy' if lazy else 'eager',
+            compile=best_compile,
+            first_use=best_first_use,
+            total=best_compile + best_first_use
+        ))
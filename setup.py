@@ -24,6 +24,7 @@ setup(
         'six >= 1.7.3',
     ],
     extras_require={
+        'numpy': ['numpy'],  # Schema.validate_batch(), Array()
     },
     include_package_data=True,
     test_suite='nose.collector',
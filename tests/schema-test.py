@@ -1,18 +1,25 @@
 from __future__ import print_function
+import sys
 import six
 import unittest
 import collections
 from datetime import datetime, date, time, timedelta
+import re
 import json
+import pickle
 from random import shuffle
+from time import sleep
 from copy import deepcopy
 import enum
 import pytz
 
 from good import *
 from good.schema.markers import Marker
-from good.schema.util import get_type_name, Undefined, const
+from good.validators.base import ValidatorBase
+from good.schema.cache import CompileCache
+from good.schema.util import get_type_name, get_literal_name, Undefined, const
 from good.validators.dates import FixedOffset
+from good.validators.arrays import np
 
 
 class s:
@@ -340,6 +347,51 @@ class SchemaCoreTest(GoodTestBase):
         self.assertInvalid(schema, [{'age': 10}, {'age': 20}, {'age': None}],
                            Invalid(s.es_type, s.t_int, s.t_none, [2, 'age'], int))
 
+        # Validators prefetch values: see ValidatorBase.prefetch()
+        class Prefetching(ValidatorBase):
+            name = u'Prefetching'
+            prefetched = []
+            def prefetch(self, values):
+                self.prefetched.append(list(values))
+            def __call__(self, v):
+                return v
+
+        def not_a_validator(v):
+            return v
+        not_a_validator.prefetch = lambda values: self.fail('Must not be called')
+
+        self.assertValid(Schema([Prefetching()]), [1, 2])
+        self.assertEqual(Prefetching.prefetched, [[1, 2]])
+        self.assertValid(Schema([not_a_validator, Range(0, 10)]), [1, 2])
+
+    def test_iterable_identity(self):
+        """ Test Schema(<iterable>): containers are only copied when some value changes """
+        schema = Schema([int, six.text_type, [int], {u'a': Range(0, 10)}])
+        value = [1, u'a', [2, 3], {u'a': 1}]
+        self.assertIs(schema(value), value)
+        self.assertIs(schema.matches(value)[1], value)
+        self.assertIs(Schema((int,))((1, 2)).__class__, tuple)
+
+        # Copy-on-write
+        schema = Schema([int, [Coerce(int)], Remove(float)])
+        value = [1, 2, [u'3'], 4.0, 5]
+        sanitized = schema(value)
+        self.assertEqual(sanitized, [1, 2, [3], 5])
+        self.assertIsNot(sanitized, value)
+        self.assertEqual(value, [1, 2, [u'3'], 4.0, 5])  # not modified
+
+        value = [1, 4.0]
+        self.assertEqual(schema(value), [1])
+        value = [1, [2]]
+        self.assertIs(schema(value)[1], value[1])
+
+        # Subclasses are still typecast
+        class MyList(list): pass
+        value = MyList([1, 2])
+        sanitized = Schema([int])(value)
+        self.assertEqual(sanitized, [1, 2])
+        self.assertIs(type(sanitized), list)
+
     def test_callable(self):
         """ Test Schema(<callable>) """
         def intify(v):
@@ -497,6 +549,68 @@ class SchemaCoreTest(GoodTestBase):
             Invalid(u'Required key not provided', u'multikey_validate()', s.v_no, [], Required(abc)),
         ]))
 
+    def test_mapping_matchers(self):
+        """ Test Schema(<mapping>), validators as keys: matched with match() """
+        class Even(ValidatorBase):
+            name = u'Even'
+            calls = 0
+            def __call__(self, v):
+                raise AssertionError('Must not be called')
+            def match(self, v):
+                self.calls += 1
+                return isinstance(v, int) and v % 2 == 0, v
+
+        even = Even()
+        schema = Schema({
+            even: str,
+            Optional(Match(r'^x')): int,
+            Optional(All(Coerce(int), Range(100, 200))): bool,
+            Optional(In([u'a', u'b'])): float,
+        })
+        self.assertValid(schema, {2: u'a', u'x1': 1, u'150': True, u'a': 1.0},
+                                 {2: u'a', u'x1': 1, 150: True, u'a': 1.0})
+        self.assertEqual(even.calls, 4)
+        self.assertInvalid(schema, {2: u'a', 3: u'b'},
+                           Invalid(s.es_extra, s.v_no, u'3', [3], Extra))
+
+        # match() agrees with __call__()
+        validators = [
+            Type(int), Coerce(int), Match(r'^\d+$'), Replace(r'\d', u'#'), Email(),
+            In([1, u'1', [1]]), Range(0, 10), Length(1, 2), Map({u'a': 1}, Map.BOTH),
+            Maybe(int), Any(int, Coerce(int)), All(Coerce(int), Range(0, 10)), Neither(int), Boolean(),
+        ]
+        for validator in validators:
+            for v in (None, 0, 1, 20, 1.5, u'', u'1', u'a', u'a@b', [], [1], [1, 2, 3], {u'a': 1}):
+                try:
+                    expected = True, validator(v)
+                except (Invalid, TypeError, ValueError):
+                    expected = False, v
+                self.assertEqual(validator.match(v), expected, (validator, v))
+
+        # Subclasses which only override __call__() are called: the inherited match() knows nothing about it
+        class InUpper(In):
+            def __call__(self, v):
+                return super(InUpper, self).__call__(v.upper() if isinstance(v, six.text_type) else v)
+
+        schema = Schema({Optional(InUpper([u'A'])): int})
+        self.assertValid(schema, {u'a': 1}, {u'A': 1})
+        self.assertEqual(schema.matches({u'a': 1}), (True, {u'A': 1}))
+        self.assertEqual(Schema(Any(InUpper([u'A']), None)).matches(u'a'), (True, u'A'))
+
+        # Other callables are called: their match() might be unrelated
+        class Pattern(object):
+            def __init__(self, pattern):
+                self.pattern = re.compile(pattern)
+            def match(self, v):
+                return self.pattern.match(v)
+            def __call__(self, v):
+                if not self.match(v):
+                    raise Invalid(u'Mismatch')
+                return v.upper()
+
+        self.assertEqual(Schema(Any(Pattern(u'a'), int))(u'abc'), u'ABC')
+        self.assertValid(Schema({Pattern(u'a'): int}), {u'abc': 1}, {u'ABC': 1})
+
     def test_mapping_markers(self):
         """ Test Schema(<mapping>), with Markers """
         # Required, literal
@@ -679,6 +793,624 @@ class SchemaCoreTest(GoodTestBase):
         assertValid(schema, {100: None}, {100: 'Extra'})
         schema.pop(Extra)
 
+    def test_mapping_index(self):
+        """ Test Schema(<mapping>), literal keys index """
+        # Lots of optional keys, input has only a few of them
+        schema = Schema(dict({Optional(i): int for i in range(1000)}, name=six.text_type))
+
+        self.assertValid(schema, {'name': u'A'})  # exact keyset
+        self.assertValid(schema, {'name': u'A', 1: 1, 999: 999})
+        self.assertInvalid(schema, {1: 1},
+                           Invalid(s.es_required, u'name', s.v_no, ['name'], Required('name')))
+        self.assertInvalid(schema, {'name': u'A', 1: None, 1000: 1}, MultipleInvalid([
+            Invalid(s.es_type, s.t_int, s.t_none, [1], int),
+            Invalid(s.es_extra, s.v_no, u'1000', [1000], Extra),
+        ]))
+
+        # Non-literal keys with higher priority still win over literals
+        schema = Schema({
+            Remove(six.text_type): None,
+            u'a': int,
+            u'b': int,
+        }, default_keys=Optional)
+
+        self.assertValid(schema, {u'a': 1, u'b': 2}, {})
+
+    def test_mapping_dispatch(self):
+        """ Test Schema(<mapping>), type dispatch for non-literal keys """
+        calls = []
+        def x_key(k):
+            calls.append(k)
+            assert isinstance(k, six.binary_type) and k.startswith(b'x_')
+            return k[2:]
+
+        schema = Schema({
+            int: int,
+            six.text_type: six.text_type,
+            x_key: bool,
+            Extra: float,
+        }, default_keys=Optional)
+
+        # Type keys go to their schemas, and only the opaque callable is tried on other types
+        self.assertValid(schema, {1: 1, u'a': u'b', b'x_y': True, 0.5: 1.0}, {1: 1, u'a': u'b', b'y': True, 0.5: 1.0})
+        self.assertEqual(set(calls), {b'x_y', 0.5})
+
+        self.assertInvalid(schema, {1: u'a', u'b': 1}, MultipleInvalid([
+            Invalid(s.es_type, s.t_int, s.t_unicode, [1], int),
+            Invalid(s.es_type, s.t_unicode, s.t_int, [u'b'], six.text_type),
+        ]))
+
+    def test_mapping_plan(self):
+        """ Test Schema(<mapping>), markers are classified at compile time """
+        calls = []
+        def default(v):
+            calls.append(v)
+            return 0 if v is const.UNDEFINED else v
+
+        class CountingOptional(Optional):
+            noops = 0
+            def is_noop(self, matched):
+                CountingOptional.noops += 1
+                return super(CountingOptional, self).is_noop(matched)
+
+        schema = Schema({
+            u'a': default,
+            u'c': Default(1),
+            CountingOptional(u'd'): int,
+        }, default_keys=Required)
+        self.assertEqual(len(calls), 0)  # callables are not probed at compile time: only `Default`, types & literals
+        noops = CountingOptional.noops
+
+        for i in range(3):
+            self.assertValid(schema, {u'd': 1}, {u'a': 0, u'c': 1, u'd': 1})
+        self.assertValid(schema, {u'a': 1, u'c': 1})
+        self.assertEqual(len(calls), 1 + 3 * 2 + 1)  # probed once: then the default is made, then validated
+        self.assertEqual(CountingOptional.noops, noops)  # never asked again
+
+        # `Remove` does not provide a default
+        schema = Schema({u'b': Remove})
+        self.assertInvalid(schema, {},
+                           Invalid(s.es_required, u'b', s.v_no, [u'b'], Required(u'b')))
+
+        # Callables that fail on `Undefined` with other errors do not break compilation
+        strip = lambda v: v.strip()
+        schema = Schema({u'name': strip})
+        self.assertValid(schema, {u'name': u' a '}, {u'name': u'a'})
+        with self.assertRaises(AttributeError) as ecm:  # lazy probe, just like it used to be
+            schema({})
+        self.assertIn('strip', str(ecm.exception))  # the real error
+
+    def test_compile_cache(self):
+        """ Test compiled schemas cache """
+        compiled_schema_cls = Schema.compiled_schema_cls
+        cache = compiled_schema_cls.cache
+        compiled_schema_cls.cache = CompileCache(3)
+        try:
+            # Identical schemas are compiled once
+            a = Schema({'a': [int, six.text_type]})
+            b = Schema({'a': [int, six.text_type]})
+            self.assertIs(a.compiled, b.compiled)
+            self.assertEqual(compiled_schema_cls.cache.info().hits, 1)
+
+            # Different schemas & settings are not mixed up
+            self.assertIsNot(a.compiled, Schema({'a': [int, six.binary_type]}).compiled)
+            self.assertIsNot(a.compiled, Schema({'a': [int, six.text_type]}, default_keys=Optional).compiled)
+            self.assertIsNot(Schema(1).compiled, Schema(True).compiled)
+
+            self.assertValid(b, {'a': [1, u'a']})
+            self.assertInvalid(b, {}, Invalid(s.es_required, u'a', s.v_no, ['a'], Required('a')))
+
+            # Evictions
+            info = compiled_schema_cls.cache.info()
+            self.assertEqual(info.currsize, 3)
+            self.assertGreater(info.evictions, 0)
+
+            # Markers are never cached
+            self.assertIsNot(Schema(Optional('a')).compiled, Schema(Optional('a')).compiled)
+        finally:
+            compiled_schema_cls.cache = cache
+
+    def test_lazy(self):
+        """ Test Schema(lazy=True) """
+        schema = Schema({
+            'a': {'b': int},
+            Optional('c'): [{'d': int}],
+            Optional('e'): {'f': Ellipsis},  # malformed
+        }, lazy=True)
+
+        # Nested schemas are compiled on first use
+        self.assertValid(schema, {'a': {'b': 1}})
+        self.assertValid(schema, {'a': {'b': 1}, 'c': [{'d': 1}]})
+        self.assertInvalid(schema, {'a': {'b': None}},
+                           Invalid(s.es_type, s.t_int, s.t_none, ['a', 'b'], int))
+        self.assertRaises(SchemaError, schema, {'a': {'b': 1}, 'e': {}})
+
+        # Eager compilation fails immediately
+        self.assertRaises(SchemaError, Schema, {Optional('e'): {'f': Ellipsis}})
+
+        # Deferred compilation publishes nothing until it succeeds
+        compiled = Schema.compiled_schema_cls({'f': Ellipsis}, [], deferred=True)
+        self.assertRaises(SchemaError, getattr, compiled, 'name')
+        self.assertNotIn('name', compiled.__dict__)
+        self.assertNotIn('compiled_type', compiled.__dict__)
+
+    def test_matches(self):
+        """ Test Schema.matches(), Schema.is_valid() """
+        class Color(enum.Enum):
+            RED = 1
+
+        def assertMatches(schema, value):
+            """ Check that the matcher agrees with the validator """
+            try:
+                expected = True, schema(deepcopy(value))
+            except Invalid:
+                expected = False
+            okay, sanitized = schema.matches(deepcopy(value))
+            self.assertEqual(expected, (okay, sanitized) if okay else False, repr(value))
+            self.assertEqual(schema.is_valid(deepcopy(value)), okay)
+
+        schema = Schema({
+            'name': six.text_type,
+            'tags': [six.text_type, Remove(int)],
+            Optional('color'): Color,
+            Optional('age'): lambda v: int(v),
+            Optional('nested'): {'a': int, Optional('b'): Default(0)},
+            Remove('password'): str,
+            Reject('admin'): bool,
+            int: int,
+            Entire: lambda d: d,
+        })
+
+        for value in (
+            {'name': u'A', 'tags': []},
+            {'name': u'A', 'tags': [u'a', 1, u'b']},
+            {'name': u'A', 'tags': [None]},
+            {'name': u'A', 'tags': ()},
+            {'name': u'A', 'tags': [], 'color': 1},
+            {'name': u'A', 'tags': [], 'color': 2},
+            {'name': u'A', 'tags': [], 'age': '18'},
+            {'name': u'A', 'tags': [], 'age': 'x'},
+            {'name': u'A', 'tags': [], 'nested': {'a': 1}},
+            {'name': u'A', 'tags': [], 'nested': {'a': None}},
+            {'name': u'A', 'tags': [], 'nested': {}},
+            {'name': u'A', 'tags': [], 'password': None},
+            {'name': u'A', 'tags': [], 'admin': True},
+            {'name': u'A', 'tags': [], 1: 1, 2: 2},
+            {'name': u'A', 'tags': [], 1: None},
+            {'name': u'A', 'tags': [], 'extra': 1},
+            {'tags': []},
+            [],
+        ):
+            assertMatches(schema, value)
+
+        assertMatches(Schema([{'a': int}]), [{'a': 1}, {'a': 2}])
+        assertMatches(Schema([{'a': int}]), [{'a': 1}, {'a': None}])
+        assertMatches(Schema({'a': int}, extra_keys=Allow), {'a': 1, 'b': 2})
+        assertMatches(Schema({'a': int}, extra_keys=Remove), {'a': 1, 'b': 2})
+
+        # The value is never modified
+        for value in (
+            {'name': u'A', 'tags': [], 'age': '18', 'nested': {'a': 1}, 'password': None},
+            {'name': u'A', 'tags': [], 'age': '18', 'nested': {'a': 1}, 'password': None, 'admin': True},
+        ):
+            original = deepcopy(value)
+            schema.matches(value)
+            self.assertEqual(value, original)
+        value = {'name': u'A', 'tags': []}
+        self.assertIs(schema.matches(value)[1], value)  # nothing has changed: no copies
+
+    def test_fail_fast(self):
+        """ Test Schema(fail_fast=True) """
+        calls = []
+        def expensive(v):
+            calls.append(v)
+            return int(v)
+
+        # Iterable: stops at the first error
+        schema = Schema([expensive], fail_fast=True)
+        self.assertValid(schema, ['1', '2'], [1, 2])
+        del calls[:]
+        self.assertInvalid(schema, ['a', 'b', 'c'],
+                           Invalid(s.PY_STR2INT_MESSAGE, u'expensive()', u'a', [0], expensive))
+        self.assertEqual(calls, ['a'])
+
+        # Mapping: cheap checks go first
+        schema = Schema({
+            'a': expensive,
+            'b': int,
+            'c': [int],
+            Entire: lambda d: d if isinstance(d['a'], int) else None,
+        }, fail_fast=True)
+        self.assertValid(schema, {'a': '1', 'b': 1, 'c': []}, {'a': 1, 'b': 1, 'c': []})
+
+        del calls[:]
+        self.assertInvalid(schema, {'a': '1', 'b': None, 'c': []},
+                           Invalid(s.es_type, s.t_int, s.t_none, ['b'], int))  # not MultipleInvalid
+        self.assertInvalid(schema, {'a': '1', 'c': None},
+                           Invalid(s.es_required, u'b', s.v_no, ['b'], Required('b')))
+        self.assertInvalid(schema, {'a': '1', 'b': 1, 'c': [], 'd': 1},
+                           Invalid(s.es_extra, s.v_no, u'd', ['d'], Extra))
+        self.assertEqual(calls, [])
+
+    def test_max_errors(self):
+        """ Test Schema(max_errors=), Schema(aggregate_errors=True) """
+        # Iterable: stops once the budget is exhausted
+        schema = Schema([int], max_errors=2)
+        with self.assertRaises(MultipleInvalid) as ecm:
+            schema(['a', 'b', 'c', 'd'])
+        self.assertEqual([e.path for e in ecm.exception], [[0], [1]])
+
+        # Nested: the budget applies to all errors
+        schema = Schema({'a': [int], 'b': [int]}, max_errors=3)
+        with self.assertRaises(MultipleInvalid) as ecm:
+            schema({'a': ['a', 'b'], 'b': ['a', 'b']})
+        self.assertEqual(len(ecm.exception.errors), 3)
+
+        # Aggregation: runs of identical errors at consecutive indices
+        schema = Schema([int], aggregate_errors=True)
+        self.assertValid(schema, [1, 2], [1, 2])
+        with self.assertRaises(MultipleInvalid) as ecm:
+            schema([u'a', u'b', u'c', 1, u'd', None, 2, u'e'])
+        self.assertEqual([(e.path, e.provided, e.info) for e in ecm.exception], [
+            ([0], s.t_unicode, {'index_range': (0, 2), 'count': 3}),
+            ([4], s.t_unicode, {'index_range': (4, 5), 'count': 2}),  # provided value is not compared
+            ([7], s.t_unicode, {}),
+        ])
+
+        # Aggregation: relative paths have to match
+        schema = Schema([{'a': int, 'b': int}], aggregate_errors=True)
+        with self.assertRaises(MultipleInvalid) as ecm:
+            schema([{'a': 1, 'b': None}] * 1000 + [{'a': None, 'b': 1}] * 1000)
+        self.assertEqual([(e.path, e.info.get('count')) for e in ecm.exception], [
+            ([0, 'b'], 1000),
+            ([1000, 'a'], 1000),
+        ])
+
+    def test_validate_many(self):
+        """ Test Schema.validate_many(), pickling """
+        schema = Schema({'a': int, Optional('b'): [{'c': In((1, 2))}]})
+
+        # Pickle the schema
+        unpickled = pickle.loads(pickle.dumps(schema))
+        self.assertValid(unpickled, {'a': 1, 'b': [{'c': 1}]})
+        self.assertFalse(unpickled.is_valid({'a': 1, 'b': [{'c': 3}]}))
+
+        # Pickle errors: lazy fields are materialized
+        try:
+            schema({'a': None, 'b': [{'c': 3}]})
+        except MultipleInvalid as ee:
+            unpickled = pickle.loads(pickle.dumps(ee))
+            self.assertEqual([(e.message, e.expected, e.provided, e.path) for e in unpickled],
+                             [(e.message, e.expected, e.provided, e.path) for e in ee])
+
+        # Validate, in order
+        values = [{'a': 1}, {'a': None}, {'a': 2}] * 10
+        for workers in (1, 2):
+            results = list(schema.validate_many(values, workers=workers, chunksize=4))
+            self.assertEqual([(ok, v if ok else v.path) for ok, v in results],
+                             [(True, {'a': 1}), (False, ['a']), (True, {'a': 2})] * 10)
+
+        # Errors of validators that can't be pickled: closures, lambdas
+        values = [{'a': 1}, {'a': u'x'}, {'a': 9}] * 3
+        for schema, valid in ((Schema({'a': Any(int, None)}), [True, False, True]),
+                              (Schema({'a': All(int, Range(0, 5))}), [True, False, False])):
+            results = list(schema.validate_many(values, workers=2, chunksize=2))
+            self.assertEqual([ok for ok, v in results], valid * 3)
+            self.assertEqual(set(tuple(v.path) for ok, v in results if not ok), {('a',)})
+
+        # Closed early
+        results = schema.validate_many([{'a': 1}] * 100, workers=2, chunksize=2)
+        self.assertEqual(next(results), (True, {'a': 1}))
+        results.close()
+
+    def test_validate_batch(self):
+        """ Test Schema.validate_batch() """
+        from good.schema.columnar import np
+
+        schema = Schema({
+            'id': int,
+            'age': All(int, Range(0, 150)),
+            'score': All(float, Clamp(0.0, 1.0)),
+            'name': All(six.text_type, Length(1, 5)),
+            'kind': All(int, In((1, 2))),
+            'flag': True,
+            'tag': Coerce(six.text_type),  # opaque
+            Optional('note'): six.text_type,
+        })
+        self.assertEqual(schema.validate_batch([]), [])
+        if np is not None:
+            # Only the `tag` column is opaque
+            self.assertEqual([c.key for c in schema._batch_validator.columns if c.compiled is not None], ['tag'])
+
+        # Results are the same as with per-record validation
+        good_record = {'id': 1, 'age': 20, 'score': 2.0, 'name': u'ab', 'kind': 1, 'flag': True, 'tag': 1}
+        records = [
+            good_record,
+            dict(good_record, note=u'x'),
+            dict(good_record, id=True),
+            dict(good_record, age=151),
+            dict(good_record, score=-1),
+            dict(good_record, name=u''),
+            dict(good_record, kind=3),
+            dict(good_record, flag=1),
+            dict(good_record, note=1),
+            dict(good_record, extra=1),
+            {'id': 1},
+            None,
+        ]
+        expected = []
+        for record in deepcopy(records):
+            try:
+                expected.append((True, schema(record)))
+            except Invalid as e:
+                expected.append((False, [(e.message, e.path) for e in e]))
+        results = [(ok, v if ok else [(e.message, e.path) for e in v]) for ok, v in schema.validate_batch(records)]
+        self.assertEqual(results, expected)
+        self.assertEqual(results[0], (True, dict(good_record, score=1.0, tag=u'1')))
+        self.assertEqual([ok for ok, v in results], [True, True] + [False] * 10)
+
+        # Other markers are not columns: their behavior is up to the compiled schema
+        for schema, record in ((Schema({'a': int, Remove('b'): int}), {'a': 1, 'b': 2}),
+                               (Schema({'a': int, Reject('b'): int}), {'a': 1, 'b': 2})):
+            try:
+                expected = True, schema(dict(record))
+            except Invalid as e:
+                expected = False, e.path
+            ok, v = schema.validate_batch([dict(record)])[0]
+            self.assertEqual((ok, v if ok else v.path), expected)
+            self.assertIsNone(schema._batch_validator.columns)
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'asyncio support requires Python 3.7+')
+    def test_validate_async(self):
+        """ Test Schema.validate_async() """
+        import asyncio
+
+        # Coroutine validators: Python 3-only syntax
+        ns = {'Invalid': Invalid, 'asyncio': asyncio, 'calls': []}
+        six.exec_(
+            'async def slow_int(v):\n'
+            '    calls.append(v)\n'
+            '    await asyncio.sleep(0.05)\n'
+            '    if not isinstance(v, int):\n'
+            '        raise Invalid(u"Not an int")\n'
+            '    return v * 10\n',
+            ns)
+        slow_int = ns['slow_int']
+
+        schema = Schema({'a': slow_int, 'b': [slow_int], 'c': int, Optional('d'): {'x': slow_int}})
+        validate = lambda value: asyncio.run(schema.validate_async(value, concurrency=10))
+
+        # Valid: coroutines are awaited concurrently
+        start = datetime.utcnow()
+        self.assertEqual(validate({'a': 1, 'b': [1, 2, 3], 'c': 1, 'd': {'x': 2}}),
+                         {'a': 10, 'b': [10, 20, 30], 'c': 1, 'd': {'x': 20}})
+        self.assertLess((datetime.utcnow() - start).total_seconds(), 0.2)
+        self.assertEqual(sorted(ns['calls']), [1, 1, 2, 2, 3])
+
+        # Invalid: errors are the same as with sync validation, in the same order
+        with self.assertRaises(MultipleInvalid) as ecm:
+            validate({'a': u'x', 'b': [1, u'y'], 'c': u'z', 'd': {'x': u'q'}})
+        self.assertEqual([(e.message, e.expected, e.provided, e.path) for e in ecm.exception], [
+            (u'Not an int', u'slow_int()', u'x', ['a']),
+            (u'Not an int', u'slow_int()', u'y', ['b', 1]),
+            (s.es_type, s.t_int, s.t_unicode, ['c']),
+            (u'Not an int', u'slow_int()', u'q', ['d', 'x']),
+        ])
+
+        # Options work just like with sync validation
+        validate = lambda schema, value: asyncio.run(schema.validate_async(value))
+        with self.assertRaises(Invalid) as ecm:
+            validate(Schema({'a': slow_int, 'c': int}, fail_fast=True), {'a': u'x', 'c': u'z'})
+        self.assertEqual(ecm.exception.path, ['c'])  # cheap values first
+        with self.assertRaises(MultipleInvalid) as ecm:
+            validate(Schema([slow_int], max_errors=2), [u'x', 1, u'y', u'z'])
+        self.assertEqual([e.path for e in ecm.exception], [[0], [2]])
+        with self.assertRaises(Invalid) as ecm:
+            validate(Schema([slow_int], aggregate_errors=True), [u'x', u'y', u'z'])
+        self.assertEqual(ecm.exception.info, {'index_range': (0, 2), 'count': 3})
+        value = {'a': 1}
+        self.assertIsNot(validate(Schema({'a': slow_int}, copy_on_write=True), value), value)
+        self.assertEqual(value, {'a': 1})
+
+        # Iterables: other members are tried after coroutines fail
+        self.assertEqual(validate(Schema([slow_int, six.text_type, Remove(None)]), [1, u'x', None, 2]), [10, u'x', 20])
+
+        # Synchronous validation
+        self.assertRaises(SchemaError, schema, {'a': 1, 'b': [], 'c': 1})
+
+        # Schemas without coroutines
+        self.assertEqual(asyncio.run(Schema([int]).validate_async([1])), [1])
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'asyncio support requires Python 3.7+')
+    def test_validate_cooperative(self):
+        """ Test Schema.validate_cooperative() """
+        import asyncio
+
+        def validate(schema, value, **kwargs):
+            """ Validate with both methods, make sure results are the same """
+            results = []
+            for validator in (schema, lambda v: asyncio.run(schema.validate_cooperative(v, **kwargs))):
+                try:
+                    results.append((True, validator(deepcopy(value))))
+                except Invalid as e:
+                    results.append((False, [(x.message, x.expected, x.provided, x.path, x.info) for x in e]))
+            self.assertEqual(results[0], results[1])
+            return results[0]
+
+        value = {'items': [{'id': 1, 'x': 1}, {'id': u'a'}, {'id': 2, 'n': 3}, {'id': u'b'}], 'q': [1, None, u'z']}
+        for options in ({}, {'fail_fast': True}, {'max_errors': 2}, {'aggregate_errors': True}, {'lazy': True}):
+            schema = Schema({'items': [{'id': int, Optional('n'): six.text_type, Remove('x'): object}],
+                             six.text_type: [int, Remove(None)]}, **options)
+            self.assertFalse(validate(schema, value, max_items=2)[0])
+            self.assertEqual(validate(schema, {'items': [{'id': 1, 'x': 1}], u'q': [1, None]}),
+                             (True, {'items': [{'id': 1}], u'q': [1]}))
+            self.assertFalse(validate(schema, 1)[0])
+        self.assertEqual(validate(Schema(int), 1), (True, 1))
+
+        # Other tasks run during validation: Python 3-only syntax
+        ns = {'Schema': Schema, 'asyncio': asyncio, 'ticks': []}
+        six.exec_(
+            'async def main():\n'
+            '    async def ticker():\n'
+            '        while True:\n'
+            '            ticks.append(1)\n'
+            '            await asyncio.sleep(0)\n'
+            '    task = asyncio.ensure_future(ticker())\n'
+            '    await Schema([int]).validate_cooperative(list(range(1000)), max_items=100, max_time=None)\n'
+            '    task.cancel()\n',
+            ns)
+        asyncio.run(ns['main']())
+        self.assertGreaterEqual(len(ns['ticks']), 10)
+
+    def test_copy_on_write(self):
+        """ Test Schema(copy_on_write=True) """
+        schema = Schema({
+            u'name': six.text_type,
+            u'age': Coerce(int),
+            u'tags': [six.text_type],
+            u'address': {u'city': six.text_type, Optional(u'zip'): Coerce(int)},
+            Remove(u'tmp'): object,
+        }, copy_on_write=True)
+
+        # Nothing has changed: no copies
+        value = {u'name': u'a', u'age': 1, u'tags': [u'x'], u'address': {u'city': u'c'}}
+        self.assertIs(schema(value), value)
+        self.assertIs(schema.matches(value)[1], value)
+
+        # Only the changed paths are copied
+        value = {u'name': u'a', u'age': u'1', u'tags': [u'x'], u'address': {u'city': u'c', u'zip': u'1'}, u'tmp': 1}
+        original = deepcopy(value)
+        sanitized = schema(value)
+        self.assertEqual(sanitized, {u'name': u'a', u'age': 1, u'tags': [u'x'], u'address': {u'city': u'c', u'zip': 1}})
+        self.assertEqual(value, original)
+        self.assertIs(sanitized[u'tags'], value[u'tags'])
+        self.assertIsNot(sanitized[u'address'], value[u'address'])
+        self.assertEqual(schema.matches(value), (True, sanitized))
+        self.assertEqual(value, original)
+
+        # Invalid input is not modified either
+        value = {u'name': None, u'age': u'1', u'tags': [u'x'], u'address': {u'city': u'c', u'zip': u'1'}}
+        original = deepcopy(value)
+        self.assertRaises(Invalid, schema, value)
+        self.assertEqual(value, original)
+
+        # Read-only mappings
+        if six.PY3:
+            from types import MappingProxyType
+            value = MappingProxyType({u'name': u'a', u'age': 1, u'tags': [], u'address': {u'city': u'c'}})
+            self.assertIs(schema(value), value)
+            value = MappingProxyType({u'name': u'a', u'age': u'1', u'tags': [], u'address': {u'city': u'c'}})
+            self.assertEqual(schema(value)[u'age'], 1)
+            self.assertEqual(value[u'age'], u'1')
+            self.assertRaises(Invalid, Schema({u'a': 1}), MappingProxyType({u'a': 1}))  # only in this mode
+
+    def test_validate_json_stream(self):
+        """ Test Schema.validate_json_stream() """
+        from io import BytesIO
+        schema = Schema({u'id': int, u'name': six.text_type})
+
+        values = [{u'id': i, u'name': u'n\xe4me \u20ac{}'.format(i)} for i in range(50)]
+        values[3][u'id'] = u'3'
+        values[40][u'name'] = None
+
+        # JSON array: small chunks split values, numbers and multibyte characters
+        data = json.dumps(values, ensure_ascii=False).encode('utf-8')
+        for chunk_size in (1, 7, 65536):
+            results = list(schema.validate_json_stream(BytesIO(data), chunk_size=chunk_size))
+            self.assertEqual([i for i, v in results], list(range(50)))
+            self.assertEqual(results[0], (0, values[0]))
+            self.assertEqual(results[49], (49, values[49]))
+
+            e = results[3][1]
+            self.assertIsInstance(e, Invalid)
+            self.assertEqual(e.path, [3, u'id'])
+            self.assertEqual(json.loads(data[e.info['offset']:e.info['offset'] + e.info['length']].decode('utf-8')), values[3])
+            e = results[40][1]
+            self.assertEqual(e.path, [40, u'name'])
+            self.assertEqual(json.loads(data[e.info['offset']:e.info['offset'] + e.info['length']].decode('utf-8')), values[40])
+
+        # NDJSON: a bad line does not stop decoding
+        data = b'\n'.join(json.dumps(v).encode('utf-8') for v in values[:5]) + b'\n\n{"id": \n' + b'{"id": 5, "name": "x"}'
+        results = list(schema.validate_json_stream(BytesIO(data), chunk_size=3))
+        self.assertEqual([i for i, v in results], list(range(7)))
+        self.assertIsInstance(results[3][1], Invalid)
+        e = results[5][1]
+        self.assertIsInstance(e, Invalid)
+        self.assertEqual((e.path, e.expected), ([5], u'JSON'))
+        self.assertEqual(data[e.info['offset']:e.info['offset'] + e.info['length']], b'{"id": ')
+        self.assertEqual(results[6], (6, {u'id': 5, u'name': u'x'}))
+
+        # Invalid JSON stops decoding an array
+        results = list(schema.validate_json_stream(BytesIO(b'[{"id": 1, "name": "a"}, {"id": 2 "name": "b"}, {}]')))
+        self.assertEqual(results[0], (0, {u'id': 1, u'name': u'a'}))
+        self.assertEqual(len(results), 2)
+        self.assertEqual((results[1][1].path, results[1][1].info['offset']), ([1], 25))
+
+        # ... right away: the rest of the input is not buffered
+        f = BytesIO(b'[{"id": 1, "name": "a"}, {"id": 2 "name": "b"}, ' + b'{"id": 3, "name": "c"}, ' * 100000 + b'{}]')
+        results = list(schema.validate_json_stream(f, chunk_size=64))
+        self.assertEqual(len(results), 2)
+        self.assertLess(f.tell(), 1024)
+
+        # Numbers split between chunks
+        self.assertEqual(list(Schema(float).validate_json_stream(BytesIO(b'[1.5, 2.25e1]'), chunk_size=1)),
+                         [(0, 1.5), (1, 22.5)])
+
+        # Empty input; arrays on every line
+        self.assertEqual(list(schema.validate_json_stream(BytesIO(b' [ ] '))), [])
+        self.assertEqual(list(Schema([int]).validate_json_stream(BytesIO(b'[1]\n[2]\n'), lines=True)), [(0, [1]), (1, [2])])
+
+
+class CodegenSchemaCoreTest(SchemaCoreTest):
+    """ Test Schema (core), with the 'codegen' engine """
+
+    def setUp(self):
+        # Use the engine by default
+        self.compiled_schema_cls = Schema.compiled_schema_cls
+        Schema.compiled_schema_cls = Schema.engines['codegen']
+
+    def tearDown(self):
+        Schema.compiled_schema_cls = self.compiled_schema_cls
+
+    def test_engine(self):
+        """ Test Schema(engine='codegen') """
+        schema = Schema({
+            'name': six.text_type,
+            Optional('age'): int,
+            int: bool,
+        }, engine='codegen')
+
+        # Generated source
+        self.assertIsInstance(schema.compiled, Schema.engines['codegen'])
+        self.assertIn(u'def validate_mapping(d):', schema.compiled.compiled.source)
+
+        self.assertValid(schema, {'name': u'A', 1: True})
+        self.assertValid(schema, {'name': u'A', 'age': 18, 1: True})
+        self.assertInvalid(schema, {'name': u'A', 'age': None, 1: True},
+                           Invalid(s.es_type, s.t_int, s.t_none, ['age'], int))
+
+        # Nested mappings are inlined
+        schema = Schema({'a': {'b': {'c': int}}, Optional('d'): {'e': int}}, engine='codegen')
+        source = schema.compiled.compiled.source
+        self.assertIn(u'd_1 = v', source)
+        self.assertIn(u'd_2 = v_1', source)
+        self.assertValid(schema, {'a': {'b': {'c': 1}}, 'd': {'e': 1}})
+        self.assertInvalid(schema, {'a': {'b': {'c': None}}, 'd': {'e': 1}},
+                           Invalid(s.es_type, s.t_int, s.t_none, ['a', 'b', 'c'], int))
+        self.assertInvalid(schema, {'a': {'b': None}},
+                           Invalid(s.es_value_type, s.t_dict, s.t_none, ['a', 'b'], {'c': int}))
+
+        # Generated sources are only kept for tracebacks while the validator exists
+        import gc, linecache
+        from good.schema import codegen
+        validate = codegen.CodegenCompiledSchema({'x': int}, []).compiled
+        filename = validate.__code__.co_filename
+        self.assertIn(filename, linecache.cache)
+        del validate
+        gc.collect()
+        self.assertNotIn(filename, linecache.cache)
+        self.assertNotIn(filename, codegen._sources)
+
 
 class InvalidJsonTest(unittest.TestCase):
 
@@ -710,6 +1442,32 @@ class InvalidJsonTest(unittest.TestCase):
             {'msg': s.es_value, 'path': ['b']},
         ])
 
+    def test_lazy_fields(self):
+        """ Test how Invalid defers paths and provided values """
+        reprs = []
+        class Value(object):
+            def __str__(self):
+                reprs.append(self)
+                return 'Value()'
+
+        def fail(v):
+            raise Invalid(u'Fail')
+
+        # Deep nesting: path prefixes are joined only when read
+        schema = Schema({'a': [{'b': [{'c': fail}]}]})
+        with self.assertRaises(Invalid) as ecm:
+            schema({'a': [{'b': [{'c': Value()}]}]})
+        e = ecm.exception
+        self.assertEqual(reprs, [])  # not formatted yet
+        self.assertEqual(e.path, ['a', 0, 'b', 0, 'c'])
+        self.assertEqual(e.provided, u'Value()')
+        self.assertEqual(e.provided, u'Value()')
+        self.assertEqual(len(reprs), 1)  # formatted once
+
+        # Enrich after the path was read
+        e.enrich(path=['root'])
+        self.assertEqual(e.path, ['root', 'a', 0, 'b', 0, 'c'])
+
 
 class HelpersTest(GoodTestBase):
     """ Test: Helpers """
@@ -773,6 +1531,34 @@ class HelpersTest(GoodTestBase):
             self.assertInvalid(schema, type('A', (object,), {})(),
                                Invalid(s.es_value_type, u'Object({})'.format(Person.__name__), u'Object(A)', [], object_validator))
 
+    def test_Stream(self):
+        """ Test Stream() """
+        stream = Stream([int, Remove(None)])
+        schema = Schema(stream)
+
+        # Generators, constant memory
+        values = schema(x for x in (1, None, 2))
+        self.assertNotIsInstance(values, list)
+        self.assertEqual(list(values), [1, 2])
+        self.assertEqual(list(schema(six.moves.range(10**6))).__len__(), 10**6)
+
+        # Type
+        self.assertInvalid(schema, u'abc', Invalid(s.es_value_type, u'Iterable', s.t_unicode, [], stream))
+        self.assertInvalid(schema, 1, Invalid(s.es_value_type, u'Iterable', s.t_int, [], stream))
+
+        # Errors are raised on consumption
+        values = Schema({'a': Stream([int])})({'a': iter([1, u'a', 2])})['a']
+        self.assertEqual(next(values), 1)
+        with self.assertRaises(Invalid) as ecm:
+            next(values)
+        self.assertInvalidError(ecm.exception, Invalid(s.es_type, s.t_int, s.t_unicode, [1], int))
+
+        # Multiple schemas
+        stream = Stream([1, 2])
+        with self.assertRaises(Invalid) as ecm:
+            list(Schema(stream)([1, 3]))
+        self.assertInvalidError(ecm.exception, Invalid(s.es_value, u'Stream[1|2]', u'3', [1], stream))
+
     def test_Msg(self):
         """ Test Msg() """
 
@@ -831,6 +1617,37 @@ class HelpersTest(GoodTestBase):
         self.assertInvalid(schema, u'1',
                            Invalid(u'Must be 1', u'isOne()', u'1', [], isOne))
 
+    def test_Cached(self):
+        """ Test Cached() """
+        calls = []
+        def intify(v):
+            calls.append(v)
+            return int(v)
+        intify.name = u'Number'
+
+        v_cached = Cached(intify, maxsize=2)
+        schema = Schema({'a': [v_cached]})
+
+        self.assertValid(schema, {'a': ['1', '1', 1, 1, '1']}, {'a': [1, 1, 1, 1, 1]})
+        self.assertEqual(calls, ['1', 1])  # looked up by type & value
+        self.assertEqual(v_cached.info(), (3, 2, 0, 2, 2))
+
+        # Errors are copied: paths are not accumulated
+        for i in range(2):
+            self.assertInvalid(schema, {'a': ['x', 1, 'x']},
+                               MultipleInvalid([
+                                   Invalid(u'invalid literal for int() with base 10: \'x\'', u'Number', u'x', ['a', 0], intify),
+                                   Invalid(u'invalid literal for int() with base 10: \'x\'', u'Number', u'x', ['a', 2], intify)]))
+        self.assertEqual(calls, ['1', 1, 'x', 1])  # LRU: `1` was evicted
+        self.assertEqual(v_cached.info().evictions, 2)
+
+        # Unhashable
+        self.assertValid(Schema(Cached(list)), [1], [1])
+
+        # Impure
+        self.assertRaises(AssertionError, Cached, IsFile())
+        self.assertTrue(In([1]).pure)
+
 
 class PredicatesTest(GoodTestBase):
     """ Test: Validators.Predicates """
@@ -883,6 +1700,48 @@ class PredicatesTest(GoodTestBase):
         ))
         self.assertEqual(schema.name, u'Any(1|2|3|4|5|6|7|8)')
 
+    def test_Any_dispatch(self):
+        """ Test Any(): dispatch by type """
+        calls = []
+        def f(v):
+            calls.append(v)
+            raise Invalid(u'Nope')
+
+        any = Any(1, u'a', float, {u'a': int}, [int], True, f)
+        schema = Schema(any)
+
+        # Candidates by type
+        self.assertValid(schema, 1)
+        self.assertValid(schema, u'a')
+        self.assertValid(schema, 1.5)
+        self.assertValid(schema, {u'a': 1})
+        self.assertValid(schema, [1, 2])
+        self.assertValid(schema, True)
+        self.assertEqual(calls, [])  # never reached
+        self.assertEqual([x[0] for x in any.dispatch[int]], [0, 6])
+        self.assertEqual([x[0] for x in any.dispatch[bool]], [5, 6])
+
+        # Errors stay the same
+        for v in (2, u'b', [u'x'], {u'a': u'x'}, None):
+            self.assertInvalid(schema, v, Invalid(s.es_value, any.name, get_literal_name(v), [], any))
+        self.assertEqual(calls, [2, u'b', [u'x'], {u'a': u'x'}, None])
+
+        # Adaptive order
+        any = Any(int, Coerce(int), adaptive=True)
+        schema = Schema(any)
+        self.assertEqual(schema(u'1'), 1)
+        self.assertEqual([x[0] for x in any.dispatch[six.text_type]], [1])
+        self.assertEqual(schema(1), 1)
+        self.assertEqual([x[0] for x in any.dispatch[int]], [0, 1])
+
+        any = Any(Coerce(int), Coerce(float), adaptive=True)
+        schema = Schema(any)
+        self.assertEqual(schema(u'1'), 1)
+        self.assertEqual(schema(u'1.5'), 1.5)
+        self.assertEqual(schema(u'2.5'), 2.5)  # promoted
+        self.assertEqual(schema(u'1'), 1.0)
+        self.assertEqual(any.hits, [1, 3])
+
     def test_All(self):
         """ Test All() """
 
@@ -1048,6 +1907,20 @@ class ValuesTest(GoodTestBase):
         self.assertInvalid(schema, 99,
                            Invalid(u'Unsupported value', u'In(1,2,3)', u'99', [], allowed))
 
+        # Large lists: looked up in a set, the name is truncated
+        allowed = In(list(range(50000)))
+        schema = Schema(allowed)
+
+        self.assertValid(schema, 49999)
+        self.assertInvalid(schema, -1,
+                           Invalid(u'Unsupported value', u'In(0,1,2,3,4,5,6,7,8,9,...)', u'-1', [], allowed))
+
+        # Unhashable members and values
+        self.assertValid(Schema(In([[1], [2]])), [2])
+        allowed = In([1, 2])
+        self.assertInvalid(Schema(allowed), [2],
+                           Invalid(u'Unsupported value', u'In(1,2)', u'[2]', [], allowed))
+
     def test_Length(self):
         """ Test Length() """
 
@@ -1182,6 +2055,16 @@ class ValuesTest(GoodTestBase):
                     self.assertInvalid(schema, 123,
                                        Invalid(u'Unsupported value', name, u'123', [], map))
 
+        # IntEnum members equal their values, but are not names
+        class numbers_enum(enum.IntEnum):
+            ONE = 1
+
+        map = Map(numbers_enum)
+        schema = Schema(map)
+        self.assertValid(schema, 'ONE', numbers_enum.ONE)
+        self.assertValid(schema, numbers_enum.ONE, numbers_enum.ONE)
+        self.assertInvalid(schema, 1, Invalid(u'Unsupported value', u'numbers_enum', u'1', [], map))
+
     def test_InMap(self):
         """ Test In(Map()) """
 
@@ -1476,6 +2359,43 @@ class DatesTest(GoodTestBase):
             self.assertValid(schema, datetime(2014, 9, 7, 1, 8, 0, tzinfo=tz),
                                      datetime(2014, 9, 7, 1, 8, 0, tzinfo=UTC))
 
+    def test_DateTime_fast(self):
+        """ Test DateTime() fast parsing and adaptive order """
+        formats = ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S.%f%z', '%d.%m.%Y %H:%M', '%Y-%m-%d %a']
+        v_datetime = DateTime(formats)
+        self.assertEqual([fast is not None for i, format, fast in v_datetime.parsers], [True, True, True, False])
+
+        # Same results as strptime()
+        values = ['2014-09-07', '2014-9-7', '2014-09-07T01:08:00.5+0130', '2014-09-07t01:08:00.123456-01:30',
+                  '7.9.2014  1:08', '2014-09-07 Sun',
+                  '2014-09-31', '2014-09-07T01:08:61.5+0130', '2014-09-07T01:08:00.5+0160', '7.9.2014 1:08:00']
+        for value in values:
+            for format in formats:
+                try:
+                    expected = datetime.strptime(value, format)
+                except ValueError:
+                    continue
+                self.assertEqual(v_datetime(value), expected)
+                self.assertEqual(v_datetime(value).utcoffset(), expected.utcoffset())
+                break
+            else:
+                self.assertRaises(Invalid, v_datetime, value)
+
+        # Interned timezones
+        if sys.version_info >= (3, 7):
+            self.assertIs(v_datetime('2014-09-07T01:08:00.5+0130').tzinfo, v_datetime('2014-09-08T00:00:00.1+0130').tzinfo)
+        self.assertIs(FixedOffset.get('+0130'), FixedOffset.get('+0130'))
+
+        # Adaptive order
+        v_datetime = DateTime(formats, adaptive=True)
+        v_datetime('7.9.2014 1:08')
+        self.assertEqual([format for i, format, fast in v_datetime.parsers], [formats[0], formats[2], formats[1], formats[3]])
+        v_datetime('7.9.2014 1:08')
+        self.assertEqual([format for i, format, fast in v_datetime.parsers], [formats[2], formats[0], formats[1], formats[3]])
+        for value in ('2014-09-07', '2014-09-07', '2014-09-07'):
+            v_datetime(value)
+        self.assertEqual([format for i, format, fast in v_datetime.parsers], [formats[0], formats[2], formats[1], formats[3]])
+
     def test_Date(self):
         """ Test Date() """
 
@@ -1533,6 +2453,50 @@ class DatesTest(GoodTestBase):
 
 
 
+class ArraysTest(GoodTestBase):
+    """ Test: Validators.Arrays """
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_Array(self):
+        """ Test Array() """
+        range_validator = Range(0, 1)
+        array = Array(np.floating, (None, 3), range_validator)
+        schema = Schema(array)
+        self.assertEqual(schema.name, u'Array(floating, (*, 3))')
+
+        # Valid: the array itself
+        value = np.zeros((10, 3))
+        self.assertIs(schema(value), value)
+
+        # Type, dtype, shape
+        self.assertInvalid(schema, [1.0], Invalid(s.es_value_type, array.name, s.t_list, [], array))
+        self.assertInvalid(schema, np.zeros((2, 3), dtype=int), Invalid(u'Wrong array type', u'floating', u'int64', [], array))
+        self.assertInvalid(schema, np.zeros((2, 2)), Invalid(u'Wrong array shape', u'(*, 3)', u'(2, 2)', [], array))
+
+        # Elements: the first invalid one is reported
+        value = np.zeros((2, 3))
+        value[1, 2] = 2.0
+        self.assertInvalid(schema, value, Invalid(u'Value must be at most 1', u'1', u'2.0', [1, 2], range_validator))
+
+        # Clamp: a copy
+        schema = Schema(Array(elements=Clamp(0, 1)))
+        value = np.array([0.0, 0.5, 1.0])
+        self.assertIs(schema(value), value)
+        self.assertEqual(schema(np.array([-1.0, 0.5, 2.0])).tolist(), [0.0, 0.5, 1.0])
+
+        # In, Length
+        in_validator = In([u'a', u'bb'])
+        schema = Schema(Array(u'U2', elements=[Length(1, 2), in_validator]))
+        value = np.array([u'a', u'bb'])
+        self.assertIs(schema(value), value)
+        self.assertInvalid(schema, np.array([u'a', u'cc']), Invalid(u'Unsupported value', u'In(a,bb)', u'cc', [1], in_validator))
+
+        # Length: only for strings
+        self.assertRaises(AssertionError, Array, np.floating, elements=Length(1, 2))
+        array = Array(elements=Length(1, 2))
+        self.assertInvalid(Schema(array), np.zeros(2), Invalid(u'Value should be a string', u'String', u'float64', [], array))
+
+
 class FilesTest(GoodTestBase):
     """ Test: Validators.Files """
 
@@ -1566,3 +2530,44 @@ class FilesTest(GoodTestBase):
         self.assertValid(schema, '/etc/hosts')
         self.assertInvalid(schema, '/etc/does-not-exist',
                            Invalid(u'Path does not exist', u'Existing path', u'Missing path', [], isfile))
+
+    def test_StatCache(self):
+        """ Test StatCache """
+        cache = StatCache(maxsize=10, ttl=60)
+        isfile, isdir = IsFile(cache), IsDir(cache)
+
+        # Shared by validators
+        self.assertValid(Schema(isfile), '/etc/hosts')
+        self.assertInvalid(Schema(isdir), '/etc/hosts',
+                           Invalid(u'Is not a directory', u'Directory path', u'Not a directory', [], isdir))
+        self.assertInvalid(Schema(isfile), '/etc/does-not-exist',
+                           Invalid(u'Path does not exist', u'File path', u'Missing path', [], isfile))
+        self.assertEqual(cache.info(), (1, 2, 0, 10, 2))
+
+        # Lists: prefetched concurrently, then validated from the cache
+        schema = Schema([isdir])
+        self.assertValid(schema, ['/etc', '/', '/etc', '/'])
+        self.assertEqual(cache.info(), (5, 2, 0, 10, 4))
+        self.assertInvalid(schema, ['/', '/etc/hosts', '/etc/does-not-exist'],
+                           MultipleInvalid([
+                               Invalid(u'Is not a directory', u'Directory path', u'Not a directory', [1], isdir),
+                               Invalid(u'Path does not exist', u'Directory path', u'Missing path', [2], isdir)]))
+
+        # Threads are stopped
+        import threading
+        threads = threading.active_count()
+        cache.close()
+        idle = threading.active_count()
+        self.assertLess(idle, threads)
+
+        # Size bound, TTL
+        with StatCache(maxsize=2, ttl=0.05) as cache:
+            Schema([PathExists(cache)])(['/', '/etc', '/etc/hosts'])
+        self.assertEqual(threading.active_count(), idle)
+        self.assertEqual(cache.info().currsize, 2)
+        cache.clear()
+        PathExists(cache)('/etc/hosts')
+        PathExists(cache)('/etc/hosts')
+        sleep(0.1)
+        PathExists(cache)('/etc/hosts')
+        self.assertEqual(cache.info()[:2], (1, 2))